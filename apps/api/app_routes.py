@@ -1,15 +1,34 @@
 """App API routes."""
 
-import asyncio
+import base64
 import json
 from datetime import datetime, timezone
+from functools import partial
 
 from amethyst_engine import Engine
 from amethyst_engine.app import App, AppExpanded, ResourceExpanded
-from apps_dao import create_app, get_app, list_apps, update_app
-from fastapi import APIRouter, HTTPException
+from amethyst_engine.compiled_plan import CompiledPlan, compile_plan
+from amethyst_engine.memory import AiCall, Memory, TaskExpanded
+from amethyst_engine.tracing import span
+from apps_dao import LISTABLE_FIELDS, create_app, get_apps, list_apps, update_app
+from db import SerialWriter, run_db
+from fastapi import APIRouter, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from resources_dao import create_resource, get_resource
+from plans_dao import get_compiled_plan, save_compiled_plan
+from pydantic import ValidationError
+from resources_dao import create_resource, get_resources
+from run_manager import TERMINAL_STATUSES, Run, event_frame, run_manager
+from runs_dao import (
+    create_run,
+    get_run_status,
+    list_runs,
+    list_tasks,
+    load_task,
+    load_tasks,
+    save_task,
+    task_in_run,
+    update_run_status,
+)
 
 router = APIRouter(prefix="/apps", tags=["apps"])
 
@@ -17,16 +36,93 @@ router = APIRouter(prefix="/apps", tags=["apps"])
 def downcast_to_app(
     app_expanded: AppExpanded | App, resource_ids: list[str]
 ) -> tuple[App, datetime]:
-    """Downcast AppExpanded to App, excluding resources and updating timestamp."""
+    """Downcast AppExpanded to App, dropping resources/memory, updating timestamp."""
     now = datetime.now(timezone.utc)
     app = App(
-        **app_expanded.model_dump(exclude={"resources", "resource_ids", "updated_at"}),
+        **app_expanded.model_dump(
+            exclude={"resources", "resource_ids", "updated_at", "memory"}
+        ),
         resource_ids=resource_ids,
         updated_at=now,
     )
     return app, now
 
 
+def save_app_row(app_id: str, app_expanded: AppExpanded, resource_ids: list[str]):
+    """Save app definition. Run state lives in the run/task tables, not the app row."""
+    app_to_save, now = downcast_to_app(app_expanded, resource_ids)
+    update_app(app_id, app_to_save.model_dump_json(exclude={"memory"}), now)
+
+
+def make_task_saver(
+    app_id: str,
+    run_id: str | None,
+    memory: Memory,
+    writer: SerialWriter | None = None,
+):
+    """Build Engine.save_task callback that writes only what changed since last save.
+
+    The task row is upserted; AI calls and the trace blobs they reference are
+    append-only, so each is written once. With `writer`, the changes are captured
+    immediately and written off the event loop; otherwise they are written inline.
+    """
+    saved_ai_calls: dict[str, int] = {}
+    saved_refs: set[str] = set()
+
+    def save_task_callback(task: TaskExpanded):
+        start = saved_ai_calls.get(task.id, 0)
+        new_ai_calls = [
+            (seq, task.ai_calls[seq].model_dump())
+            for seq in range(start, len(task.ai_calls))
+        ]
+        new_blobs = {}
+        for _, ai_call in new_ai_calls:
+            for ref in ai_call["input_refs"]:
+                if ref not in saved_refs and ref in memory.trace_blobs:
+                    new_blobs[ref] = memory.trace_blobs[ref]
+        if writer:
+            writer.submit(
+                save_task, app_id, run_id, task.to_dict(), new_ai_calls, new_blobs
+            )
+        else:
+            save_task(app_id, run_id, task.to_dict(), new_ai_calls, new_blobs)
+        saved_ai_calls[task.id] = len(task.ai_calls)
+        saved_refs.update(new_blobs)
+
+    return save_task_callback
+
+
+def migrate_legacy_memory(app_id: str, app_expanded: AppExpanded):
+    """Move tasks stored inline in the app row (pre run/task tables) into the tables."""
+    memory = app_expanded.memory
+    if not memory.tasks:
+        return
+    savers = {}
+    for task in memory.tasks.values():
+        # Main tasks are parented by their run ID
+        root = task
+        while root.parent_task_id in memory.tasks:
+            root = memory.tasks[root.parent_task_id]
+        run_id = root.parent_task_id
+        if run_id not in savers:
+            savers[run_id] = make_task_saver(app_id, run_id, memory)
+        savers[run_id](task)
+    app_expanded.memory = Memory()
+
+
+def load_memory(app_id: str, memory: Memory, run_id: str | None = None) -> Memory:
+    """Merge tasks persisted in the run/task tables into memory."""
+    tasks, ai_calls, blobs = load_tasks(app_id, run_id)
+    memory.trace_blobs.update(blobs)
+    for task_obj in tasks:
+        task = TaskExpanded(
+            **task_obj,
+            ai_calls=[AiCall(**ac) for ac in ai_calls.get(task_obj["id"], [])],
+        )
+        memory.tasks[task.id] = task
+    return memory
+
+
 def save_resources(resources: list[ResourceExpanded]) -> list[str]:
     """Save all resources and return all resource IDs."""
     resource_ids = []
@@ -37,126 +133,338 @@ def save_resources(resources: list[ResourceExpanded]) -> list[str]:
     return resource_ids
 
 
-def hydrate_app(app_id: str = None, app_expanded: AppExpanded = None) -> AppExpanded:
-    """Load app and hydrate with resources from DB.
+def attach_resources(apps: list[AppExpanded]):
+    """Hydrate apps with their resources from DB in a single query.
 
     Hydrates from:
     - app.resource_ids (saved resource IDs)
     - app.resources[i].id (resources that need full data from DB)
+
+    Resource rows shared by several apps are fetched once; each app gets its own
+    ResourceExpanded copies.
     """
-    if app_id:
-        json_obj = get_app(app_id)
-        if not json_obj:
-            raise HTTPException(status_code=404, detail="App not found")
+    ids_per_app = [
+        dict.fromkeys(app.resource_ids + [r.id for r in app.resources if r.id])
+        for app in apps
+    ]
+    all_ids = dict.fromkeys(rid for ids in ids_per_app for rid in ids)
+    rows = get_resources(list(all_ids))
+
+    for app, ids in zip(apps, ids_per_app):
+        for resource_id in ids:
+            if resource_id in rows:
+                app.resources.append(ResourceExpanded(**rows[resource_id]))
+
+
+def hydrate_apps(app_ids: list[str]) -> dict[str, AppExpanded]:
+    """Load apps and hydrate them with resources (one query for each table)."""
+    app_expanded_by_id = {}
+    for app_id, json_obj in get_apps(app_ids).items():
         app_data = App(**json_obj)
-        app_expanded = AppExpanded(
+        app_expanded_by_id[app_id] = AppExpanded(
             files=app_data.files,
             resource_ids=app_data.resource_ids,
             workspaceId=app_data.workspaceId,
             memory=app_data.memory,
             resources=[],
         )
+    attach_resources(list(app_expanded_by_id.values()))
+    return app_expanded_by_id
 
-    # Hydrate from resource_ids and resources[i].id
-    resource_ids_to_hydrate = set(app_expanded.resource_ids)
-    for resource in app_expanded.resources:
-        if resource.id:
-            resource_ids_to_hydrate.add(resource.id)
 
-    for resource_id in resource_ids_to_hydrate:
-        resource_data = get_resource(resource_id)
-        if resource_data:
-            app_expanded.resources.append(ResourceExpanded(**resource_data))
+def hydrate_app(app_id: str = None, app_expanded: AppExpanded = None) -> AppExpanded:
+    """Load app and hydrate with resources from DB."""
+    if app_id:
+        app_expanded = hydrate_apps([app_id]).get(app_id)
+        if not app_expanded:
+            raise HTTPException(status_code=404, detail="App not found")
+        return app_expanded
 
+    attach_resources([app_expanded])
     return app_expanded
 
 
+def encode_cursor(after: tuple[datetime, str]) -> str:
+    updated_at, app_id = after
+    raw = json.dumps([updated_at.isoformat(), app_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        updated_at, app_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(updated_at), app_id
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from e
+
+
 @router.get("/")
-async def list_apps_endpoint():
-    """List all apps."""
-    return list_apps()
+async def list_apps_endpoint(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+    include: str = "",
+):
+    """List app summaries, most recently updated first.
+
+    `include` is a comma-separated list of extra app fields (files, resource_ids,
+    workspaceId). Pass `next_cursor` back as `cursor` to get the next page.
+    """
+    fields = tuple(f for f in include.split(",") if f)
+    unknown = set(fields) - set(LISTABLE_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+
+    after = decode_cursor(cursor) if cursor else None
+    apps, next_after = await run_db(list_apps, limit, after, fields)
+    return {
+        "items": apps,
+        "next_cursor": encode_cursor(next_after) if next_after else None,
+    }
 
 
 @router.post("/")
 async def create_app_endpoint(app_expanded: AppExpanded):
     """Create new app."""
-    resource_ids = save_resources(app_expanded.resources)
+    resource_ids = await run_db(save_resources, app_expanded.resources)
     app_obj, now = downcast_to_app(app_expanded, resource_ids)
-    app_id = create_app(app_obj.model_dump_json(), now)
+    app_id = await run_db(create_app, app_obj.model_dump_json(), now)
     return {"id": app_id}
 
 
 @router.get("/{app_id}")
 async def get_app_endpoint(app_id: str):
     """Get app by ID with hydrated resources."""
-    app_expanded = hydrate_app(app_id)
-    return {"id": app_id, **app_expanded.model_dump()}
+    app_expanded = await run_db(hydrate_app, app_id)
+    memory = await run_db(load_memory, app_id, app_expanded.memory)
+    # Debugger view: resolve deduplicated AI call traces instead of sending the store
+    tasks = {task_id: memory.materialize_task(t) for task_id, t in memory.tasks.items()}
+    return {
+        "id": app_id,
+        **app_expanded.model_dump(exclude={"memory"}),
+        "memory": {"tasks": tasks},
+    }
+
+
+def load_compiled_plan(app_id: str) -> CompiledPlan | None:
+    """App's saved compiled plan, or None if missing or unreadable."""
+    plan_obj = get_compiled_plan(app_id)
+    if not plan_obj:
+        return None
+    try:
+        return CompiledPlan(**plan_obj)
+    except ValidationError:
+        return None
+
+
+def save_plan(app_id: str, app_obj: AppExpanded):
+    """Save a freshly planned app: resources, app row and compiled plan."""
+    resource_ids = save_resources(app_obj.resources)
+    save_app_row(app_id, app_obj, resource_ids)
+    compiled = compile_plan(app_obj)
+    save_compiled_plan(
+        app_id, compiled.version, compiled.files_hash, compiled.model_dump_json()
+    )
+
+
+async def execute_run(
+    run: Run, app_obj: AppExpanded, compiled: CompiledPlan | None = None
+) -> str:
+    """Plan (or load `compiled`) and execute app, publishing engine updates as run events."""
+    # Engine callbacks are synchronous: queue their writes in order off the loop
+    writer = SerialWriter()
+
+    def save_app_callback():
+        # Save app state during execution (not resources)
+        resource_ids = [r.id for r in app_obj.resources if r.id]
+        writer.submit(save_app_row, run.app_id, app_obj, resource_ids)
+
+    engine = Engine(
+        send_update=run.publish,
+        save_app=save_app_callback,
+        save_task=make_task_saver(run.app_id, run.id, app_obj.memory, writer),
+        verbose=True,
+    )
+
+    attributes = {
+        "run.id": run.id,
+        "app.id": run.app_id,
+        "workspace.id": app_obj.workspaceId,
+    }
+    with span("run", attributes) as run_span:
+        try:
+            # Step 1: Reuse the compiled plan while the app's files are unchanged,
+            # refreshing only connection status; otherwise plan and save the result
+            status_before = {
+                r.id: (r.connection_status, r.auth_url) for r in app_obj.resources
+            }
+            if await engine.load_plan(app_obj, compiled):
+                changed = [
+                    r
+                    for r in app_obj.resources
+                    if r.id
+                    and status_before.get(r.id) != (r.connection_status, r.auth_url)
+                ]
+                if changed:
+                    with span("db.write", {"db.operation": "save_resources"}):
+                        await run_db(save_resources, changed)
+            else:
+                await engine.plan(app_obj)
+                with span("db.write", {"db.operation": "save_plan"}):
+                    await run_db(save_plan, run.app_id, app_obj)
+
+            # Step 2: Execute (run the planned app)
+            result = await engine.run(app_obj, run.id)
+            status = (result or {}).get("status", "completed")
+            run_span.set_attribute("run.status", status)
+            return status
+        finally:
+            await writer.flush()
+
+
+async def persist_run_status(run: Run):
+    await run_db(update_run_status, run.id, run.status)
 
 
 @router.post("/{app_id}/runs")
 async def create_run_endpoint(app_id: str):
-    """Plan and execute app with streaming."""
+    """Start planning (unless the app's compiled plan is current) and executing app.
+
+    Returns the run ID immediately; follow progress with the run's events stream.
+    """
     from uuid import uuid4
 
-    # Hydrate app (loads from resource_ids + hydrates Amethyst resources)
-    app_obj = hydrate_app(app_id=app_id)
+    # Hydrate app (loads from resource_ids + hydrates Amethyst resources).
+    # Past runs stay in the task tables; only this run's tasks are held in memory.
+    app_obj = await run_db(hydrate_app, app_id=app_id)
+    await run_db(migrate_legacy_memory, app_id, app_obj)
+    compiled = await run_db(load_compiled_plan, app_id)
     run_id = str(uuid4())
+    await run_db(create_run, run_id, app_id)
 
-    async def stream():
-        messages = asyncio.Queue()
-
-        def save_app_callback():
-            # Save app state during execution (not resources)
-            resource_ids = [r.id for r in app_obj.resources if r.id]
-            app_to_save, now = downcast_to_app(app_obj, resource_ids)
-            update_app(
-                app_id,
-                app_to_save.model_dump_json(
-                    exclude={"memory": {"tasks": {"__all__": {"async_task"}}}}
-                ),
-                now,
-            )
+    run = run_manager.start(
+        run_id,
+        app_id,
+        partial(execute_run, app_obj=app_obj, compiled=compiled),
+        on_status=persist_run_status,
+    )
+    return {"id": run_id, "status": run.status}
 
-        engine = Engine(
-            send_update=messages.put_nowait, save_app=save_app_callback, verbose=True
-        )
 
-        # Step 1: Plan (parse files, enrich resources)
-        await engine.plan(app_obj)
-
-        # Post-planning: Save all resources and update app
-        resource_ids = save_resources(app_obj.resources)
-        app_to_save, now = downcast_to_app(app_obj, resource_ids)
-        update_app(
-            app_id,
-            app_to_save.model_dump_json(
-                exclude={"memory": {"tasks": {"__all__": {"async_task"}}}}
-            ),
-            now,
-        )
+@router.get("/{app_id}/runs/{run_id}/events")
+async def run_events_endpoint(
+    app_id: str,
+    run_id: str,
+    after: int = 0,
+    last_event_id: int | None = Header(None),
+):
+    """Stream run events (SSE) from event `after`, then live until the run ends.
 
-        # Step 2: Execute (run the planned app)
-        task = asyncio.create_task(engine.run(app_obj, run_id))
+    Reconnecting clients resume from their Last-Event-ID. Runs finished longer
+    than the retention period ago only get their final `run_finished` event.
+    """
+    run = run_manager.get(run_id)
+    if not run or run.app_id != app_id:
+        status = await run_db(get_run_status, app_id, run_id)
+        if status is None:
+            raise HTTPException(status_code=404, detail="Run not found")
+        if status not in TERMINAL_STATUSES:
+            raise HTTPException(
+                status_code=404, detail="Run events are not available on this server"
+            )
+        final = {"type": "run_finished", "run_id": run_id, "status": status}
+        return StreamingResponse(
+            iter([event_frame(final)]), media_type="text/event-stream"
+        )
 
-        while not task.done() or not messages.empty():
-            if not messages.empty():
-                update = await messages.get()
-                yield f"data: {json.dumps(update)}\n\n"
-            await asyncio.sleep(0)
+    if last_event_id is not None:
+        after = last_event_id + 1
 
-        await task
+    async def stream():
+        async for index, frame in run.subscribe(after):
+            yield b"id: %d\n%s" % (index, frame)
 
     return StreamingResponse(stream(), media_type="text/event-stream")
 
 
+def load_task_memory(app_id: str, task_id: str) -> tuple[TaskExpanded, Memory] | None:
+    """Load one task with its ai_calls and the trace blobs they reference."""
+    loaded = load_task(app_id, task_id)
+    if not loaded:
+        return None
+    task_obj, ai_calls, blobs = loaded
+    task = TaskExpanded(**task_obj, ai_calls=[AiCall(**ac) for ac in ai_calls])
+    return task, Memory(tasks={task.id: task}, trace_blobs=blobs)
+
+
+@router.get("/{app_id}/runs")
+async def list_runs_endpoint(
+    app_id: str, limit: int = Query(50, ge=1, le=200), cursor: str | None = None
+):
+    """List runs of an app, newest first."""
+    before = decode_cursor(cursor) if cursor else None
+    runs, next_before = await run_db(list_runs, app_id, limit, before)
+    return {
+        "items": runs,
+        "next_cursor": encode_cursor(next_before) if next_before else None,
+    }
+
+
 @router.get("/{app_id}/runs/{run_id}")
 async def get_run_endpoint(app_id: str, run_id: str):
     """Get run by ID - returns the main task."""
-    app_obj = hydrate_app(app_id)
+    main_tasks, _ = await run_db(list_tasks, app_id, run_id, 1)
+    if main_tasks:
+        loaded = await run_db(load_task_memory, app_id, main_tasks[0]["id"])
+        if not loaded:
+            raise HTTPException(status_code=404, detail="Run not found")
+        task, memory = loaded
+        return memory.materialize_task(task)
+
+    # Runs from before the run/task tables, still stored inline in the app row
+    app_obj = await run_db(hydrate_app, app_id)
+    memory = app_obj.memory
     main_task = next(
-        (t for t in app_obj.memory.tasks.values() if t.parent_task_id == run_id), None
+        (t for t in memory.tasks.values() if t.parent_task_id == run_id), None
     )
     if not main_task:
         raise HTTPException(status_code=404, detail="Run not found")
 
-    return main_task.to_dict(include_ai_calls=True)
+    return memory.materialize_task(main_task)
+
+
+@router.get("/{app_id}/runs/{run_id}/tasks")
+async def list_run_tasks_endpoint(
+    app_id: str,
+    run_id: str,
+    parent_task_id: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+):
+    """Page through a run's task tree one level at a time.
+
+    Without `parent_task_id` this returns the run's main task. Tasks come
+    without ai_calls, with `child_count` (expand by passing the task's ID as
+    `parent_task_id`) and `ai_call_count` (see the task ai_calls endpoint).
+    """
+    after = decode_cursor(cursor) if cursor else None
+    if parent_task_id and not await run_db(task_in_run, app_id, run_id, parent_task_id):
+        raise HTTPException(status_code=404, detail="Task not found")
+    tasks, next_after = await run_db(
+        list_tasks, app_id, parent_task_id or run_id, limit, after
+    )
+    return {
+        "items": tasks,
+        "next_cursor": encode_cursor(next_after) if next_after else None,
+    }
+
+
+@router.get("/{app_id}/tasks/{task_id}/ai_calls")
+async def get_task_ai_calls_endpoint(app_id: str, task_id: str):
+    """Get a task's ai_calls with input messages resolved."""
+    loaded = await run_db(load_task_memory, app_id, task_id)
+    if not loaded:
+        raise HTTPException(status_code=404, detail="Task not found")
+    task, memory = loaded
+    return memory.materialize_ai_calls(task)
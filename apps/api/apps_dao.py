@@ -1,23 +1,11 @@
 """App persistence DAO."""
 
-import os
 from datetime import datetime
 from uuid import uuid4
 
-import psycopg2
+from db import connection, execute
 from psycopg2.extras import RealDictCursor
 
-
-def get_db_connection():
-    return psycopg2.connect(
-        user="postgres",
-        password=os.getenv("PGPASSWORD"),
-        host=os.getenv("PGHOST", "localhost"),
-        database=os.getenv("PGDATABASE", "amethyst"),
-        port=5432,
-    )
-
-
 # CREATE TABLE app (
 #   id VARCHAR(50) PRIMARY KEY,
 #   json_obj JSONB,
@@ -28,54 +16,103 @@ def get_db_connection():
 def create_app(json_str: str, updated_at: datetime) -> str:
     """Insert new app."""
     app_id = str(uuid4())
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            cur.execute(
-                "INSERT INTO app (id, json_obj, updated_at) VALUES (%s, %s, %s)",
-                (app_id, json_str, updated_at),
-            )
-            conn.commit()
-        return app_id
-    finally:
-        conn.close()
+    with connection() as conn, conn.cursor() as cur:
+        execute(
+            cur,
+            "create_app",
+            "INSERT INTO app (id, json_obj, updated_at) VALUES (%s, %s, %s)",
+            (app_id, json_str, updated_at),
+        )
+    return app_id
 
 
 def get_app(app_id: str) -> dict:
     """Get app by ID."""
-    conn = get_db_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute("SELECT json_obj FROM app WHERE id = %s", (app_id,))
-            row = cur.fetchone()
-            return row["json_obj"] if row else None
-    finally:
-        conn.close()
+    with connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+        execute(cur, "get_app", "SELECT json_obj FROM app WHERE id = %s", (app_id,))
+        row = cur.fetchone()
+        return row["json_obj"] if row else None
+
+
+def get_apps(app_ids: list[str]) -> dict[str, dict]:
+    """Get apps by ID in one query, keyed by app ID (missing IDs omitted)."""
+    if not app_ids:
+        return {}
+    with connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+        execute(
+            cur,
+            "get_apps",
+            "SELECT id, json_obj FROM app WHERE id = ANY(%s)",
+            (list(app_ids),),
+        )
+        return {row["id"]: row["json_obj"] for row in cur.fetchall()}
 
 
 def update_app(app_id: str, json_str: str, updated_at: datetime):
     """Update app."""
-    conn = get_db_connection()
-    try:
-        with conn.cursor() as cur:
-            cur.execute(
-                "UPDATE app SET json_obj = %s, updated_at = %s WHERE id = %s",
-                (json_str, updated_at, app_id),
-            )
-            conn.commit()
-    finally:
-        conn.close()
-
-
-def list_apps() -> list:
-    """List all apps sorted by updated_at DESC."""
-    conn = get_db_connection()
-    try:
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute("SELECT id, json_obj FROM app ORDER BY updated_at DESC")
-            rows = cur.fetchall()
-            return (
-                [{"id": row["id"], **row["json_obj"]} for row in rows] if rows else []
-            )
-    finally:
-        conn.close()
+    with connection() as conn, conn.cursor() as cur:
+        execute(
+            cur,
+            "update_app",
+            "UPDATE app SET json_obj = %s, updated_at = %s WHERE id = %s",
+            (json_str, updated_at, app_id),
+        )
+
+
+# Fields of json_obj that list_apps can project on request
+LISTABLE_FIELDS = ("files", "resource_ids", "workspaceId")
+
+
+def list_apps(
+    limit: int = 50,
+    after: tuple[datetime, str] | None = None,
+    include: tuple[str, ...] = (),
+) -> tuple[list[dict], tuple[datetime, str] | None]:
+    """List app summaries sorted by updated_at DESC, one keyset page at a time.
+
+    Each summary has id, name (main resource), file_count, resource_count,
+    last_run_status and updated_at, plus any LISTABLE_FIELDS in `include`.
+    `after` is the (updated_at, id) of the last app on the previous page.
+    Returns (apps, keyset to pass as `after` for the next page or None).
+    """
+    projected = "".join(f", a.json_obj->'{field}' AS \"{field}\"" for field in include)
+    keyset = "WHERE (a.updated_at, a.id) < (%s, %s)" if after else ""
+    with connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            f"""
+            SELECT
+              a.id,
+              a.updated_at,
+              (
+                SELECT r.json_obj->>'name'
+                FROM resource r
+                WHERE r.id IN (
+                  SELECT jsonb_array_elements_text(a.json_obj->'resource_ids')
+                )
+                AND (r.json_obj->>'is_main')::boolean
+                LIMIT 1
+              ) AS name,
+              jsonb_array_length(COALESCE(a.json_obj->'files', '[]')) AS file_count,
+              jsonb_array_length(COALESCE(a.json_obj->'resource_ids', '[]'))
+                AS resource_count,
+              (
+                SELECT run.status FROM run
+                WHERE run.app_id = a.id
+                ORDER BY run.created_at DESC
+                LIMIT 1
+              ) AS last_run_status
+              {projected}
+            FROM app a
+            {keyset}
+            ORDER BY a.updated_at DESC, a.id DESC
+            LIMIT %s
+            """,
+            (*(after or ()), limit + 1),
+        )
+        rows = cur.fetchall()
+
+    next_after = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_after = (rows[-1]["updated_at"], rows[-1]["id"])
+    return [dict(row) for row in rows], next_after
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""End-to-end load test for the runs API.
+
+Starts the API against local stand-ins and drives concurrent runs
+(`POST /apps/{id}/runs` followed by its SSE events stream):
+- mock_responses.py: OpenAI Responses API (OPENAI_BASE_URL)
+- mock_pipedream.py: Pipedream Connect accounts/tokens (PIPEDREAM_BASE_URL)
+- packages/engine/tests/unified_server.py: amethyst tools and agents
+- Postgres from the PG* environment variables, as db.py (schema.sql is applied)
+
+Usage (from apps/api):
+    poetry run python benchmarks/loadtest.py --concurrency 20 --output head.json
+    poetry run python benchmarks/loadtest.py --output new.json --compare head.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import psutil
+import psycopg2
+
+API_DIR = Path(__file__).resolve().parent.parent
+BENCH_DIR = API_DIR / "benchmarks"
+ENGINE_TESTS_DIR = API_DIR.parent.parent / "packages" / "engine" / "tests"
+
+APP_CODE = """main function bench-main
+use email to send update number 1
+use email to send update number 2
+use email to send update number 3
+end function
+"""
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+class Services:
+    """Spawns and tears down the API and its stand-ins."""
+
+    def __init__(self, args):
+        self.args = args
+        self.procs: list[subprocess.Popen] = []
+        self.api_proc: subprocess.Popen | None = None
+
+    def env(self) -> dict:
+        a = self.args
+        return {
+            **os.environ,
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{a.llm_port}/v1",
+            "PIPEDREAM_BASE_URL": f"http://127.0.0.1:{a.pipedream_port}",
+            "PIPEDREAM_PROJECT_ID": "proj_bench",
+            "PIPEDREAM_PROJECT_ENVIRONMENT": "development",
+            "PIPEDREAM_CLIENT_ID": "bench",
+            "PIPEDREAM_CLIENT_SECRET": "bench",
+            "AMETHYST_SERVER_URL": f"http://127.0.0.1:{a.unified_port}",
+            "BENCH_STATEMENTS": str(a.statements),
+            "BENCH_LLM_LATENCY_MS": str(a.llm_latency_ms),
+        }
+
+    def spawn(self, cmd: list[str], cwd: Path, port: int) -> subprocess.Popen:
+        proc = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            env={**self.env(), "PORT": str(port)},
+            stdout=subprocess.DEVNULL if not self.args.verbose else None,
+            stderr=subprocess.DEVNULL if not self.args.verbose else None,
+        )
+        self.procs.append(proc)
+        return proc
+
+    def start(self):
+        a = self.args
+        py = sys.executable
+        self.spawn([py, str(BENCH_DIR / "mock_responses.py")], BENCH_DIR, a.llm_port)
+        self.spawn(
+            [py, str(BENCH_DIR / "mock_pipedream.py")], BENCH_DIR, a.pipedream_port
+        )
+        if not a.no_unified_server:
+            self.spawn([py, "unified_server.py"], ENGINE_TESTS_DIR, a.unified_port)
+        self.api_proc = self.spawn(
+            [
+                py,
+                "-m",
+                "uvicorn",
+                "main:app",
+                "--port",
+                str(a.api_port),
+                "--log-level",
+                "warning",
+            ],
+            API_DIR,
+            a.api_port,
+        )
+
+    def stop(self):
+        for proc in self.procs:
+            proc.terminate()
+        for proc in self.procs:
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+async def wait_until_up(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url, timeout=1.0)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Service did not come up: {url}")
+
+
+def apply_schema():
+    conn = psycopg2.connect(
+        user=os.getenv("PGUSER", "postgres"),
+        password=os.getenv("PGPASSWORD"),
+        host=os.getenv("PGHOST", "localhost"),
+        database=os.getenv("PGDATABASE", "amethyst"),
+        port=int(os.getenv("PGPORT", "5432")),
+    )
+    try:
+        with conn.cursor() as cur:
+            cur.execute((API_DIR / "schema.sql").read_text())
+            conn.commit()
+    finally:
+        conn.close()
+
+
+async def create_bench_app(client: httpx.AsyncClient, args) -> str:
+    payload = {
+        "files": [{"content": APP_CODE}],
+        "workspaceId": "bench-workspace",
+        "resources": [
+            {"id": "gmail", "name": "Gmail", "type": "tool", "provider": "pipedream"},
+            {
+                "id": "email",
+                "name": "email",
+                "type": "tool",
+                "provider": "amethyst",
+                "url": f"http://127.0.0.1:{args.unified_port}/tools/email",
+            },
+        ],
+    }
+    response = await client.post("/apps/", json=payload)
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+async def run_once(client: httpx.AsyncClient, app_id: str) -> dict:
+    """Drive one SSE run and time it."""
+    start = time.perf_counter()
+    first_event = None
+    events = 0
+    error = None
+    try:
+        response = await client.post(f"/apps/{app_id}/runs")
+        response.raise_for_status()
+        run_id = response.json()["id"]
+        async with client.stream(
+            "GET", f"/apps/{app_id}/runs/{run_id}/events", timeout=None
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                if first_event is None:
+                    first_event = time.perf_counter() - start
+                events += 1
+                event = json.loads(line[6:])
+                if event["type"] == "run_finished" and event["status"] != "completed":
+                    error = f"run {event['status']}"
+    except httpx.HTTPError as e:
+        error = repr(e)
+    return {
+        "ttfe": first_event,
+        "duration": time.perf_counter() - start,
+        "events": events,
+        "error": error,
+    }
+
+
+async def sample_process(pid: int, samples: list, stop: asyncio.Event, interval: float):
+    """Sample RSS and CPU of the API process until stopped."""
+    proc = psutil.Process(pid)
+    proc.cpu_percent(None)
+    while not stop.is_set():
+        await asyncio.sleep(interval)
+        try:
+            samples.append(
+                {
+                    "rss_mb": proc.memory_info().rss / 2**20,
+                    "cpu_pct": proc.cpu_percent(None),
+                }
+            )
+        except psutil.Error:
+            return
+
+
+async def drive(args, api_pid: int | None) -> dict:
+    base_url = f"http://127.0.0.1:{args.api_port}"
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=httpx.Limits(max_connections=args.concurrency * 2)
+    ) as client:
+        app_ids = [await create_bench_app(client, args) for _ in range(args.apps)]
+
+        samples: list[dict] = []
+        stop = asyncio.Event()
+        sampler = (
+            asyncio.create_task(
+                sample_process(api_pid, samples, stop, args.sample_interval)
+            )
+            if api_pid
+            else None
+        )
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def bounded(idx: int):
+            async with semaphore:
+                return await run_once(client, app_ids[idx % len(app_ids)])
+
+        wall_start = time.perf_counter()
+        runs = await asyncio.gather(*(bounded(i) for i in range(args.runs)))
+        wall = time.perf_counter() - wall_start
+
+        stop.set()
+        if sampler:
+            await sampler
+
+    ok = [r for r in runs if not r["error"]]
+    ttfe = [r["ttfe"] for r in ok if r["ttfe"] is not None]
+    durations = [r["duration"] for r in ok]
+    total_events = sum(r["events"] for r in ok)
+    rss = [s["rss_mb"] for s in samples]
+    cpu = [s["cpu_pct"] for s in samples]
+
+    return {
+        "runs": len(runs),
+        "errors": len(runs) - len(ok),
+        "wall_s": wall,
+        "ttfe_p50_ms": percentile(ttfe, 50) * 1000,
+        "ttfe_p99_ms": percentile(ttfe, 99) * 1000,
+        "duration_p50_ms": percentile(durations, 50) * 1000,
+        "duration_p99_ms": percentile(durations, 99) * 1000,
+        "events_per_s": total_events / wall if wall else 0.0,
+        "rss_peak_mb": max(rss, default=0.0),
+        "rss_mean_mb": statistics.fmean(rss) if rss else 0.0,
+        "cpu_mean_pct": statistics.fmean(cpu) if cpu else 0.0,
+        "cpu_peak_pct": max(cpu, default=0.0),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=API_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(metrics: dict, baseline: dict | None):
+    print(
+        f"\n{'metric':<18}{'value':>14}"
+        + (f"{'baseline':>14}{'delta':>10}" if baseline else "")
+    )
+    for key, value in metrics.items():
+        line = f"{key:<18}{value:>14.2f}"
+        if baseline and isinstance(baseline.get(key), (int, float)):
+            base = baseline[key]
+            delta = f"{(value - base) / base * 100:+.1f}%" if base else "n/a"
+            line += f"{base:>14.2f}{delta:>10}"
+        print(line)
+
+
+async def main(args):
+    services = Services(args)
+    if not args.no_spawn:
+        services.start()
+    try:
+        await wait_until_up(f"http://127.0.0.1:{args.api_port}/health")
+        apply_schema()
+        api_pid = services.api_proc.pid if services.api_proc else args.api_pid
+        metrics = await drive(args, api_pid)
+    finally:
+        services.stop()
+
+    result = {
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "concurrency": args.concurrency,
+            "runs": args.runs,
+            "apps": args.apps,
+            "statements": args.statements,
+            "llm_latency_ms": args.llm_latency_ms,
+        },
+        "metrics": metrics,
+    }
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["metrics"]
+    print_report(metrics, baseline)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        print(f"\nSaved results to {args.output}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test POST /apps/{id}/runs")
+    parser.add_argument(
+        "--concurrency", type=int, default=10, help="Concurrent SSE sessions"
+    )
+    parser.add_argument("--runs", type=int, default=50, help="Total runs to drive")
+    parser.add_argument(
+        "--apps", type=int, default=1, help="Distinct apps to spread runs over"
+    )
+    parser.add_argument(
+        "--statements", type=int, default=3, help="Statements per planned app"
+    )
+    parser.add_argument(
+        "--llm-latency-ms", type=float, default=200, help="Mock LLM TTFT"
+    )
+    parser.add_argument(
+        "--sample-interval", type=float, default=0.25, help="RSS/CPU sampling"
+    )
+    parser.add_argument("--api-port", type=int, default=8100)
+    parser.add_argument("--llm-port", type=int, default=9101)
+    parser.add_argument("--pipedream-port", type=int, default=9102)
+    parser.add_argument("--unified-port", type=int, default=9998)
+    parser.add_argument("--no-unified-server", action="store_true")
+    parser.add_argument(
+        "--no-spawn",
+        action="store_true",
+        help="Use already running services on the same ports",
+    )
+    parser.add_argument(
+        "--api-pid", type=int, help="API process to sample with --no-spawn"
+    )
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline results JSON to diff against")
+    parser.add_argument("--verbose", action="store_true", help="Show service logs")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Mock Pipedream Connect server for load tests.
+
+Covers the endpoints the engine and API hit through the Pipedream SDK:
+OAuth token exchange, connected accounts, connect tokens and the app catalog.
+Point the SDK at it with PIPEDREAM_BASE_URL.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+
+import uvicorn
+from fastapi import FastAPI
+
+app = FastAPI(title="Mock Pipedream Server")
+
+CATALOG = [
+    {"name_slug": slug, "name": slug.replace("_", " ").title()}
+    for slug in ["gmail", "google_docs", "google_sheets", "slack", "notion", "todoist"]
+]
+
+
+def page(data: list) -> dict:
+    return {"data": data, "page_info": {"count": len(data), "total_count": len(data)}}
+
+
+@app.post("/v1/oauth/token")
+async def oauth_token():
+    return {
+        "access_token": "mock-access-token",
+        "token_type": "Bearer",
+        "expires_in": 3600,
+    }
+
+
+@app.get("/v1/connect/{project_id}/accounts")
+async def list_accounts(project_id: str, app: str = "", external_user_id: str = ""):
+    # Every app is connected so runs never stop at oauth_required
+    return page([{"id": f"apn_{app or 'any'}", "name": app, "healthy": True}])
+
+
+@app.post("/v1/connect/{project_id}/tokens")
+async def create_token(project_id: str):
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+    return {
+        "token": "ctok_mock",
+        "connect_link_url": "http://localhost/connect?token=ctok_mock",
+        "expires_at": expires_at.isoformat(),
+    }
+
+
+@app.get("/v1/connect/apps")
+async def list_apps(q: str = ""):
+    data = [
+        {
+            **entry,
+            "img_src": f"https://assets.example.com/{entry['name_slug']}.png",
+            "categories": [],
+            "featured_weight": 0,
+        }
+        for entry in CATALOG
+        if q.lower() in entry["name"].lower()
+    ]
+    return page(data)
+
+
+if __name__ == "__main__":
+    uvicorn.run(
+        app, host="127.0.0.1", port=int(os.getenv("PORT", "9102")), log_level="warning"
+    )
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Mock OpenAI Responses server for load tests.
+
+Speaks just enough of the streaming Responses API for `LLM.stream`:
+- Planner calls (structured output) get a fixed plan: a main function with
+  BENCH_STATEMENTS sequential statements.
+- Interpreter calls get a short assistant message streamed as BENCH_DELTAS deltas.
+
+Latency is simulated with BENCH_LLM_LATENCY_MS (time to first token) and
+BENCH_DELTA_INTERVAL_MS (gap between deltas).
+"""
+
+import asyncio
+import json
+import os
+import time
+from uuid import uuid4
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+STATEMENTS = int(os.getenv("BENCH_STATEMENTS", "3"))
+DELTAS = int(os.getenv("BENCH_DELTAS", "8"))
+LATENCY_MS = float(os.getenv("BENCH_LLM_LATENCY_MS", "200"))
+DELTA_INTERVAL_MS = float(os.getenv("BENCH_DELTA_INTERVAL_MS", "10"))
+
+app = FastAPI(title="Mock Responses Server")
+
+
+def build_plan() -> dict:
+    """Plan returned to the planner for every file."""
+    statements = [
+        {"text": f"use email to send update number {i + 1}", "is_parallel": False}
+        for i in range(STATEMENTS)
+    ]
+    return {
+        "resources": [
+            {
+                "id": "bench-main",
+                "name": "bench-main",
+                "type": "amt_function",
+                "is_main": True,
+                "code": None,
+                "blocks": [{"type": "sequence", "statements": statements}],
+            }
+        ]
+    }
+
+
+def sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+def response_obj(response_id: str, model: str, status: str, output: list) -> dict:
+    return {
+        "id": response_id,
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": model,
+        "status": status,
+        "output": output,
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+    }
+
+
+async def stream_message(model: str, text: str):
+    """Stream `text` as a single assistant message."""
+    response_id = f"resp_{uuid4().hex}"
+    item_id = f"msg_{uuid4().hex}"
+    seq = 0
+
+    def next_seq():
+        nonlocal seq
+        seq += 1
+        return seq
+
+    yield sse(
+        {
+            "type": "response.created",
+            "sequence_number": next_seq(),
+            "response": response_obj(response_id, model, "in_progress", []),
+        }
+    )
+    await asyncio.sleep(LATENCY_MS / 1000)
+
+    item = {
+        "type": "message",
+        "id": item_id,
+        "role": "assistant",
+        "status": "in_progress",
+        "content": [],
+    }
+    yield sse(
+        {
+            "type": "response.output_item.added",
+            "sequence_number": next_seq(),
+            "output_index": 0,
+            "item": item,
+        }
+    )
+    yield sse(
+        {
+            "type": "response.content_part.added",
+            "sequence_number": next_seq(),
+            "item_id": item_id,
+            "output_index": 0,
+            "content_index": 0,
+            "part": {"type": "output_text", "text": "", "annotations": []},
+        }
+    )
+
+    chunk_size = max(1, len(text) // max(1, DELTAS))
+    for start in range(0, len(text), chunk_size):
+        yield sse(
+            {
+                "type": "response.output_text.delta",
+                "sequence_number": next_seq(),
+                "item_id": item_id,
+                "output_index": 0,
+                "content_index": 0,
+                "delta": text[start : start + chunk_size],
+                "logprobs": [],
+            }
+        )
+        await asyncio.sleep(DELTA_INTERVAL_MS / 1000)
+
+    final_item = {
+        **item,
+        "status": "completed",
+        "content": [{"type": "output_text", "text": text, "annotations": []}],
+    }
+    yield sse(
+        {
+            "type": "response.completed",
+            "sequence_number": next_seq(),
+            "response": response_obj(response_id, model, "completed", [final_item]),
+        }
+    )
+
+
+@app.post("/v1/responses")
+async def create_response(request: Request):
+    body = await request.json()
+    model = body.get("model", "gpt-5-mini")
+    is_planner = bool((body.get("text") or {}).get("format"))
+    text = (
+        json.dumps(build_plan())
+        if is_planner
+        else "Done. The update was sent successfully."
+    )
+    return StreamingResponse(
+        stream_message(model, text), media_type="text/event-stream"
+    )
+
+
+if __name__ == "__main__":
+    uvicorn.run(
+        app, host="127.0.0.1", port=int(os.getenv("PORT", "9101")), log_level="warning"
+    )
@@ -0,0 +1,164 @@
+"""Database connection pool and off-loop execution.
+
+DAO functions are synchronous psycopg2 code. They borrow connections from a
+process-wide pool and must be called through `run_db` (or `SerialWriter`) from
+async code so they run on the DB thread pool instead of the event loop.
+
+Configuration:
+- DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE: pool bounds (default 1 / 10)
+- DB_PREPARED_STATEMENTS: set to 0 behind a transaction-mode pooler
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Iterator
+
+import psycopg2.extensions
+from amethyst_engine.tracing import current_span, span
+from psycopg2.pool import ThreadedConnectionPool
+
+logger = logging.getLogger(__name__)
+
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+USE_PREPARED_STATEMENTS = os.getenv("DB_PREPARED_STATEMENTS", "1") != "0"
+
+
+class _Connection(psycopg2.extensions.connection):
+    """Connection that remembers which statements it has prepared."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared: set[str] = set()
+
+
+_pool: ThreadedConnectionPool | None = None
+_pool_slots = threading.BoundedSemaphore(POOL_MAX_SIZE)
+_pool_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_pool() -> ThreadedConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadedConnectionPool(
+                    POOL_MIN_SIZE,
+                    POOL_MAX_SIZE,
+                    connection_factory=_Connection,
+                    user=os.getenv("PGUSER", "postgres"),
+                    password=os.getenv("PGPASSWORD"),
+                    host=os.getenv("PGHOST", "localhost"),
+                    database=os.getenv("PGDATABASE", "amethyst"),
+                    port=int(os.getenv("PGPORT", "5432")),
+                )
+    return _pool
+
+
+@contextmanager
+def connection() -> Iterator[_Connection]:
+    """Borrow pooled connection; commits on success, rolls back on error.
+
+    Blocks while all POOL_MAX_SIZE connections are in use.
+    """
+    with _pool_slots:
+        pool = _get_pool()
+        conn = pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            pool.putconn(conn, close=bool(conn.closed))
+
+
+def execute(cursor, name: str, sql: str, params: tuple = ()) -> None:
+    """Execute `sql` (with %s placeholders) as the prepared statement `name`.
+
+    The statement is prepared once per pooled connection; `name` must always be
+    used with the same SQL.
+    """
+    if not USE_PREPARED_STATEMENTS:
+        cursor.execute(sql, params)
+        return
+
+    conn = cursor.connection
+    if name not in conn.prepared:
+        head, *rest = sql.split("%s")
+        prepared_sql = head + "".join(f"${i}{part}" for i, part in enumerate(rest, 1))
+        cursor.execute(f"PREPARE {name} AS {prepared_sql}")
+        conn.prepared.add(name)
+    if params:
+        cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+    else:
+        cursor.execute(f"EXECUTE {name}")
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=POOL_MAX_SIZE, thread_name_prefix="db"
+        )
+    return _executor
+
+
+async def run_db(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run blocking DAO call on the DB thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), partial(fn, *args, **kwargs))
+
+
+class SerialWriter:
+    """Applies DAO writes in submission order without blocking the caller.
+
+    For synchronous callbacks (e.g. Engine.save_task) running on the event loop:
+    `submit` returns immediately and `flush` waits for every queued write.
+    Failed writes are logged and do not stop later ones. Each write is traced
+    as a `db.write` span under the span that submitted it.
+    """
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._drain())
+        self._queue.put_nowait((partial(fn, *args, **kwargs), current_span()))
+
+    async def _drain(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:  # Queued by flush: every earlier write is done
+                self._queue.task_done()
+                return
+            write, parent = item
+            try:
+                with span("db.write", {"db.operation": write.func.__name__}, parent):
+                    await run_db(write)
+            except Exception as e:
+                logger.error(f"Database write {write.func.__name__} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def flush(self):
+        """Wait for queued writes; the worker stops after the last one.
+
+        If the wait is cancelled, the worker still finishes the queued writes
+        and then stops.
+        """
+        worker, self._worker = self._worker, None
+        if worker is None:
+            return
+        self._queue.put_nowait(None)
+        await asyncio.shield(worker)
@@ -1,19 +1,36 @@
 """Amethyst API Server."""
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 
+from amethyst_engine.resilience import breaker_metrics
+from amethyst_engine.scheduler import scheduler_metrics
+from amethyst_engine.tracing import get_tracer
 from app_routes import router as app_router
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from resource_routes import pipedream_catalog
 from resource_routes import router as resource_router
+from run_manager import run_manager
 
 # Load .env from monorepo root (searches parent directories)
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI(title="Amethyst API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    catalog_refresh = asyncio.create_task(pipedream_catalog.run())
+    yield
+    catalog_refresh.cancel()
+    await run_manager.shutdown()
+    await asyncio.to_thread(get_tracer().shutdown)
+
+
+app = FastAPI(title="Amethyst API", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -35,3 +52,13 @@ app.include_router(resource_router)
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Process-level engine metrics."""
+    return {
+        "circuit_breakers": breaker_metrics(),
+        "runs": run_manager.metrics(),
+        "scheduler": scheduler_metrics(),
+    }
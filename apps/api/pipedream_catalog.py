@@ -0,0 +1,163 @@
+"""Local mirror of the Pipedream app catalog for typeahead search.
+
+The catalog is fetched in the background (PIPEDREAM_CATALOG_REFRESH_SECONDS,
+default 6h) and snapshotted to PIPEDREAM_CATALOG_PATH so a restarted process can
+answer searches before its first refresh. Only a cold start with neither a
+snapshot nor a finished refresh sends searches to Pipedream's live search.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path.home() / ".cache" / "amethyst" / "pipedream_apps.json"
+REFRESH_SECONDS = float(os.getenv("PIPEDREAM_CATALOG_REFRESH_SECONDS", "21600"))
+RETRY_SECONDS = 60.0
+MAX_PREFIX_LEN = 20
+
+_WORD_SPLIT = re.compile(r"[^a-z0-9]+")
+
+
+def _words(text: str) -> list[str]:
+    return [w for w in _WORD_SPLIT.split(text.lower()) if w]
+
+
+class CatalogIndex:
+    """Ranked search over catalog entries ({"name_slug", "name", "img_src", ...}).
+
+    Ranking: exact name/slug match, then name/slug prefix, then every query word
+    prefixing a word of the name/slug, then plain substring matches. Ties go to
+    Pipedream's featured_weight, then shorter names.
+    """
+
+    def __init__(self, entries: list[dict]):
+        self.entries = entries
+        self._names = [e["name"].lower() for e in entries]
+        self._slugs = [e["name_slug"].lower() for e in entries]
+        self._words = [set(_words(e["name"]) + _words(e["name_slug"])) for e in entries]
+        self._prefixes: dict[str, set[int]] = {}
+        for idx, words in enumerate(self._words):
+            for word in words:
+                for end in range(1, min(len(word), MAX_PREFIX_LEN) + 1):
+                    self._prefixes.setdefault(word[:end], set()).add(idx)
+        self._featured = sorted(entries, key=lambda e: -(e.get("featured_weight") or 0))
+
+    def _rank(self, idx: int, query: str, query_words: list[str]) -> tuple:
+        name, slug = self._names[idx], self._slugs[idx]
+        if query in (name, slug):
+            score = 0
+        elif name.startswith(query) or slug.startswith(query):
+            score = 1
+        elif all(any(w.startswith(q) for w in self._words[idx]) for q in query_words):
+            score = 2
+        else:
+            score = 3
+        entry = self.entries[idx]
+        return (score, -(entry.get("featured_weight") or 0), len(name), name)
+
+    def _word_matches(self, words: list[str]) -> set[int]:
+        matches = None
+        for word in words:
+            ids = self._prefixes.get(word[:MAX_PREFIX_LEN], set())
+            if len(word) > MAX_PREFIX_LEN:
+                ids = {
+                    i for i in ids if word in self._names[i] or word in self._slugs[i]
+                }
+            matches = ids if matches is None else matches & ids
+        return matches or set()
+
+    def search(self, query: str, limit: int = 50) -> list[dict]:
+        query = query.strip().lower()
+        if not query:
+            return self._featured[:limit]
+
+        query_words = _words(query)
+        candidates = self._word_matches(query_words)
+        if len(candidates) < limit:
+            # Infix matches ("mail" in "gmail") aren't in the prefix index
+            candidates |= {
+                i
+                for i in range(len(self.entries))
+                if query in self._names[i] or query in self._slugs[i]
+            }
+        ranked = sorted(candidates, key=lambda i: self._rank(i, query, query_words))
+        return [self.entries[i] for i in ranked[:limit]]
+
+
+class PipedreamCatalog:
+    """Periodically refreshed catalog snapshot with a local search index."""
+
+    def __init__(
+        self,
+        fetch_apps: Callable[[], list[dict]],
+        path: Path | None = None,
+        refresh_seconds: float = REFRESH_SECONDS,
+        search_apps: Callable[[str, int], list[dict]] | None = None,
+    ):
+        """`search_apps(query, limit)` is the live search used until the index is loaded."""
+        self.fetch_apps = fetch_apps
+        self.search_apps = search_apps
+        self.path = path or Path(os.getenv("PIPEDREAM_CATALOG_PATH", DEFAULT_PATH))
+        self.refresh_seconds = refresh_seconds
+        self.index = CatalogIndex([])
+        self.refreshed_at = 0.0
+
+    def load_snapshot(self) -> None:
+        """Load last persisted catalog, if any; a bad one waits for the next refresh."""
+        try:
+            snapshot = json.loads(self.path.read_text())
+            index = CatalogIndex(snapshot["apps"])
+            refreshed_at = float(snapshot["refreshed_at"])
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable Pipedream catalog snapshot: {e!r}")
+            return
+        self.index = index
+        self.refreshed_at = refreshed_at
+
+    def refresh(self) -> None:
+        """Fetch the full catalog (blocking), swap the index and persist it."""
+        entries = self.fetch_apps()
+        self.index = CatalogIndex(entries)
+        self.refreshed_at = time.time()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(
+                json.dumps({"refreshed_at": self.refreshed_at, "apps": entries})
+            )
+            tmp_path.replace(self.path)
+        except OSError as e:
+            logger.warning(f"Failed to persist Pipedream catalog: {e}")
+        logger.info(f"Pipedream catalog refreshed: {len(entries)} apps")
+
+    async def run(self) -> None:
+        """Keep the catalog fresh; runs until cancelled."""
+        await asyncio.to_thread(self.load_snapshot)
+        while True:
+            delay = self.refreshed_at + self.refresh_seconds - time.time()
+            if delay <= 0:
+                try:
+                    await asyncio.to_thread(self.refresh)
+                    delay = self.refresh_seconds
+                except Exception as e:
+                    logger.warning(f"Pipedream catalog refresh failed: {e}")
+                    delay = RETRY_SECONDS
+            await asyncio.sleep(delay)
+
+    async def search(self, query: str, limit: int = 50) -> list[dict]:
+        if self.index.entries or not self.search_apps:
+            return self.index.search(query, limit)
+        try:
+            return await asyncio.to_thread(self.search_apps, query, limit)
+        except Exception as e:
+            logger.warning(f"Live Pipedream search failed: {e}")
+            return []
@@ -0,0 +1,38 @@
+"""Compiled plan persistence DAO."""
+
+from datetime import datetime, timezone
+
+from db import connection, execute
+from psycopg2.extras import RealDictCursor
+
+
+def get_compiled_plan(app_id: str) -> dict | None:
+    """Get app's compiled plan (CompiledPlan fields), if any."""
+    with connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+        execute(
+            cur,
+            "get_compiled_plan",
+            "SELECT json_obj FROM compiled_plan WHERE app_id = %s",
+            (app_id,),
+        )
+        row = cur.fetchone()
+        return row["json_obj"] if row else None
+
+
+def save_compiled_plan(app_id: str, version: int, files_hash: str, json_str: str):
+    """Insert or replace app's compiled plan."""
+    with connection() as conn, conn.cursor() as cur:
+        execute(
+            cur,
+            "save_compiled_plan",
+            """
+            INSERT INTO compiled_plan (app_id, version, files_hash, json_obj, updated_at)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (app_id) DO UPDATE SET
+              version = EXCLUDED.version,
+              files_hash = EXCLUDED.files_hash,
+              json_obj = EXCLUDED.json_obj,
+              updated_at = EXCLUDED.updated_at
+            """,
+            (app_id, version, files_hash, json_str, datetime.now(timezone.utc)),
+        )
@@ -1,10 +1,13 @@
 """Resource API routes."""
 
 import os
+from itertools import islice
 
 from amethyst_engine.app import Resource
-from fastapi import APIRouter, HTTPException, Request
+from db import run_db
+from fastapi import APIRouter, HTTPException, Query, Request
 from pipedream import Pipedream
+from pipedream_catalog import PipedreamCatalog
 from resources_dao import (
     create_resource,
     delete_resource,
@@ -36,19 +39,49 @@ def get_pd_client():
     return _pd_client
 
 
+def _catalog_entry(app) -> dict:
+    return {
+        "name_slug": app.name_slug,
+        "name": app.name,
+        "img_src": getattr(app, "img_src", None),
+        "featured_weight": getattr(app, "featured_weight", 0),
+    }
+
+
+def fetch_pipedream_apps() -> list[dict]:
+    """Fetch the whole Pipedream app catalog (paginated, blocking)."""
+    return [_catalog_entry(app) for app in get_pd_client().apps.list(limit=100)]
+
+
+def search_pipedream_apps(q: str, limit: int) -> list[dict]:
+    """Pipedream's own app search (blocking), for before the catalog is loaded."""
+    apps = get_pd_client().apps.list(q=q, limit=limit)
+    return [_catalog_entry(app) for app in islice(apps, limit)]
+
+
+# Refreshed in the background by main's lifespan
+pipedream_catalog = PipedreamCatalog(
+    fetch_pipedream_apps, search_apps=search_pipedream_apps
+)
+
+
 @router.get("/")
 async def list_resources_endpoint():
     """List all resources."""
-    return list_resources()
+    return await run_db(list_resources)
 
 
 @router.get("/search")
-async def search_resources_endpoint(q: str = ""):
-    """Search resources from Pipedream and saved resources, dedupe by ID (prefer Pipedream)."""
+async def search_resources_endpoint(q: str = "", limit: int = Query(50, ge=1, le=200)):
+    """Search resources from Pipedream and saved resources, dedupe by ID (prefer Pipedream).
+
+    Pipedream apps come from the local catalog mirror (a live search only until
+    the mirror is first loaded).
+    """
     resources_map = {}
 
     # Search saved resources at DB level (efficient)
-    saved_resources = search_resources_db(q)
+    saved_resources = await run_db(search_resources_db, q, limit)
     for resource in saved_resources:
         resources_map[resource.get("id")] = Resource(
             id=resource.get("id"),
@@ -59,20 +92,14 @@ async def search_resources_endpoint(q: str = ""):
         )
 
     # Get Pipedream apps (will override saved resources with same ID)
-    try:
-        pd_client = get_pd_client()
-        apps = pd_client.apps.list(q=q)
-        for app in apps:
-            resources_map[app.name_slug] = Resource(
-                id=app.name_slug,
-                name=app.name,
-                type="tool",
-                provider="pipedream",
-                img_url=app.img_src if hasattr(app, "img_src") else None,
-            )
-    except Exception:
-        # If Pipedream fails, continue with saved resources
-        pass
+    for app in await pipedream_catalog.search(q, limit):
+        resources_map[app["name_slug"]] = Resource(
+            id=app["name_slug"],
+            name=app["name"],
+            type="tool",
+            provider="pipedream",
+            img_url=app["img_src"],
+        )
 
     return [r.model_dump() for r in resources_map.values()]
 
@@ -85,14 +112,14 @@ async def create_resource_endpoint(request: Request):
     resource_id = resource.id
     if not resource_id:
         raise HTTPException(status_code=400, detail="Resource ID is required")
-    create_resource(resource_id, resource.model_dump())
+    await run_db(create_resource, resource_id, resource.model_dump())
     return {"id": resource_id}
 
 
 @router.get("/{resource_id}")
 async def get_resource_endpoint(resource_id: str):
     """Get resource by ID."""
-    json_obj = get_resource(resource_id)
+    json_obj = await run_db(get_resource, resource_id)
     if not json_obj:
         raise HTTPException(status_code=404, detail="Resource not found")
     return {"id": resource_id, **json_obj}
@@ -101,5 +128,5 @@ async def get_resource_endpoint(resource_id: str):
 @router.delete("/{resource_id}")
 async def delete_resource_endpoint(resource_id: str):
     """Delete resource by ID."""
-    delete_resource(resource_id)
+    await run_db(delete_resource, resource_id)
     return {"message": "Resource deleted"}
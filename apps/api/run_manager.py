@@ -0,0 +1,219 @@
+"""In-process run lifecycle management.
+
+Runs execute as background tasks owned by the RunManager rather than by the
+HTTP request that started them, so a dropped client doesn't stop a run. Each
+run keeps its event history until AMETHYST_RUN_RETENTION_SECONDS after it
+finishes, letting clients (re)subscribe from any point. At most
+AMETHYST_MAX_CONCURRENT_RUNS runs execute at once; the rest wait as "queued".
+
+Events are serialized once when published and the same SSE frame is shared by
+the history and every subscriber. The history keeps the last
+AMETHYST_RUN_EVENT_WINDOW events; older ones can no longer be replayed. A
+subscriber that falls AMETHYST_SUBSCRIBER_QUEUE_SIZE events behind is
+disconnected and can resume from its Last-Event-ID within the window.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_RUNS = int(os.getenv("AMETHYST_MAX_CONCURRENT_RUNS", "8"))
+RUN_RETENTION_SECONDS = float(os.getenv("AMETHYST_RUN_RETENTION_SECONDS", "300"))
+RUN_EVENT_WINDOW = int(os.getenv("AMETHYST_RUN_EVENT_WINDOW", "10000"))
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("AMETHYST_SUBSCRIBER_QUEUE_SIZE", "1000"))
+
+TERMINAL_STATUSES = ("completed", "failed", "oauth_required", "cancelled")
+
+try:
+    import orjson
+
+    def encode_event(event: dict) -> bytes:
+        return orjson.dumps(event)
+
+except ImportError:  # pragma: no cover - orjson is a declared dependency
+
+    def encode_event(event: dict) -> bytes:
+        return json.dumps(event, separators=(",", ":")).encode()
+
+
+def event_frame(event: dict) -> bytes:
+    """SSE `data:` frame for `event` (without an `id:` line)."""
+    return b"data: " + encode_event(event) + b"\n\n"
+
+
+@dataclass
+class Run:
+    """A run's status and recent events (as encoded SSE frames) with live subscribers.
+
+    Events are numbered from 0 in publish order; `events` holds the last
+    RUN_EVENT_WINDOW of them, ending at number `published - 1`.
+    """
+
+    id: str
+    app_id: str
+    status: str = "queued"
+    events: Deque[bytes] = field(default_factory=lambda: deque(maxlen=RUN_EVENT_WINDOW))
+    published: int = 0
+    subscribers: Set[asyncio.Queue] = field(default_factory=set)
+    task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def publish(self, event: dict) -> None:
+        """Record event and fan it out to subscribers (usable as Engine.send_update)."""
+        frame = event_frame(event)
+        self.events.append(frame)
+        self.published += 1
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self._disconnect(queue)
+
+    def finish(self, status: str) -> None:
+        self.status = status
+        self.publish({"type": "run_finished", "run_id": self.id, "status": status})
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(None)
+            except asyncio.QueueFull:
+                self._disconnect(queue)
+
+    def _disconnect(self, queue: asyncio.Queue) -> None:
+        """End a subscriber that can't keep up; it resumes from the history."""
+        logger.warning(f"Disconnecting slow subscriber of run {self.id}")
+        self.subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def _backlog(self, after: int) -> list[tuple[int, bytes]]:
+        """(index, frame) of retained events from `after` on."""
+        first = self.published - len(self.events)
+        skip = max(0, after - first)
+        return [
+            (first + skip + i, frame)
+            for i, frame in enumerate(islice(self.events, skip, None))
+        ]
+
+    async def subscribe(self, after: int = 0) -> AsyncIterator[tuple[int, bytes]]:
+        """Yield (index, frame) from event `after` on, then live until the run ends.
+
+        Events that have left the history are skipped. The stream also ends,
+        before the run does, if this subscriber falls too far behind.
+        """
+        backlog = self._backlog(after)
+        if self.done:
+            for item in backlog:
+                yield item
+            return
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        index = self.published
+        try:
+            for item in backlog:
+                yield item
+            while True:
+                frame = await queue.get()
+                if frame is None:
+                    return
+                yield index, frame
+                index += 1
+        finally:
+            self.subscribers.discard(queue)
+
+
+class RunManager:
+    """Starts runs in the background with bounded concurrency."""
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENT_RUNS,
+        retention_seconds: float = RUN_RETENTION_SECONDS,
+    ):
+        self.max_concurrency = max_concurrency
+        self.retention_seconds = retention_seconds
+        self.runs: Dict[str, Run] = {}
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    def get(self, run_id: str) -> Optional[Run]:
+        return self.runs.get(run_id)
+
+    def start(
+        self,
+        run_id: str,
+        app_id: str,
+        execute: Callable[[Run], Awaitable[str]],
+        on_status: Optional[Callable[[Run], Awaitable[None]]] = None,
+    ) -> Run:
+        """Schedule `execute(run)`, which returns the run's final status.
+
+        `on_status` is awaited whenever the run's status changes (e.g. to persist it).
+        """
+        run = Run(id=run_id, app_id=app_id)
+        self.runs[run_id] = run
+        run.task = asyncio.create_task(self._execute(run, execute, on_status))
+        return run
+
+    async def _execute(
+        self,
+        run: Run,
+        execute: Callable[[Run], Awaitable[str]],
+        on_status: Optional[Callable[[Run], Awaitable[None]]],
+    ) -> None:
+        status = "failed"
+        try:
+            async with self._slots:
+                run.status = "running"
+                await self._notify(run, on_status)
+                status = await execute(run)
+        except asyncio.CancelledError:
+            status = "cancelled"
+        except Exception as e:
+            logger.exception(f"Run {run.id} failed")
+            run.publish({"type": "error", "message": str(e)})
+        finally:
+            run.finish(status)
+            await self._notify(run, on_status)
+            asyncio.get_running_loop().call_later(
+                self.retention_seconds, self.runs.pop, run.id, None
+            )
+
+    async def _notify(
+        self, run: Run, on_status: Optional[Callable[[Run], Awaitable[None]]]
+    ) -> None:
+        if not on_status:
+            return
+        try:
+            await on_status(run)
+        except Exception as e:
+            logger.error(f"Failed to record status {run.status} of run {run.id}: {e}")
+
+    def metrics(self) -> dict:
+        statuses = [run.status for run in self.runs.values()]
+        return {
+            "max_concurrency": self.max_concurrency,
+            "running": statuses.count("running"),
+            "queued": statuses.count("queued"),
+            "retained": len(statuses),
+        }
+
+    async def shutdown(self) -> None:
+        """Cancel unfinished runs (marking them cancelled) and wait for them."""
+        tasks = [run.task for run in self.runs.values() if run.task and not run.done]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+run_manager = RunManager()
@@ -0,0 +1,244 @@
+"""Run and task persistence DAO.
+
+Tasks are upserted one row at a time as they change; AI calls and trace
+blobs are append-only (see schema.sql).
+"""
+
+import json
+from datetime import datetime, timezone
+
+from db import connection, execute
+from psycopg2.extras import RealDictCursor, execute_values
+
+
+def create_run(run_id: str, app_id: str, status: str = "queued"):
+    """Insert new run."""
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "INSERT INTO run (id, app_id, status) VALUES (%s, %s, %s)",
+            (run_id, app_id, status),
+        )
+
+
+def get_run_status(app_id: str, run_id: str) -> str | None:
+    """Get run status, or None if the app has no such run."""
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT status FROM run WHERE id = %s AND app_id = %s", (run_id, app_id)
+        )
+        row = cur.fetchone()
+        return row[0] if row else None
+
+
+def update_run_status(run_id: str, status: str):
+    """Update run status."""
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "UPDATE run SET status = %s, updated_at = %s WHERE id = %s",
+            (status, datetime.now(timezone.utc), run_id),
+        )
+
+
+def save_task(
+    app_id: str,
+    run_id: str | None,
+    task_obj: dict,
+    new_ai_calls: list[tuple[int, dict]],
+    new_blobs: dict[str, dict],
+):
+    """Upsert task row and append its new AI calls and trace blobs."""
+    with connection() as conn, conn.cursor() as cur:
+        execute(
+            cur,
+            "save_task",
+            """
+            INSERT INTO task (id, app_id, run_id, parent_task_id, json_obj, updated_at)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (id)
+            DO UPDATE SET json_obj = EXCLUDED.json_obj, updated_at = EXCLUDED.updated_at
+            """,
+            (
+                task_obj["id"],
+                app_id,
+                run_id,
+                task_obj.get("parent_task_id"),
+                json.dumps(task_obj),
+                datetime.now(timezone.utc),
+            ),
+        )
+        if new_blobs:
+            execute_values(
+                cur,
+                "INSERT INTO trace_blob (id, json_obj) VALUES %s "
+                "ON CONFLICT (id) DO NOTHING",
+                [(ref, json.dumps(blob)) for ref, blob in new_blobs.items()],
+            )
+        if new_ai_calls:
+            execute_values(
+                cur,
+                "INSERT INTO ai_call (task_id, seq, json_obj) VALUES %s "
+                "ON CONFLICT (task_id, seq) DO NOTHING",
+                [(task_obj["id"], seq, json.dumps(obj)) for seq, obj in new_ai_calls],
+            )
+
+
+def load_tasks(
+    app_id: str, run_id: str | None = None
+) -> tuple[list[dict], dict[str, list[dict]], dict[str, dict]]:
+    """Load (tasks, ai_calls by task id, trace blobs) for an app, or one of its runs."""
+    scope = "t.app_id = %s" + (" AND t.run_id = %s" if run_id else "")
+    params = (app_id, run_id) if run_id else (app_id,)
+    with connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            f"SELECT t.json_obj FROM task t WHERE {scope} ORDER BY t.created_at",
+            params,
+        )
+        tasks = [row["json_obj"] for row in cur.fetchall()]
+
+        cur.execute(
+            f"""
+            SELECT a.task_id, a.json_obj
+            FROM ai_call a JOIN task t ON t.id = a.task_id
+            WHERE {scope}
+            ORDER BY a.task_id, a.seq
+            """,
+            params,
+        )
+        ai_calls: dict[str, list[dict]] = {}
+        refs = set()
+        for row in cur.fetchall():
+            ai_calls.setdefault(row["task_id"], []).append(row["json_obj"])
+            refs.update(row["json_obj"].get("input_refs", []))
+
+        blobs = {}
+        if refs:
+            cur.execute(
+                "SELECT id, json_obj FROM trace_blob WHERE id = ANY(%s)", (list(refs),)
+            )
+            blobs = {row["id"]: row["json_obj"] for row in cur.fetchall()}
+
+        return tasks, ai_calls, blobs
+
+
+def list_runs(
+    app_id: str, limit: int = 50, before: tuple[datetime, str] | None = None
+) -> tuple[list[dict], tuple[datetime, str] | None]:
+    """List runs of an app, newest first, one keyset page at a time.
+
+    `before` is the (created_at, id) of the last run on the previous page.
+    Returns (runs, keyset for the next page or None).
+    """
+    keyset = "AND (created_at, id) < (%s, %s)" if before else ""
+    with connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            f"""
+            SELECT id, status, created_at, updated_at
+            FROM run
+            WHERE app_id = %s {keyset}
+            ORDER BY created_at DESC, id DESC
+            LIMIT %s
+            """,
+            (app_id, *(before or ()), limit + 1),
+        )
+        rows = cur.fetchall()
+    return _page(rows, limit, "created_at")
+
+
+def list_tasks(
+    app_id: str,
+    parent_task_id: str,
+    limit: int = 50,
+    after: tuple[datetime, str] | None = None,
+) -> tuple[list[dict], tuple[datetime, str] | None]:
+    """List child tasks of a task (or the main task of a run) in creation order.
+
+    Tasks come without ai_calls; `child_count` and `ai_call_count` tell the
+    caller what can be expanded. `after` is the (created_at, id) of the last
+    task on the previous page. Returns (tasks, keyset for the next page or None).
+    """
+    keyset = "AND (t.created_at, t.id) > (%s, %s)" if after else ""
+    with connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            f"""
+            SELECT
+              t.json_obj,
+              t.created_at,
+              t.id,
+              (SELECT count(*) FROM task c WHERE c.parent_task_id = t.id)
+                AS child_count,
+              (SELECT count(*) FROM ai_call a WHERE a.task_id = t.id)
+                AS ai_call_count
+            FROM task t
+            WHERE t.app_id = %s AND t.parent_task_id = %s {keyset}
+            ORDER BY t.created_at, t.id
+            LIMIT %s
+            """,
+            (app_id, parent_task_id, *(after or ()), limit + 1),
+        )
+        rows = cur.fetchall()
+
+    rows, next_after = _page(rows, limit, "created_at")
+    tasks = [
+        {
+            **row["json_obj"],
+            "child_count": row["child_count"],
+            "ai_call_count": row["ai_call_count"],
+        }
+        for row in rows
+    ]
+    return tasks, next_after
+
+
+def task_in_run(app_id: str, run_id: str, task_id: str) -> bool:
+    """Whether the task exists and belongs to the app's run."""
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "SELECT 1 FROM task WHERE id = %s AND app_id = %s AND run_id = %s",
+            (task_id, app_id, run_id),
+        )
+        return cur.fetchone() is not None
+
+
+def load_task(
+    app_id: str, task_id: str
+) -> tuple[dict, list[dict], dict[str, dict]] | None:
+    """Load (task, ai_calls, trace blobs) for one task, or None if not found."""
+    with connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+        execute(
+            cur,
+            "load_task",
+            "SELECT json_obj FROM task WHERE id = %s AND app_id = %s",
+            (task_id, app_id),
+        )
+        row = cur.fetchone()
+        if not row:
+            return None
+
+        execute(
+            cur,
+            "load_task_ai_calls",
+            "SELECT json_obj FROM ai_call WHERE task_id = %s ORDER BY seq",
+            (task_id,),
+        )
+        ai_calls = [r["json_obj"] for r in cur.fetchall()]
+
+        refs = list({ref for ac in ai_calls for ref in ac.get("input_refs", [])})
+        blobs = {}
+        if refs:
+            execute(
+                cur,
+                "load_trace_blobs",
+                "SELECT id, json_obj FROM trace_blob WHERE id = ANY(%s)",
+                (refs,),
+            )
+            blobs = {r["id"]: r["json_obj"] for r in cur.fetchall()}
+
+        return row["json_obj"], ai_calls, blobs
+
+
+def _page(rows: list, limit: int, key: str) -> tuple[list, tuple | None]:
+    """Trim a LIMIT n+1 result to n rows and return the next page's keyset."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1][key], rows[-1]["id"])
@@ -0,0 +1,75 @@
+-- Amethyst API schema (PostgreSQL). Safe to re-run.
+
+CREATE TABLE IF NOT EXISTS app (
+  id VARCHAR(50) PRIMARY KEY,
+  json_obj JSONB,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+-- Keyset pagination for GET /apps/
+CREATE INDEX IF NOT EXISTS app_updated_at_idx ON app (updated_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS resource (
+  id VARCHAR(255) PRIMARY KEY,
+  json_obj JSONB
+);
+
+-- Trigram index for ILIKE '%q%' resource search. Skipped (search still works,
+-- unindexed) where pg_trgm isn't installed.
+DO $$
+BEGIN
+  CREATE EXTENSION IF NOT EXISTS pg_trgm;
+  CREATE INDEX IF NOT EXISTS resource_name_trgm_idx
+    ON resource USING gin ((json_obj->>'name') gin_trgm_ops);
+EXCEPTION WHEN undefined_file OR feature_not_supported OR insufficient_privilege THEN
+  RAISE NOTICE 'pg_trgm unavailable, resource name search is not indexed';
+END $$;
+
+-- Runs and their tasks, written incrementally while the engine executes
+
+CREATE TABLE IF NOT EXISTS run (
+  id VARCHAR(50) PRIMARY KEY,
+  app_id VARCHAR(50) NOT NULL,
+  status VARCHAR(20) NOT NULL DEFAULT 'running',
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS run_app_id_idx ON run (app_id, created_at DESC);
+
+CREATE TABLE IF NOT EXISTS task (
+  id VARCHAR(100) PRIMARY KEY,
+  app_id VARCHAR(50) NOT NULL,
+  run_id VARCHAR(50),
+  parent_task_id VARCHAR(100),
+  json_obj JSONB,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS task_app_id_idx ON task (app_id);
+CREATE INDEX IF NOT EXISTS task_run_id_idx ON task (run_id);
+-- Keyset pagination of a task's children (and a run's main task)
+CREATE INDEX IF NOT EXISTS task_parent_task_id_idx
+  ON task (parent_task_id, created_at, id);
+
+-- Append-only: one row per AI call, never rewritten
+CREATE TABLE IF NOT EXISTS ai_call (
+  task_id VARCHAR(100) NOT NULL,
+  seq INTEGER NOT NULL,
+  json_obj JSONB,
+  PRIMARY KEY (task_id, seq)
+);
+
+-- Content-addressed AI call input messages (see Memory.trace_blobs)
+CREATE TABLE IF NOT EXISTS trace_blob (
+  id VARCHAR(64) PRIMARY KEY,
+  json_obj JSONB
+);
+
+-- Planner output per app, reused by runs while the app's files are unchanged
+-- (see amethyst_engine.compiled_plan)
+CREATE TABLE IF NOT EXISTS compiled_plan (
+  app_id VARCHAR(50) PRIMARY KEY,
+  version INTEGER NOT NULL,
+  files_hash VARCHAR(64) NOT NULL,
+  json_obj JSONB,
+  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
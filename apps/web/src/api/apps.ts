@@ -33,19 +33,47 @@ interface App {
   workspaceId?: string;
 }
 
-const processLine = (line: string, callbacks: AppRunCallbacks) => {
+// task_updated events are deltas: changed fields plus ai_calls appended since
+// the task's previous event, whose input messages are trace blob refs
+interface RunStreamState {
+  tasks: Record<string, any>;
+  refs: Record<string, string[]>;
+  blobs: Record<string, any>;
+}
+
+const applyTaskUpdate = (state: RunStreamState, data: any) => {
+  const task = { ...state.tasks[data.task.id], ...data.task };
+  Object.assign(state.blobs, data.trace_blobs);
+
+  if (data.ai_calls) {
+    let refs = state.refs[task.id] || [];
+    const aiCalls = data.ai_calls.map((aiCall: any) => {
+      refs = refs.slice(0, aiCall.inherited_refs).concat(aiCall.input_refs);
+      return { ...aiCall, input_messages: refs.map((ref) => state.blobs[ref]) };
+    });
+    state.refs[task.id] = refs;
+    task.ai_calls = (task.ai_calls || []).slice(0, data.ai_calls_start).concat(aiCalls);
+  }
+
+  state.tasks[task.id] = task;
+  return task;
+};
+
+const processLine = (line: string, state: RunStreamState, callbacks: AppRunCallbacks) => {
   if (!line.startsWith('data: ')) return;
 
   const data = JSON.parse(line.slice(6));
 
   if (data.type === 'progress' && callbacks.onProgress) {
     callbacks.onProgress(data.message);
-  } else if (data.type === 'task_created' && callbacks.onTaskCreated) {
-    callbacks.onTaskCreated(data.task);
+  } else if (data.type === 'task_created') {
+    state.tasks[data.task.id] = data.task;
+    callbacks.onTaskCreated?.(data.task);
   } else if (data.type === 'ai_intermediate_output' && callbacks.onAiIntermediateOutput) {
     callbacks.onAiIntermediateOutput(data.delta);
-  } else if (data.type === 'task_updated' && callbacks.onTaskUpdated) {
-    callbacks.onTaskUpdated(data.task);
+  } else if (data.type === 'task_updated') {
+    const task = applyTaskUpdate(state, data);
+    callbacks.onTaskUpdated?.(task);
   } else if (data.type === 'oauth_required' && callbacks.onOauthRequired) {
     callbacks.onOauthRequired(data);
   }
@@ -55,6 +83,7 @@ const readStream = async (
   reader: ReadableStreamDefaultReader<Uint8Array>,
   decoder: TextDecoder,
   buffer: string,
+  state: RunStreamState,
   callbacks: AppRunCallbacks
 ): Promise<void> => {
   const { done, value } = await reader.read();
@@ -64,9 +93,9 @@ const readStream = async (
   const lines = newBuffer.split('\n');
   const remainingBuffer = lines.pop() || '';
 
-  lines.forEach((line) => processLine(line, callbacks));
+  lines.forEach((line) => processLine(line, state, callbacks));
 
-  return readStream(reader, decoder, remainingBuffer, callbacks);
+  return readStream(reader, decoder, remainingBuffer, state, callbacks);
 };
 
 export async function createAppApi(app: any, workspaceId: string = '') {
@@ -81,15 +110,15 @@ export async function createAppApi(app: any, workspaceId: string = '') {
 }
 
 export async function runApp(appId: string, callbacks: AppRunCallbacks = {}) {
-  const response = await fetch(`${amethystApiPath}/apps/${appId}/runs`, {
-    method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
-  });
+  // Runs execute server-side; the events stream is only a subscription
+  const { data: run } = await axios.post(`${amethystApiPath}/apps/${appId}/runs`);
+  const response = await fetch(`${amethystApiPath}/apps/${appId}/runs/${run.id}/events`);
 
   const reader = response.body!.getReader();
   const decoder = new TextDecoder();
 
-  await readStream(reader, decoder, '', callbacks);
+  await readStream(reader, decoder, '', { tasks: {}, refs: {}, blobs: {} }, callbacks);
+  return run.id;
 }
 
 export async function getRun(appId: string, runId: string) {
@@ -97,8 +126,12 @@ export async function getRun(appId: string, runId: string) {
   return response.data;
 }
 
-export async function listApps() {
-  const response = await axios.get(`${amethystApiPath}/apps/`);
+export async function listApps(params?: {
+  limit?: number;
+  cursor?: string;
+  include?: string;
+}) {
+  const response = await axios.get(`${amethystApiPath}/apps/`, { params });
   return response.data;
 }
 
@@ -15,24 +15,33 @@ import EmptyState from '@/components/empty-state';
 import Iconify from '@/components/iconify';
 import { paths } from '@/routes/paths';
 
-interface AmtApp {
+interface AmtAppSummary {
   id: string;
+  name: string | null;
+  file_count: number;
+  resource_count: number;
+  last_run_status: string | null;
   files: any[];
-  resource_ids: string[];
-  workspaceId: string;
 }
 
 export default function AppsListView() {
   const router = useRouter();
 
-  const [apps, setApps] = useState<AmtApp[]>([]);
+  const [apps, setApps] = useState<AmtAppSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
 
-  useEffect(() => {
-    listApps().then((response) => {
-      setApps(response);
+  const loadApps = (cursor?: string) => {
+    setIsLoading(true);
+    listApps({ cursor, include: 'files' }).then((response) => {
+      setApps((prev) => (cursor ? [...prev, ...response.items] : response.items));
+      setNextCursor(response.next_cursor);
       setIsLoading(false);
     });
+  };
+
+  useEffect(() => {
+    loadApps();
   }, []);
 
   return (
@@ -97,8 +106,10 @@ export default function AppsListView() {
                 <Stack spacing={1.5}>
                   <Stack direction="row" alignItems="center" justifyContent="space-between">
                     <Typography variant="body2" color="text.secondary">
-                      {app.files.length} file{app.files.length !== 1 ? 's' : ''} •{' '}
-                      {app.resource_ids.length} resource{app.resource_ids.length !== 1 ? 's' : ''}
+                      {app.name ? `${app.name} • ` : ''}
+                      {app.file_count} file{app.file_count !== 1 ? 's' : ''} •{' '}
+                      {app.resource_count} resource{app.resource_count !== 1 ? 's' : ''}
+                      {app.last_run_status ? ` • last run ${app.last_run_status}` : ''}
                     </Typography>
                     <Iconify icon="eva:arrow-ios-forward-fill" width={20} />
                   </Stack>
@@ -127,6 +138,16 @@ export default function AppsListView() {
               </Card>
             );
           })}
+          {nextCursor && (
+            <Button
+              variant="outlined"
+              disabled={isLoading}
+              onClick={() => loadApps(nextCursor)}
+              sx={{ alignSelf: 'center' }}
+            >
+              Load more
+            </Button>
+          )}
         </Stack>
       )}
     </Container>
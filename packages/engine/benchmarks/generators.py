@@ -0,0 +1,137 @@
+"""Synthetic data generators for engine microbenchmarks.
+
+Sizes can be overridden for quick local runs, e.g.
+AMT_BENCH_SIZES=1000,10000 poetry run pytest benchmarks
+"""
+
+import json
+import os
+from types import SimpleNamespace
+from typing import List
+
+from amethyst_engine.app import AmtBlock, AmtFile, AppExpanded, ResourceExpanded, Statement
+from amethyst_engine.memory import AiCall, Memory, TaskExpanded, TaskType
+
+
+def _sizes(env_var: str, default: str) -> list[int]:
+    return [int(s) for s in os.getenv(env_var, default).split(",") if s]
+
+
+# Number of tasks in memory / calls in history
+TASK_SIZES = _sizes("AMT_BENCH_SIZES", "1000,10000,100000")
+
+# Resource upserts in Planner.parse are quadratic, so they get a smaller range
+RESOURCE_SIZES = _sizes("AMT_BENCH_RESOURCE_SIZES", "100,1000,5000")
+
+SYSTEM_PROMPT = "Interpret Amethyst code and execute it. " * 40
+
+
+def make_ai_call(turn: int) -> AiCall:
+    """AI call whose input grows with the turn number, like a real agent loop."""
+    history = [
+        {"role": "assistant", "content": f"Step {i}: looked up record {i} and summarized it."}
+        for i in range(turn)
+    ]
+    return AiCall(
+        input_messages=[{"role": "system", "content": SYSTEM_PROMPT}, *history],
+        intermediate_outputs=[
+            {"type": "message", "role": "assistant", "content": f"Result for turn {turn}"}
+        ],
+    )
+
+
+def make_tasks(n: int, parent_task_id: str = "task-root") -> List[TaskExpanded]:
+    """Statement tasks under one parent; every 10th is still async with no result."""
+    tasks = []
+    for i in range(n):
+        tasks.append(
+            TaskExpanded(
+                id=f"task-call_{i}",
+                parent_task_id=parent_task_id,
+                resource_name="",
+                task_type=TaskType.STATEMENT,
+                input=[{"doc": f"doc-{i}"}],
+                result=None if i % 10 == 0 else {"summary": f"summary of doc-{i}"},
+            )
+        )
+    return tasks
+
+
+def make_memory(n: int, parent_task_id: str = "task-root") -> Memory:
+    return Memory(tasks={t.id: t for t in make_tasks(n, parent_task_id)})
+
+
+def make_resources(n: int) -> List[ResourceExpanded]:
+    resources = [
+        ResourceExpanded(
+            id=f"res_{i}",
+            name=f"res_{i}",
+            type="amt_function",
+            provider="amethyst",
+            blocks=[
+                AmtBlock(type="sequence", statements=[Statement(text=f"use tool_{i} to work")])
+            ],
+        )
+        for i in range(n)
+    ]
+    resources[0].is_main = True
+    return resources
+
+
+def make_app(n_tasks: int, n_resources: int = 20, ai_calls_per_task: int = 0) -> AppExpanded:
+    memory = make_memory(n_tasks)
+    if ai_calls_per_task:
+        for task in memory.tasks.values():
+            for turn in range(ai_calls_per_task):
+                memory.record_ai_call(task, make_ai_call(turn))
+    return AppExpanded(
+        files=[AmtFile(content="main function bench\nuse email to send\nend function")],
+        resources=make_resources(n_resources),
+        workspaceId="bench",
+        memory=memory,
+    )
+
+
+def make_history(n_calls: int) -> list:
+    """Interpreter history with n call_amt_resource calls, each followed by its output."""
+    history = []
+    for i in range(n_calls):
+        history.append(
+            {
+                "type": "function_call",
+                "call_id": f"call_{i}",
+                "name": "call_amt_resource",
+                "arguments": json.dumps(
+                    {"resource_name": "summarize", "task_type": "amt_function", "input": []}
+                ),
+            }
+        )
+        history.append(
+            {"type": "function_call_output", "call_id": f"call_{i}", "output": "Async, pending..."}
+        )
+    return history
+
+
+def make_parse_response(n_resources: int):
+    """Stand-in for the planner's structured LLM response."""
+    from amethyst_engine.planner import ParsedBlock, ParsedResource, ParsedStatement, ParseResult
+
+    parsed = ParseResult(
+        resources=[
+            ParsedResource(
+                id=f"res_{i}",
+                name=f"res_{i}",
+                type="amt_function",
+                is_main=i == 0,
+                code=None,
+                blocks=[
+                    ParsedBlock(
+                        type="sequence",
+                        statements=[ParsedStatement(text=f"use tool_{i} to work")],
+                    )
+                ],
+            )
+            for i in range(n_resources)
+        ]
+    )
+    return SimpleNamespace(output_parsed=parsed)
@@ -0,0 +1,127 @@
+"""Microbenchmarks for pure-Python engine hot paths.
+
+Run with: poetry run pytest benchmarks --benchmark-only
+Compare across commits with --benchmark-autosave / --benchmark-compare.
+"""
+
+import json
+
+import pytest
+from generators import (
+    RESOURCE_SIZES,
+    TASK_SIZES,
+    make_ai_call,
+    make_app,
+    make_history,
+    make_parse_response,
+    make_resources,
+)
+
+from amethyst_engine.app import AmtBlock, AmtFile, ResourceExpanded
+from amethyst_engine.engine import Engine, EngineContext
+from amethyst_engine.interpreter import Interpreter
+from amethyst_engine.memory import AiCall, TaskExpanded, TaskType
+from amethyst_engine.planner import Planner
+
+SAVE_EXCLUDE = {"memory": {"tasks": {"__all__": {"async_task"}}}}
+
+
+@pytest.mark.parametrize("n", TASK_SIZES)
+def test_update_function_call_outputs(benchmark, n):
+    """Interpreter history refresh before every turn."""
+    app = make_app(n)
+    interpreter = Interpreter(send_update=None)
+    interpreter.history = make_history(n)
+
+    benchmark(interpreter._update_function_call_outputs, app)
+
+
+@pytest.mark.parametrize("n", TASK_SIZES)
+def test_task_to_dict_with_ai_calls(benchmark, n):
+    """task_updated payloads for every task in memory."""
+    app = make_app(n, ai_calls_per_task=3)
+    tasks = list(app.memory.tasks.values())
+
+    benchmark(lambda: [t.to_dict(include_ai_calls=True) for t in tasks])
+
+
+@pytest.mark.parametrize("n", TASK_SIZES)
+def test_wait_block_scan(benchmark, n, loop):
+    """`wait` block scanning Memory.tasks for async children of one function."""
+    app = make_app(n)
+    app.resources.append(
+        ResourceExpanded(
+            name="bench-wait",
+            type="amt_function",
+            provider="amethyst",
+            blocks=[AmtBlock(type="wait")],
+        )
+    )
+    func_task = TaskExpanded(
+        id="task-root", resource_name="bench-wait", task_type=TaskType.AMT_FUNCTION
+    )
+    app.memory.tasks[func_task.id] = func_task
+    for idx, task in enumerate(app.memory.tasks.values()):
+        if idx % 10 == 1:
+            future = loop.create_future()
+            future.set_result(None)
+            task.async_task = future
+
+    engine = Engine()
+    context = EngineContext(app=app)
+
+    benchmark(lambda: loop.run_until_complete(engine._execute_function(func_task, context)))
+
+
+@pytest.mark.parametrize("turns", [20, 100])
+def test_agent_task_updated_events(benchmark, turns):
+    """task_updated events (JSON-encoded) for one agent task over `turns` turns."""
+    ai_calls = [make_ai_call(turn) for turn in range(turns)]
+
+    def run_agent():
+        app = make_app(0)
+        task = TaskExpanded(resource_name="bench-agent", task_type=TaskType.AMT_AGENT)
+        app.memory.tasks[task.id] = task
+        encoded = []
+        engine = Engine(send_update=lambda event: encoded.append(json.dumps(event)))
+        context = EngineContext(app=app)
+        engine._task_created(task)
+        for ai_call in ai_calls:
+            app.memory.record_ai_call(task, ai_call.model_copy(deep=True))
+            engine._task_updated(task, context)
+        return sum(len(e) for e in encoded)
+
+    benchmark(run_agent)
+
+
+class _StubLLM:
+    def __init__(self, response):
+        self.response = response
+
+    async def stream(self, **kwargs):
+        return self.response, AiCall()
+
+
+class _StubProvider:
+    def enrich_resources(self, resources):
+        pass
+
+
+@pytest.mark.parametrize("n", RESOURCE_SIZES)
+def test_planner_resource_upserts(benchmark, n, loop):
+    """Planner.parse merging n parsed resources into an app that already has them."""
+    app = make_app(0, n_resources=n)
+    planner = Planner(_StubProvider(), send_update=None)
+    planner.llm = _StubLLM(make_parse_response(n))
+    amt_file = AmtFile(content="")
+
+    benchmark(lambda: loop.run_until_complete(planner.parse(amt_file, app)))
+
+
+@pytest.mark.parametrize("n", TASK_SIZES)
+def test_app_model_dump_json(benchmark, n):
+    """App serialization done by save_app_callback on every save."""
+    app = make_app(n, ai_calls_per_task=2)
+    app.resources = make_resources(20)
+
+    benchmark(app.model_dump_json, exclude=SAVE_EXCLUDE)
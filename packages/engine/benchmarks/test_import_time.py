@@ -0,0 +1,51 @@
+"""Cold-start budget for importing the engine.
+
+Every sample imports in a fresh interpreter. Fails if the median import time
+exceeds AMETHYST_IMPORT_BUDGET_MS (default 500) or if an SDK that should only
+load on first use is imported up front.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import pytest
+
+IMPORT_BUDGET_MS = float(os.getenv("AMETHYST_IMPORT_BUDGET_MS", "500"))
+LAZY_MODULES = ("openai", "pipedream", "a2a", "httpx", "dotenv")
+ROUNDS = 5
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed_ms = (time.perf_counter() - start) * 1000
+loaded = [name for name in {lazy_modules!r} if name in sys.modules]
+print(json.dumps({{"ms": elapsed_ms, "loaded": loaded}}))
+"""
+
+
+def cold_import(statement: str) -> dict:
+    probe = PROBE.format(statement=statement, lazy_modules=LAZY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", probe], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+@pytest.mark.parametrize(
+    "statement", ["import amethyst_engine", "from amethyst_engine import Engine"]
+)
+def test_cold_import(benchmark, statement):
+    samples = []
+    benchmark.pedantic(lambda: samples.append(cold_import(statement)), rounds=ROUNDS, iterations=1)
+    while len(samples) < ROUNDS:  # --benchmark-disable runs it once
+        samples.append(cold_import(statement))
+
+    assert samples[0]["loaded"] == []
+    median_ms = statistics.median(sample["ms"] for sample in samples)
+    assert median_ms <= IMPORT_BUDGET_MS, (
+        f"{statement!r} took {median_ms:.0f}ms (budget {IMPORT_BUDGET_MS:.0f}ms)"
+    )
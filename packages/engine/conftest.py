@@ -0,0 +1,16 @@
+"""Shared fixtures for engine unit tests and microbenchmarks."""
+
+import asyncio
+import os
+
+import pytest
+
+# LLM clients are constructed (never called) by the objects under test
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
@@ -1,16 +1,41 @@
 """Amethyst: AI-native programming language runtime."""
 
-# High-level API
-from .app import Resource
-from .engine import Engine
+from typing import TYPE_CHECKING
 
-# Legacy alias
-AmethystEngine = Engine
+if TYPE_CHECKING:
+    from .app import Resource
+    from .engine import Engine
+    from .hooks import EngineHooks
 
 __version__ = "0.1.0"
 
 __all__ = [
     "Engine",
     "AmethystEngine",
+    "EngineHooks",
     "Resource",
 ]
+
+# Public name -> (module, attribute). Imported on first access so that importing
+# the package doesn't load the LLM, Pipedream and HTTP client SDKs.
+_LAZY_ATTRIBUTES = {
+    "Engine": (".engine", "Engine"),
+    "AmethystEngine": (".engine", "Engine"),  # Legacy alias
+    "EngineHooks": (".hooks", "EngineHooks"),
+    "Resource": (".app", "Resource"),
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,18 +1,36 @@
 """Amethyst app and resource types."""
 
 from datetime import datetime
-from typing import List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
 from .memory import Memory
 
 
+class DirectCall(BaseModel):
+    """Statement bound to a resource call that needs no interpreter turn.
+
+    `arguments` values are literals or {"input": field} for a field of the
+    statement's input; `tool` is the MCP tool for integrations.
+    """
+
+    resource: str
+    tool: Optional[str] = None
+    arguments: Dict[str, Any] = {}
+
+
 class Statement(BaseModel):
     """Single statement in a function block."""
 
     text: str
     is_parallel: bool = False
+    # Only transforms its repeat item (no tools or resources): items can share a model call
+    batchable: bool = False
+    # Ids of the resources the statement names (None: unknown, offer every MCP server)
+    references: Optional[List[str]] = None
+    # Explicit call form bound to a resource at plan time (see dispatch.py)
+    call: Optional[DirectCall] = None
 
 
 class AmtBlock(BaseModel):
@@ -35,6 +53,8 @@ class Resource(ResourceLite):
     """Lightweight resource for interpreter (sent to LLM)."""
 
     img_url: Optional[str] = None
+    url: Optional[str] = None
+    timeout: Optional[float] = None
 
 
 class ResourceExpanded(Resource):
@@ -45,6 +65,12 @@ class ResourceExpanded(Resource):
     blocks: List[AmtBlock] = []
     connection_status: Optional[str] = None
     auth_url: Optional[str] = None
+    parameters: Optional[Dict[str, Any]] = None
+    skills: Optional[List[Dict[str, Any]]] = None
+    # Agents: ids of the resources the code names (None: unknown, offer every MCP server)
+    references: Optional[List[str]] = None
+    # MCP servers: expose only these tools to the model (None: all of them)
+    allowed_tools: Optional[List[str]] = None
 
     def to_lite(self) -> ResourceLite:
         return ResourceLite(type=self.type, name=self.name, provider=self.provider, id=self.id)
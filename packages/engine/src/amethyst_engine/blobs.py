@@ -0,0 +1,175 @@
+"""Blob store for large tool and task outputs.
+
+Outputs longer than AMETHYST_BLOB_THRESHOLD characters (default 8000) are kept
+out of interpreter history, which is resent on every turn: history carries a
+reference plus the first AMETHYST_BLOB_PREVIEW_CHARS (default 1000) characters,
+and the model pages through the full text with the `read_blob` function.
+Blobs are content-addressed files under AMETHYST_BLOB_DIR
+(default ~/.cache/amethyst/blobs). Once they take more than
+AMETHYST_BLOB_MAX_BYTES (default 1 GiB), the least recently used are deleted;
+reading an evicted blob reports an unknown blob_ref.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+BLOB_THRESHOLD = int(os.getenv("AMETHYST_BLOB_THRESHOLD", "8000"))
+PREVIEW_CHARS = int(os.getenv("AMETHYST_BLOB_PREVIEW_CHARS", "1000"))
+MAX_BYTES = int(os.getenv("AMETHYST_BLOB_MAX_BYTES", str(1 << 30)))
+DEFAULT_DIR = Path.home() / ".cache" / "amethyst" / "blobs"
+
+_REF_PATTERN = re.compile(r"blob-[0-9a-f]{32}")
+
+READ_BLOB_TOOL = {
+    "type": "function",
+    "name": "read_blob",
+    "description": (
+        "Read part of a large output that was replaced by a blob_ref and a preview. "
+        "Page through it with offset/length (in characters)."
+    ),
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "blob_ref": {"type": "string", "description": "blob_ref from the preview"},
+            "offset": {"type": "integer", "description": "Start character", "default": 0},
+            "length": {
+                "type": "integer",
+                "description": f"Characters to read (at most {BLOB_THRESHOLD})",
+                "default": BLOB_THRESHOLD,
+            },
+        },
+        "required": ["blob_ref"],
+    },
+}
+
+
+class BlobStore:
+    """Content-addressed text blobs on local disk, bounded to `max_bytes`.
+
+    File mtimes record last use; when a put takes the store over budget the
+    oldest blobs are deleted until it is back under 90% of it.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        # Bytes on disk, counted on first put (other processes may share root)
+        self._size: Optional[int] = None
+
+    def _path(self, ref: str) -> Path:
+        return self.root / ref[5:7] / ref
+
+    def _blobs(self) -> List[Tuple[float, int, Path]]:
+        """(mtime, size, path) of every blob on disk."""
+        blobs = []
+        for path in self.root.glob("*/blob-*"):
+            if not _REF_PATTERN.fullmatch(path.name):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            blobs.append((stat.st_mtime, stat.st_size, path))
+        return blobs
+
+    def _evict(self, keep: Path) -> None:
+        blobs = sorted(self._blobs())
+        size = sum(blob_size for _, blob_size, _ in blobs)
+        target = int(self.max_bytes * 0.9)
+        for _, blob_size, path in blobs:
+            if size <= target:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            size -= blob_size
+        self._size = size
+
+    def put(self, text: str) -> str:
+        data = text.encode()
+        ref = f"blob-{hashlib.sha256(data).hexdigest()[:32]}"
+        path = self._path(ref)
+        if path.exists():
+            _touch(path)
+            return ref
+        if self._size is None:
+            self._size = sum(blob_size for _, blob_size, _ in self._blobs())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        self._size += len(data)
+        if self._size > self.max_bytes:
+            self._evict(keep=path)
+        return ref
+
+    def get(self, ref: str) -> Optional[str]:
+        if not _REF_PATTERN.fullmatch(ref):
+            return None
+        path = self._path(ref)
+        try:
+            text = path.read_text()
+        except FileNotFoundError:
+            return None
+        _touch(path)
+        return text
+
+
+def _touch(path: Path) -> None:
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    global _store
+    if _store is None:
+        _store = BlobStore(Path(os.getenv("AMETHYST_BLOB_DIR", DEFAULT_DIR)).expanduser())
+    return _store
+
+
+def offload(text: str) -> str:
+    """`text` itself, or a blob reference with a preview if it's over the threshold."""
+    if len(text) <= BLOB_THRESHOLD:
+        return text
+    return json.dumps(
+        {
+            "blob_ref": get_blob_store().put(text),
+            "size": len(text),
+            "preview": text[:PREVIEW_CHARS],
+            "truncated": "Showing the preview only; call read_blob for the rest",
+        }
+    )
+
+
+def read_blob(arguments: str) -> str:
+    """Run a `read_blob` function call (JSON arguments); returns the function output."""
+    try:
+        args = json.loads(arguments)
+        ref = str(args["blob_ref"])
+        offset = max(0, int(args.get("offset") or 0))
+        length = min(BLOB_THRESHOLD, max(1, int(args.get("length") or BLOB_THRESHOLD)))
+    except (ValueError, TypeError, KeyError) as e:
+        return json.dumps({"error": f"Invalid read_blob arguments: {e}"})
+
+    text = get_blob_store().get(ref)
+    if text is None:
+        return json.dumps({"error": f"Unknown blob_ref {ref}"})
+    content = text[offset : offset + length]
+    return json.dumps(
+        {
+            "blob_ref": ref,
+            "offset": offset,
+            "size": len(text),
+            "content": content,
+            "remaining": max(0, len(text) - offset - len(content)),
+        }
+    )
@@ -0,0 +1,55 @@
+"""Compiled plans: planner output saved for reuse while an app is unchanged.
+
+A CompiledPlan holds the resources the planner produced (functions and agents
+with their blocks, references and bound calls). It is tied to a hash of the
+app's files and the resources they plan against, plus PLAN_VERSION, which is
+bumped whenever planner output would change for the same files (prompts,
+models or the shape of planned resources).
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from .app import App, AppExpanded, ResourceExpanded
+
+PLAN_VERSION = 1
+
+# Resource types the planner creates; everything else is an input to planning
+PLANNED_TYPES = ("amt_agent", "amt_function")
+
+
+class CompiledPlan(BaseModel):
+    version: int = PLAN_VERSION
+    files_hash: str
+    resources: List[ResourceExpanded] = []
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+def plan_hash(app: App) -> str:
+    """Hash of what planning depends on: files, workspace and input resources."""
+    resources = getattr(app, "resources", [])
+    inputs = sorted(r.id or r.name for r in resources if r.type not in PLANNED_TYPES)
+    payload = {
+        "version": PLAN_VERSION,
+        "files": [f.content for f in app.files],
+        "workspace": app.workspaceId,
+        "resources": inputs,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def compile_plan(app: AppExpanded) -> CompiledPlan:
+    """Snapshot a planned app's planner output."""
+    return CompiledPlan(
+        files_hash=plan_hash(app),
+        resources=[r.model_copy(deep=True) for r in app.resources if r.type in PLANNED_TYPES],
+    )
+
+
+def is_current(plan: Optional[CompiledPlan], app: App) -> bool:
+    """Whether plan was compiled from app as it is now."""
+    return plan is not None and plan.version == PLAN_VERSION and plan.files_hash == plan_hash(app)
@@ -0,0 +1,15 @@
+"""Process-wide configuration.
+
+Settings come from environment variables. A `.env` file, if present, is loaded
+into the environment once per process, when the first Engine or LLM is created.
+"""
+
+import functools
+
+
+@functools.cache
+def load_env() -> None:
+    """Load `.env` into os.environ (variables already set take precedence)."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
@@ -0,0 +1,141 @@
+"""Direct dispatch of fully specified statements.
+
+A function statement in the explicit call form
+
+    use <resource> - <role>: <value>, <role>: <value>, ...
+    use <integration> - <mcp tool> <role>: <value>, ...
+
+is bound at plan time to an Amethyst tool or agent (or, with the engine-side
+MCP client, a tool of a Pipedream integration) and run without an interpreter
+turn. Values are literals, or `input.<field>` / `item.<field>` for a field of
+the statement's input. At run time the arguments must match the resource's
+schema (hydrated `parameters`, or the MCP tool's input schema) and every
+referenced input field must exist; otherwise the statement is interpreted
+as usual.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .app import DirectCall, ResourceExpanded
+
+_CALL = re.compile(r"^\s*use\s+(?P<target>[^:\n]+?)\s+-\s+(?P<args>[^\n]+?)\s*$", re.IGNORECASE)
+# Commas only separate arguments when followed by another "<role>:"
+_ARG_SPLIT = re.compile(r",\s*(?=[\w][\w -]*:)")
+_ROLE = re.compile(r"^[\w][\w -]*$")
+_INPUT_REF = re.compile(r"^(?:input|item)\.(?P<field>[\w-]+)$", re.IGNORECASE)
+_NUMBER = re.compile(r"^-?\d+(\.\d+)?$")
+
+
+def _normalize(name: str) -> str:
+    return re.sub(r"[\s_-]+", "-", name.strip().lower())
+
+
+def _parse_arguments(text: str) -> Optional[Dict[str, Any]]:
+    """`role: value, ...` → {role: value or {"input": field}}; None if malformed."""
+    arguments: Dict[str, Any] = {}
+    for pair in _ARG_SPLIT.split(text):
+        role, sep, value = pair.partition(":")
+        role, value = role.strip(), value.strip()
+        if not sep or not value or not _ROLE.match(role) or role in arguments:
+            return None
+        ref = _INPUT_REF.match(value)
+        arguments[role] = {"input": ref.group("field")} if ref else value
+    return arguments
+
+
+def parse_direct_call(
+    text: str, resources_by_name: Dict[str, ResourceExpanded]
+) -> Optional[DirectCall]:
+    """DirectCall for a statement in explicit call form naming a callable resource."""
+    match = _CALL.match(text)
+    if not match:
+        return None
+    resource = resources_by_name.get(_normalize(match.group("target")))
+    if resource is None:
+        return None
+
+    args = match.group("args")
+    tool = None
+    if resource.provider == "pipedream":
+        tool, _, args = args.partition(" ")
+    elif not (resource.provider == "amethyst" and resource.type in ("tool", "agent")):
+        return None
+    arguments = _parse_arguments(args)
+    if arguments is None or (resource.type == "agent" and set(arguments) != {"prompt"}):
+        return None
+    return DirectCall(resource=resource.name, tool=tool or None, arguments=arguments)
+
+
+def bind_direct_calls(resources: List[ResourceExpanded]) -> None:
+    """Set `call` on function statements that are in explicit call form."""
+    resources_by_name = {}
+    for r in resources:
+        for name in (r.id, r.name):
+            if name:
+                resources_by_name.setdefault(_normalize(name), r)
+
+    for r in resources:
+        for block in r.blocks:
+            for stmt in block.statements:
+                stmt.call = parse_direct_call(stmt.text, resources_by_name)
+
+
+def _schema_fields(schema: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], set]:
+    """(properties, required) of a JSON schema or of hydrated `parameters`.
+
+    Hydrated parameters map name → {"type", "description", "default"?}; those
+    without a default are required.
+    """
+    if not schema:
+        return {}, set()
+    if "properties" in schema:
+        return schema["properties"] or {}, set(schema.get("required") or [])
+    return schema, {name for name, spec in schema.items() if "default" not in spec}
+
+
+def _convert(value: Any, spec: Dict[str, Any]) -> Tuple[bool, Any]:
+    """Coerce a literal to the schema type; (False, None) if it doesn't fit."""
+    if not isinstance(value, str):
+        return True, value
+    kind = spec.get("type") if isinstance(spec, dict) else None
+    if kind == "integer":
+        return (True, int(value)) if re.fullmatch(r"-?\d+", value) else (False, None)
+    if kind == "number":
+        return (True, float(value)) if _NUMBER.match(value) else (False, None)
+    if kind == "boolean":
+        lowered = value.lower()
+        if lowered in ("true", "yes"):
+            return True, True
+        return (True, False) if lowered in ("false", "no") else (False, None)
+    if kind in ("array", "object"):
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            return False, None
+        expected = list if kind == "array" else dict
+        return (True, parsed) if isinstance(parsed, expected) else (False, None)
+    return True, value
+
+
+def bind_arguments(
+    call: DirectCall, schema: Optional[Dict[str, Any]], input: Optional[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """Concrete arguments for call, or None if they don't satisfy schema."""
+    properties, required = _schema_fields(schema)
+    if schema is None or not required.issubset(call.arguments):
+        return None
+
+    bound: Dict[str, Any] = {}
+    for role, value in call.arguments.items():
+        if role not in properties:
+            return None
+        if isinstance(value, dict):
+            if not isinstance(input, dict) or value["input"] not in input:
+                return None
+            value = input[value["input"]]
+        fits, bound[role] = _convert(value, properties[role])
+        if not fits:
+            return None
+    return bound
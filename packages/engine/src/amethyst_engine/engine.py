@@ -34,21 +34,41 @@ end agent
 """
 
 import asyncio
+import json
 import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
 from dataclasses import dataclass, field
 from typing import Any, Callable, Dict, List, Optional
 
-from dotenv import load_dotenv
-
-from .app import App
+from .app import App, DirectCall
+from .compiled_plan import PLANNED_TYPES, CompiledPlan, is_current
+from .config import load_env
+from .dispatch import bind_arguments, bind_direct_calls
+from .hooks import EngineHooks, HookRegistry, Wait
 from .hydrator import ResourceHydrator
-from .interpreter import Interpreter
+from .interpreter import BATCH_MAX_ITEMS, Interpreter, plan_batches
 from .memory import TaskExpanded, TaskType
-from .planner import Planner
+from .planner import Planner, bind_references
+from .providers.mcp_client import McpClientPool, McpToolset, get_mcp_client
 from .providers.pipedream import PipedreamProvider
+from .scheduler import FairScheduler, get_scheduler
+from .tracing import current_span, span
 
 logger = logging.getLogger(__name__)
 
+# Agents take a single prompt (see executor.call_agent)
+PROMPT_SCHEMA = {"prompt": {"type": "string"}}
+
+
+@dataclass
+class _TaskEventState:
+    """What subscribers have already been sent for one task."""
+
+    seq: int = 0
+    ai_calls: int = 0
+    result: Any = None
+
 
 @dataclass
 class EngineContext:
@@ -56,6 +76,15 @@ class EngineContext:
 
     app: App
     mcp_tools: List[Dict[str, Any]] = field(default_factory=list)
+    run_id: str = ""
+    # Engine-side toolsets by server labels, listed once per run
+    toolsets: Dict[tuple, McpToolset] = field(default_factory=dict)
+
+    def scoped_mcp_tools(self, references: Optional[List[str]]) -> List[Dict[str, Any]]:
+        """MCP configs for the servers among references (all of them if None)."""
+        if references is None:
+            return self.mcp_tools
+        return [t for t in self.mcp_tools if t.get("server_label") in references]
 
 
 class Engine:
@@ -69,13 +98,24 @@ class Engine:
         self,
         send_update: Optional[Callable] = None,
         save_app: Optional[Callable] = None,
+        save_task: Optional[Callable] = None,
         verbose: bool = False,
+        scheduler: Optional[FairScheduler] = None,
+        hooks: Optional[List[EngineHooks]] = None,
+        mcp_client: Optional[McpClientPool] = None,
     ):
-        load_dotenv()
+        load_env()
 
         self.verbose = verbose
         self.send_update = send_update or (lambda x: None)
         self.save_app = save_app or (lambda: None)
+        self.save_task = save_task or (lambda task: None)
+        self.scheduler = scheduler or get_scheduler()
+        self.hooks = HookRegistry(hooks)
+        # Engine-side MCP client; without it MCP servers are left to the Responses API
+        self.mcp_client = mcp_client or get_mcp_client()
+        self._task_events: Dict[str, _TaskEventState] = {}
+        self._sent_refs: set = set()
         self.provider = None
         self.planner = None
         self.hydrator = ResourceHydrator()
@@ -83,51 +123,101 @@ class Engine:
         if verbose:
             logging.basicConfig(level=logging.INFO)
 
+    def add_hooks(self, hooks: EngineHooks) -> None:
+        """Register lifecycle hooks (see amethyst_engine.hooks)."""
+        self.hooks.add(hooks)
+
     async def plan(self, app: App) -> App:
         """Plan Amethyst app - parse files and enrich resources."""
-        # Initialize provider and planner with workspace_id from app
-        self.provider = PipedreamProvider(workspace_id=app.workspaceId, verbose=self.verbose)
-        self.planner = Planner(self.provider, send_update=self.send_update, verbose=self.verbose)
-
-        for idx, amt_file in enumerate(app.files, 1):
-            self.send_update(
-                {"type": "progress", "message": f"Planning file {idx}/{len(app.files)}"}
+        started = time.monotonic()
+        with span("plan", {"workspace.id": app.workspaceId, "files": len(app.files)}):
+            # Initialize provider and planner with workspace_id from app
+            self.provider = PipedreamProvider(workspace_id=app.workspaceId, verbose=self.verbose)
+            self.planner = Planner(
+                self.provider, send_update=self.send_update, verbose=self.verbose, hooks=self.hooks
             )
-            await self.planner.parse(amt_file, app)
 
+            for idx, amt_file in enumerate(app.files, 1):
+                self.send_update(
+                    {"type": "progress", "message": f"Planning file {idx}/{len(app.files)}"}
+                )
+                with span("plan.file", {"file.index": idx}):
+                    await self.planner.parse(amt_file, app)
+
+            bind_references(app.resources)
+
+            with span("hydrate", {"resources": len(app.resources)}):
+                await self.hydrator.hydrate_resources(app.resources)
+            bind_direct_calls(app.resources)
+
+        if self.hooks.on_plan_complete:
+            self.hooks.call(self.hooks.on_plan_complete, app, time.monotonic() - started)
         self.send_update({"type": "progress", "message": "Planning completed"})
         return app
 
+    async def load_plan(self, app: App, compiled: Optional[CompiledPlan]) -> bool:
+        """Use a compiled plan instead of planning, if it matches app's files.
+
+        Planned resources are replaced with the plan's; only volatile metadata
+        (connection status, hydrated schemas) is refreshed. Returns False, with
+        app untouched, when the plan is missing or stale.
+        """
+        if not is_current(compiled, app):
+            return False
+
+        started = time.monotonic()
+        with span("plan", {"workspace.id": app.workspaceId, "plan.compiled": True}):
+            self.provider = PipedreamProvider(workspace_id=app.workspaceId, verbose=self.verbose)
+            app.resources = [r for r in app.resources if r.type not in PLANNED_TYPES] + [
+                r.model_copy(deep=True) for r in compiled.resources
+            ]
+            self.provider.enrich_resources(app.resources)
+
+            with span("hydrate", {"resources": len(app.resources)}):
+                await self.hydrator.hydrate_resources(app.resources)
+
+        if self.hooks.on_plan_complete:
+            self.hooks.call(self.hooks.on_plan_complete, app, time.monotonic() - started)
+        self.send_update({"type": "progress", "message": "Loaded compiled plan"})
+        return True
+
     async def run(self, app: App, run_id: str) -> dict:
         """Execute already-planned Amethyst app."""
-        # Initialize provider for execution
-        self.provider = PipedreamProvider(workspace_id=app.workspaceId, verbose=self.verbose)
-
-        for idx in range(len(app.files)):
-            # Check OAuth requirements
-            needs_oauth = [r for r in app.resources if r.connection_status == "needs_oauth"]
-            if needs_oauth:
-                needs_oauth_dict = [r.model_dump() for r in needs_oauth]
-                self.send_update({"type": "oauth_required", "resources": needs_oauth_dict})
-                return {"status": "oauth_required", "resources": needs_oauth_dict}
-
-            main_resource = next(r for r in app.resources if r.is_main)
-            self.send_update(
-                {"type": "progress", "message": f"Executing main: {main_resource.name}"}
-            )
+        self._task_events = {}
+        self._sent_refs = set()
+        with span("execute", {"run.id": run_id, "workspace.id": app.workspaceId}):
+            # Initialize provider for execution
+            self.provider = PipedreamProvider(workspace_id=app.workspaceId, verbose=self.verbose)
+
+            for idx in range(len(app.files)):
+                with span("file", {"file.index": idx + 1}):
+                    # Check OAuth requirements
+                    needs_oauth = [r for r in app.resources if r.connection_status == "needs_oauth"]
+                    if needs_oauth:
+                        needs_oauth_dict = [r.model_dump() for r in needs_oauth]
+                        self.send_update({"type": "oauth_required", "resources": needs_oauth_dict})
+                        return {"status": "oauth_required", "resources": needs_oauth_dict}
+
+                    main_resource = next(r for r in app.resources if r.is_main)
+                    self.send_update(
+                        {"type": "progress", "message": f"Executing main: {main_resource.name}"}
+                    )
 
-            context = EngineContext(
-                app=app,
-                mcp_tools=self.provider.get_execution_mcp_config(app.resources),
-            )
+                    context = EngineContext(
+                        app=app,
+                        mcp_tools=self.provider.get_execution_mcp_config(app.resources),
+                        run_id=run_id,
+                    )
 
-            is_agent = main_resource.type == "amt_agent"
-            task_type = TaskType.AMT_AGENT if is_agent else TaskType.AMT_FUNCTION
-            main_task = await self._create_task(context, run_id, main_resource.name, task_type)
-            await self._execute_task(main_task, context)
+                    is_agent = main_resource.type == "amt_agent"
+                    task_type = TaskType.AMT_AGENT if is_agent else TaskType.AMT_FUNCTION
+                    main_task = await self._create_task(
+                        context, run_id, main_resource.name, task_type
+                    )
+                    await self._execute_task(main_task, context)
 
-            self.send_update({"type": "progress", "message": f"Completed file {idx + 1}"})
-            self.save_app()
+                    self.send_update({"type": "progress", "message": f"Completed file {idx + 1}"})
+                    self.save_app()
 
         self.send_update({"type": "progress", "message": "App execution completed"})
 
@@ -146,16 +236,104 @@ class Engine:
             input=input or [],
         )
         context.app.memory.tasks[task.id] = task
-        self.send_update({"type": "task_created", "task": task.to_dict()})
+        self._task_created(task)
         return task
 
+    def _task_created(self, task: TaskExpanded):
+        self._task_events[task.id] = _TaskEventState(result=task.result)
+        self.send_update({"type": "task_created", "seq": 0, "task": task.to_dict()})
+        self.save_task(task)
+
+    def _task_updated(self, task: TaskExpanded, context: EngineContext):
+        """Notify subscribers of what changed in task and persist it.
+
+        The event carries only changed fields and the ai_calls appended since the
+        task's previous event (from index `ai_calls_start`), plus the trace blobs
+        they reference that haven't been sent yet. `seq` increases by one per task
+        event so subscribers can detect gaps.
+        """
+        state = self._task_events.setdefault(task.id, _TaskEventState())
+        state.seq += 1
+        event = {"type": "task_updated", "seq": state.seq, "task": {"id": task.id}}
+
+        if task.result != state.result:
+            event["task"]["result"] = task.result
+            state.result = task.result
+
+        if len(task.ai_calls) > state.ai_calls:
+            new_ai_calls = task.ai_calls[state.ai_calls :]
+            trace_blobs = {}
+            for ai_call in new_ai_calls:
+                for ref in ai_call.input_refs:
+                    if ref not in self._sent_refs:
+                        trace_blobs[ref] = context.app.memory.trace_blobs[ref]
+                        self._sent_refs.add(ref)
+            event["ai_calls_start"] = state.ai_calls
+            event["ai_calls"] = [ai_call.model_dump() for ai_call in new_ai_calls]
+            event["trace_blobs"] = trace_blobs
+            state.ai_calls = len(task.ai_calls)
+
+        self.send_update(event)
+        self.save_task(task)
+
     async def _execute_task(self, task: TaskExpanded, context: EngineContext):
-        if task.task_type == TaskType.AMT_AGENT:
-            await self._execute_agent(task, context)
-        elif task.task_type == TaskType.AMT_FUNCTION:
-            await self._execute_function(task, context)
-        else:
-            raise ValueError(f"Invalid task type: {task.task_type}")
+        with self._task_scope(task):
+            if task.task_type == TaskType.AMT_AGENT:
+                await self._execute_agent(task, context)
+            elif task.task_type == TaskType.AMT_FUNCTION:
+                await self._execute_function(task, context)
+            else:
+                raise ValueError(f"Invalid task type: {task.task_type}")
+
+    @contextmanager
+    def _task_scope(self, task: TaskExpanded, attributes: Optional[dict] = None):
+        """Trace span and start/end hooks around executing task."""
+        attributes = {
+            "task.id": task.id,
+            "task.type": task.task_type.value,
+            "task.resource": task.resource_name,
+            **(attributes or {}),
+        }
+        hooks = self.hooks
+        with span("task", attributes):
+            if not (hooks.on_task_start or hooks.on_task_end):
+                yield
+                return
+
+            hooks.call(hooks.on_task_start, task)
+            started = time.monotonic()
+            error = None
+            try:
+                yield
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                hooks.call(hooks.on_task_end, task, time.monotonic() - started, error)
+
+    @asynccontextmanager
+    async def _turn_slot(self, task: TaskExpanded, context: EngineContext):
+        """Hold a scheduler slot for one LLM turn made for task."""
+        throttle_reason = None
+
+        def throttled(info: dict):
+            nonlocal throttle_reason
+            throttle_reason = info["reason"]
+            current_span().add_event("throttled", info)
+            self.send_update({"type": "throttled", "task_id": task.id, **info})
+
+        workspace_id = context.app.workspaceId or ""
+        async with self.scheduler.slot(workspace_id, context.run_id, throttled) as waited:
+            if waited:
+                waited_ms = round(waited * 1000)
+                current_span().add_event("throttle_released", {"waited_ms": waited_ms})
+                self.send_update(
+                    {"type": "throttle_released", "task_id": task.id, "waited_ms": waited_ms}
+                )
+                if self.hooks.on_wait:
+                    wait = Wait(task, "throttle", waited, reason=throttle_reason)
+                    self.hooks.call(self.hooks.on_wait, wait)
+            yield
 
     async def _interpret_and_execute(
         self,
@@ -163,39 +341,47 @@ class Engine:
         parent_task: TaskExpanded,
         context: EngineContext,
         interpreter: Interpreter,
+        references: Optional[List[str]] = None,
     ):
-        output, ai_call = await interpreter.interpret(
-            code,
-            context.app,
-            context.mcp_tools,
-            parent_task.id,
-            parent_task.input,
-        )
+        mcp_tools = context.scoped_mcp_tools(references)
+        local_tools = None
+        if self.mcp_client and mcp_tools:
+            local_tools = await self._toolset(mcp_tools, context)
+            mcp_tools = local_tools.remote
+
+        # Only the LLM turn holds a scheduler slot, not the child task it starts
+        async with self._turn_slot(parent_task, context):
+            output, ai_call = await interpreter.interpret(
+                code,
+                context.app,
+                mcp_tools,
+                parent_task.id,
+                parent_task.input,
+                local_tools,
+            )
 
-        # Update parent with ai_call
-        parent_task.ai_calls.append(ai_call)
-        self.send_update(
-            {"type": "task_updated", "task": parent_task.to_dict(include_ai_calls=True)}
-        )
+        # Update parent with ai_call (input deduplicated into memory's trace store)
+        context.app.memory.record_ai_call(parent_task, ai_call)
+        self._task_updated(parent_task, context)
 
         if output.result:
             # Completion - update parent result
             parent_task.result = output.result
-            self.send_update(
-                {"type": "task_updated", "task": parent_task.to_dict(include_ai_calls=True)}
-            )
+            self._task_updated(parent_task, context)
             return None
 
         # Task call - convert to TaskExpanded and execute
         child_task = TaskExpanded(**output.task.model_dump())
         context.app.memory.tasks[child_task.id] = child_task
-        self.send_update({"type": "task_created", "task": child_task.to_dict()})
+        self._task_created(child_task)
         await self._execute_task(child_task, context)
 
         return child_task
 
     async def _execute_agent(self, agent_task: TaskExpanded, context: EngineContext):
-        interpreter: Interpreter = Interpreter(send_update=self.send_update, verbose=self.verbose)
+        interpreter: Interpreter = Interpreter(
+            send_update=self.send_update, verbose=self.verbose, hooks=self.hooks
+        )
 
         # Find agent definition
         agent_def = next(r for r in context.app.resources if r.name == agent_task.resource_name)
@@ -203,7 +389,7 @@ class Engine:
         # Loop until agent completes
         while True:
             child_task = await self._interpret_and_execute(
-                agent_def.code, agent_task, context, interpreter
+                agent_def.code, agent_task, context, interpreter, agent_def.references
             )
             if child_task is None:  # Agent completed
                 return agent_task
@@ -222,11 +408,23 @@ class Engine:
                         func_task,
                         context,
                         is_parallel=stmt.is_parallel,
+                        references=stmt.references,
+                        call=stmt.call,
                     )
                     if not stmt.is_parallel:
                         results.append(stmt_task.result)
 
             elif block.type == "repeat":
+                # Batchable statements only transform their item, so running them for
+                # all items up front doesn't reorder anything observable
+                batched = {}
+                if BATCH_MAX_ITEMS > 1 and len(input_data) > 1:
+                    for stmt_idx, stmt in enumerate(block.statements):
+                        if stmt.batchable and not stmt.is_parallel and not stmt.call:
+                            batched[stmt_idx] = await self._execute_batched_statement(
+                                stmt.text, func_task, context, input_data
+                            )
+
                 for idx, item in enumerate(input_data):
                     self.send_update(
                         {
@@ -234,13 +432,19 @@ class Engine:
                             "message": f"Processing item {idx + 1}/{len(input_data)}",
                         }
                     )
-                    for stmt in block.statements:
+                    for stmt_idx, stmt in enumerate(block.statements):
+                        if idx in batched.get(stmt_idx, {}):
+                            results.append(batched[stmt_idx][idx])
+                            continue
+                        # Not batchable, or the batch had no result for this item
                         stmt_task = await self._execute_statement(
                             stmt.text,
                             func_task,
                             context,
                             input=item,
                             is_parallel=stmt.is_parallel,
+                            references=stmt.references,
+                            call=stmt.call,
                         )
                         if not stmt.is_parallel:
                             results.append(stmt_task.result)
@@ -253,14 +457,82 @@ class Engine:
                     if t.parent_task_id == func_task.id and t.async_task
                 ]
                 if async_tasks:
+                    started = time.monotonic()
                     await asyncio.gather(*async_tasks)
+                    if self.hooks.on_wait:
+                        waited = time.monotonic() - started
+                        wait = Wait(func_task, "parallel", waited, count=len(async_tasks))
+                        self.hooks.call(self.hooks.on_wait, wait)
                     # Collect results from async tasks
                     for t in context.app.memory.tasks.values():
                         if t.parent_task_id == func_task.id and t.async_task and t.result:
                             results.append(t.result)
 
         func_task.result = results
-        self.send_update({"type": "task_updated", "task": func_task.to_dict(include_ai_calls=True)})
+        self._task_updated(func_task, context)
+
+    async def _execute_batched_statement(
+        self,
+        statement: str,
+        parent_task: TaskExpanded,
+        context: EngineContext,
+        items: List[Any],
+    ) -> Dict[int, str]:
+        """Run a batchable statement over items, several items per model call.
+
+        Each batch is one statement task whose input is its items and whose result
+        lists their results. Returns {item index: result}; items missing from it
+        (skipped by the model, or in a batch that failed as a single item) are left
+        to the caller's per-item path. A failed batch is split in half and retried,
+        and later batches are capped at the size that last succeeded.
+        """
+        interpreter: Interpreter = Interpreter(
+            send_update=self.send_update, verbose=self.verbose, hooks=self.hooks
+        )
+        results: Dict[int, str] = {}
+        max_items = BATCH_MAX_ITEMS
+        pending = plan_batches(items, max_items)
+
+        while pending:
+            indexes = pending.pop(0)
+            if len(indexes) > max_items:
+                pending[:0] = [indexes[:max_items], indexes[max_items:]]
+                continue
+            self.send_update(
+                {
+                    "type": "progress",
+                    "message": f"Executing statement {statement} for {len(indexes)} items",
+                }
+            )
+            batch_input = [items[idx] for idx in indexes]
+            batch_task = await self._create_task(
+                context, parent_task.id, "", TaskType.STATEMENT, batch_input
+            )
+            attributes = {"task.statement": statement, "task.batch_size": len(indexes)}
+            try:
+                with self._task_scope(batch_task, attributes):
+                    async with self._turn_slot(batch_task, context):
+                        batch_results, ai_call = await interpreter.interpret_batch(
+                            statement, batch_input, batch_task.id
+                        )
+            except Exception as e:
+                logger.warning(f"Batch of {len(indexes)} items failed: {e}")
+                batch_task.result = f"Batch failed: {e}"
+                self._task_updated(batch_task, context)
+                if len(indexes) > 1:
+                    half = len(indexes) // 2
+                    max_items = half
+                    pending[:0] = [indexes[:half], indexes[half:]]
+                continue
+
+            context.app.memory.record_ai_call(batch_task, ai_call)
+            batch_task.result = [batch_results.get(pos) for pos in range(len(indexes))]
+            self._task_updated(batch_task, context)
+            for pos, idx in enumerate(indexes):
+                if pos in batch_results:
+                    results[idx] = batch_results[pos]
+
+        return results
 
     async def _execute_statement(
         self,
@@ -269,8 +541,14 @@ class Engine:
         context: EngineContext,
         input: Optional[dict] = None,
         is_parallel: bool = False,
+        references: Optional[List[str]] = None,
+        call: Optional[DirectCall] = None,
     ):
-        """Execute statement - creates statement task and executes (sync or async)."""
+        """Execute statement - creates statement task and executes (sync or async).
+
+        `references` limits the MCP servers offered to the statement's resources.
+        A bound `call` is made directly when its arguments fit the resource's schema.
+        """
 
         prefix = "parallel " if is_parallel else ""
         self.send_update(
@@ -282,11 +560,18 @@ class Engine:
             context, parent_task.id, "", TaskType.STATEMENT, [input] if input else []
         )
 
-        interpreter: Interpreter = Interpreter(send_update=self.send_update, verbose=self.verbose)
+        interpreter: Interpreter = Interpreter(
+            send_update=self.send_update, verbose=self.verbose, hooks=self.hooks
+        )
 
         # Execute statement
         async def execute():
-            await self._interpret_and_execute(statement, stmt_task, context, interpreter)
+            with self._task_scope(stmt_task, {"task.statement": statement}):
+                if call and await self._dispatch(call, stmt_task, context):
+                    return
+                await self._interpret_and_execute(
+                    statement, stmt_task, context, interpreter, references
+                )
 
         if is_parallel:
             stmt_task.async_task = asyncio.create_task(execute())
@@ -294,3 +579,65 @@ class Engine:
             await execute()
 
         return stmt_task
+
+    async def _toolset(self, mcp_tools: List[Dict[str, Any]], context: EngineContext) -> McpToolset:
+        """Engine-side toolset for these MCP configs, shared by the run's statements."""
+        key = tuple(sorted(t.get("server_label") or "" for t in mcp_tools))
+        toolset = context.toolsets.get(key)
+        if toolset is None:
+            toolset = await McpToolset.create(self.mcp_client, mcp_tools)
+            # Servers that couldn't be listed are retried by the next statement
+            if not toolset.remote:
+                context.toolsets[key] = toolset
+        return toolset
+
+    async def _dispatch(
+        self, call: DirectCall, stmt_task: TaskExpanded, context: EngineContext
+    ) -> bool:
+        """Make a statement's bound call without the model.
+
+        False if the call can't be bound or fails, leaving the statement to the
+        interpreter, which sees the same tools and can recover or report the error.
+        """
+        resource = next((r for r in context.app.resources if r.name == call.resource), None)
+        if resource is None:
+            return False
+        input = stmt_task.input[0] if stmt_task.input else None
+
+        try:
+            if call.tool:
+                mcp_tools = context.scoped_mcp_tools([resource.id])
+                if not (self.mcp_client and mcp_tools):
+                    return False
+                toolset = await self._toolset(mcp_tools, context)
+                function = toolset.find(resource.id, call.tool)
+                arguments = function and bind_arguments(call, function["parameters"], input)
+                if arguments is None:
+                    return False
+                result = await toolset.call(function["name"], json.dumps(arguments))
+                if result.startswith("Error: "):
+                    raise RuntimeError(result[len("Error: ") :])
+            else:
+                schema = PROMPT_SCHEMA if resource.type == "agent" else resource.parameters
+                arguments = bind_arguments(call, schema, input)
+                if arguments is None or not resource.url:
+                    return False
+                # Not imported at module level: the A2A client adds to every cold start
+                from . import executor
+
+                resources = {resource.name: resource}
+                if resource.type == "agent":
+                    result = await executor.call_agent(
+                        resource.name, arguments, resources, self.send_update, stmt_task.id
+                    )
+                else:
+                    result = await executor.call_tool(resource.name, arguments, resources)
+        except Exception as e:
+            logger.warning(f"Direct call to {call.resource} failed, interpreting instead: {e}")
+            current_span().add_event("dispatch_failed", {"error": str(e)})
+            return False
+
+        current_span().set_attribute("task.dispatch", "direct")
+        stmt_task.result = result
+        self._task_updated(stmt_task, context)
+        return True
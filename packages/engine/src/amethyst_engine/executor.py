@@ -1,18 +1,121 @@
 """Task execution.
 
-Executes agent calls and tool calls.
+Executes agent calls and tool calls over a shared connection pool. Resolved
+A2A agent cards (and the clients built from them) are cached per agent URL
+for AMETHYST_AGENT_CARD_TTL seconds. Agents that advertise streaming are
+called with message/stream so status and artifact updates arrive as they happen.
 """
 
-from typing import Any, Dict
+import asyncio
+import dataclasses
+import os
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
 from uuid import uuid4
 
 import httpx
 
 # A2A imports
-from a2a.client import A2ACardResolver, A2AClient
-from a2a.types import MessageSendParams, SendMessageRequest
+from a2a.client import A2ACardResolver, A2AClient, A2AClientHTTPError
+from a2a.types import (
+    JSONRPCErrorResponse,
+    MessageSendParams,
+    SendMessageRequest,
+    SendStreamingMessageRequest,
+)
 
 from .app import Resource
+from .resilience import AGENT_POLICY, TOOL_POLICY, RetryPolicy, call_with_resilience
+from .tracing import span
+
+AGENT_CARD_TTL = float(os.getenv("AMETHYST_AGENT_CARD_TTL", "300"))
+MAX_CONNECTIONS = int(os.getenv("AMETHYST_HTTP_MAX_CONNECTIONS", "100"))
+
+# Errors where the request never reached the server, so retrying a POST is safe
+NOT_DELIVERED = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+def _is_downstream_failure(e: BaseException) -> bool:
+    """Whether error reflects downstream health (not a bad request from us)."""
+    status = getattr(getattr(e, "response", None), "status_code", None) or getattr(
+        e, "status_code", None
+    )
+    return status is None or status >= 500 or status == 429
+
+
+def _policy_for(resource: Resource, default: RetryPolicy) -> RetryPolicy:
+    if resource.timeout:
+        return dataclasses.replace(default, timeout=resource.timeout)
+    return default
+
+
+@dataclass
+class _Transport:
+    """Connection pool and agent clients bound to one event loop."""
+
+    http_client: httpx.AsyncClient
+    agents: Dict[str, Tuple[A2AClient, float]] = field(default_factory=dict)
+    locks: Dict[str, asyncio.Lock] = field(default_factory=dict)
+
+
+_transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _Transport]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_transport() -> _Transport:
+    loop = asyncio.get_running_loop()
+    transport = _transports.get(loop)
+    if transport is None or transport.http_client.is_closed:
+        transport = _Transport(
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS),
+            )
+        )
+        _transports[loop] = transport
+    return transport
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared pooled client for the running event loop."""
+    return _get_transport().http_client
+
+
+async def get_agent_client(agent_url: str) -> A2AClient:
+    """Get A2A client for agent URL, resolving its card at most once per TTL."""
+    transport = _get_transport()
+
+    cached = transport.agents.get(agent_url)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+
+    lock = transport.locks.setdefault(agent_url, asyncio.Lock())
+    async with lock:
+        cached = transport.agents.get(agent_url)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        resolver = A2ACardResolver(httpx_client=transport.http_client, base_url=agent_url)
+        agent_card = await call_with_resilience(
+            f"{agent_url}#card",
+            resolver.get_agent_card,
+            TOOL_POLICY,
+            retry_on=(A2AClientHTTPError,),
+            should_retry=_is_downstream_failure,
+            is_failure=_is_downstream_failure,
+        )
+        client = A2AClient(httpx_client=transport.http_client, agent_card=agent_card)
+        transport.agents[agent_url] = (client, time.monotonic() + AGENT_CARD_TTL)
+        return client
+
+
+def invalidate_agent(agent_url: str) -> None:
+    """Drop cached card for agent URL (e.g. after the agent was redeployed)."""
+    transport = _transports.get(asyncio.get_running_loop())
+    if transport:
+        transport.agents.pop(agent_url, None)
 
 
 async def call_tool(
@@ -20,41 +123,127 @@ async def call_tool(
 ) -> str:
     """Execute tool call."""
     resource = resources[tool_name]
+    policy = _policy_for(resource, TOOL_POLICY)
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(resource.url, json=parameters)
+    async def post():
+        response = await get_http_client().post(
+            resource.url, json=parameters, timeout=policy.timeout
+        )
         response.raise_for_status()
-        result = response.json()
-        return result.get("result", str(result))
+        return response.json()
+
+    with span("tool_call", {"tool.name": tool_name, "tool.url": resource.url}):
+        result = await call_with_resilience(
+            resource.url,
+            post,
+            policy,
+            retry_on=NOT_DELIVERED,
+            is_failure=_is_downstream_failure,
+        )
+    return result.get("result", str(result))
 
 
-async def call_agent(
+def _message_params(parameters: Dict[str, Any]) -> MessageSendParams:
+    return MessageSendParams(
+        message={
+            "role": "user",
+            "parts": [{"kind": "text", "text": parameters["prompt"]}],
+            "messageId": uuid4().hex,
+        },
+    )
+
+
+async def stream_agent(
     agent_name: str, parameters: Dict[str, Any], resources: Dict[str, Resource]
-) -> str:
-    """Execute agent call."""
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream agent events (task, message, status-update, artifact-update) as dicts.
+
+    Falls back to a single blocking send for agents that don't advertise streaming.
+    """
     resource = resources[agent_name]
+    client = await get_agent_client(resource.url)
+    capabilities = client.agent_card.capabilities if client.agent_card else None
 
-    async with httpx.AsyncClient() as httpx_client:
-        resolver = A2ACardResolver(
-            httpx_client=httpx_client,
-            base_url=resource.url,
-        )
+    if not (capabilities and capabilities.streaming):
+        request = SendMessageRequest(id=str(uuid4()), params=_message_params(parameters))
+        response = await client.send_message(request)
+        if isinstance(response.root, JSONRPCErrorResponse):
+            raise RuntimeError(f"Agent {agent_name} failed: {response.root.error.message}")
+        yield response.root.result.model_dump(mode="json", exclude_none=True)
+        return
+
+    request = SendStreamingMessageRequest(id=str(uuid4()), params=_message_params(parameters))
+    async for response in client.send_message_streaming(request):
+        if isinstance(response.root, JSONRPCErrorResponse):
+            raise RuntimeError(f"Agent {agent_name} failed: {response.root.error.message}")
+        yield response.root.result.model_dump(mode="json", exclude_none=True)
 
-        agent_card = await resolver.get_agent_card()
 
-        client = A2AClient(httpx_client=httpx_client, agent_card=agent_card)
+def _merge_artifact(artifacts: Dict[str, Dict[str, Any]], event: Dict[str, Any]) -> None:
+    """Apply artifact-update event, appending chunks when `append` is set."""
+    artifact = event["artifact"]
+    existing = artifacts.get(artifact["artifactId"])
+    if existing and event.get("append"):
+        existing["parts"].extend(artifact.get("parts", []))
+    else:
+        artifacts[artifact["artifactId"]] = artifact
 
-        send_message_payload = {
-            "message": {
-                "role": "user",
-                "parts": [{"kind": "text", "text": parameters["prompt"]}],
-                "messageId": uuid4().hex,
-            },
-        }
 
-        request = SendMessageRequest(
-            id=str(uuid4()), params=MessageSendParams(**send_message_payload)
+async def call_agent(
+    agent_name: str,
+    parameters: Dict[str, Any],
+    resources: Dict[str, Resource],
+    send_update: Optional[Callable] = None,
+    task_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Execute agent call.
+
+    Status and artifact updates are forwarded through `send_update` as
+    `agent_status` / `agent_artifact` events while the agent is still running.
+    Returns the final task: {"status", "artifacts", ...} or the agent's message.
+    Messages are not idempotent, so the call is bounded by a timeout and the
+    agent's circuit breaker but never retried.
+    """
+    resource = resources[agent_name]
+    with span("agent_call", {"agent.name": agent_name, "agent.url": resource.url}):
+        return await call_with_resilience(
+            resource.url,
+            lambda: _consume_agent_stream(agent_name, parameters, resources, send_update, task_id),
+            _policy_for(resource, AGENT_POLICY),
+            is_failure=_is_downstream_failure,
         )
 
-        response = await client.send_message(request)
-        return response.model_dump(mode="json", exclude_none=True)
+
+async def _consume_agent_stream(
+    agent_name: str,
+    parameters: Dict[str, Any],
+    resources: Dict[str, Resource],
+    send_update: Optional[Callable],
+    task_id: Optional[str],
+) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    artifacts: Dict[str, Dict[str, Any]] = {}
+
+    async for event in stream_agent(agent_name, parameters, resources):
+        kind = event.get("kind")
+        if kind == "status-update":
+            result["status"] = event["status"]
+            update_type = "agent_status"
+        elif kind == "artifact-update":
+            _merge_artifact(artifacts, event)
+            update_type = "agent_artifact"
+        else:
+            # Full task or message snapshot
+            result = event
+            for artifact in event.get("artifacts", []):
+                artifacts[artifact["artifactId"]] = artifact
+            update_type = "agent_status"
+
+        if send_update:
+            send_update(
+                {"type": update_type, "task_id": task_id, "agent": agent_name, "event": event}
+            )
+
+    if artifacts:
+        result["artifacts"] = list(artifacts.values())
+    return result
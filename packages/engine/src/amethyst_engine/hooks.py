@@ -0,0 +1,143 @@
+"""Engine lifecycle hooks.
+
+Subclass EngineHooks, override the methods you need and register an instance
+with `Engine(hooks=[...])` or `Engine.add_hooks`. Hooks run synchronously on the
+event loop, so keep them quick; exceptions are logged and never fail the run.
+Only overridden methods are registered, and call sites skip building payloads
+for events nobody listens to, so unused hooks cost a list truthiness check.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from .app import App
+    from .memory import AiCall, TaskExpanded
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LlmRequest:
+    """Model call about to be made (`task_id` is None while planning)."""
+
+    model: str
+    messages: List[Any]
+    tools: List[Dict[str, Any]]
+    task_id: Optional[str] = None
+
+
+@dataclass
+class LlmResponse:
+    """Model call result; `cached` when a hook supplied it instead of the model."""
+
+    request: LlmRequest
+    response: Any
+    ai_call: "AiCall"
+    duration: float
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    cached: bool = False
+
+
+@dataclass
+class ToolCall:
+    """MCP tool call the model made while answering a request."""
+
+    task_id: Optional[str]
+    server_label: Optional[str]
+    name: Optional[str]
+    arguments: Optional[str]
+    output: Optional[str]
+    error: Optional[str]
+
+
+@dataclass
+class Wait:
+    """Time a task spent blocked.
+
+    kind "parallel": a function's `wait` block awaiting `count` parallel tasks.
+    kind "throttle": an interpreter turn queued by the scheduler (`reason`).
+    """
+
+    task: "TaskExpanded"
+    kind: str
+    duration: float
+    count: int = 0
+    reason: Optional[str] = None
+
+
+class EngineHooks:
+    """Base class for lifecycle hooks; every method is a no-op."""
+
+    def on_task_start(self, task: "TaskExpanded") -> None:
+        pass
+
+    def on_task_end(
+        self, task: "TaskExpanded", duration: float, error: Optional[BaseException]
+    ) -> None:
+        pass
+
+    def on_llm_request(self, request: LlmRequest) -> Optional[Any]:
+        """Return a response object to use it instead of calling the model."""
+        return None
+
+    def on_llm_response(self, response: LlmResponse) -> None:
+        pass
+
+    def on_tool_call(self, call: ToolCall) -> None:
+        pass
+
+    def on_wait(self, wait: Wait) -> None:
+        pass
+
+    def on_plan_complete(self, app: "App", duration: float) -> None:
+        pass
+
+
+HOOK_NAMES = (
+    "on_task_start",
+    "on_task_end",
+    "on_llm_request",
+    "on_llm_response",
+    "on_tool_call",
+    "on_wait",
+    "on_plan_complete",
+)
+
+
+class HookRegistry:
+    """Registered hook methods, one list per hook name (empty when unused)."""
+
+    on_task_start: List[Callable[["TaskExpanded"], None]]
+    on_task_end: List[Callable[["TaskExpanded", float, Optional[BaseException]], None]]
+    on_llm_request: List[Callable[[LlmRequest], Optional[Any]]]
+    on_llm_response: List[Callable[[LlmResponse], None]]
+    on_tool_call: List[Callable[[ToolCall], None]]
+    on_wait: List[Callable[[Wait], None]]
+    on_plan_complete: List[Callable[["App", float], None]]
+
+    def __init__(self, hooks: Optional[List[EngineHooks]] = None):
+        for name in HOOK_NAMES:
+            setattr(self, name, [])
+        for h in hooks or []:
+            self.add(h)
+
+    def add(self, hooks: EngineHooks) -> None:
+        for name in HOOK_NAMES:
+            if getattr(type(hooks), name) is not getattr(EngineHooks, name):
+                getattr(self, name).append(getattr(hooks, name))
+
+    def call(self, callbacks: List[Callable], *args) -> Any:
+        """Call each callback; return the first non-None result."""
+        found = None
+        for callback in callbacks:
+            try:
+                result = callback(*args)
+            except Exception:
+                logger.exception(f"Hook {callback.__qualname__} failed")
+                continue
+            if found is None:
+                found = result
+        return found
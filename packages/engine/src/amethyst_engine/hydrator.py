@@ -1,46 +1,170 @@
 """Resource hydration for A2A and MCP support."""
 
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
 import os
-from typing import Dict, List
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .app import ResourceExpanded
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "amethyst" / "schemas"
+
+
+class SchemaCache:
+    """ETag-validated cache of fetched schemas with an on-disk tier.
+
+    Entries are kept in memory and mirrored to `cache_dir` as JSON files so a
+    cold process can revalidate with If-None-Match instead of refetching.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = cache_dir
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def _path(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Get cached entry ({"etag", "payload"}) from memory, falling back to disk."""
+        if url in self._entries:
+            return self._entries[url]
+        if not self.cache_dir:
+            return None
+        path = self._path(url)
+        try:
+            entry = json.loads(path.read_text())
+        except OSError:
+            return None
+        except ValueError:
+            entry = None
+        # Truncated or written by another version: a miss, refetched and rewritten
+        if not (
+            isinstance(entry, dict)
+            and entry.keys() >= {"etag", "payload"}
+            and (entry["etag"] is None or isinstance(entry["etag"], str))
+        ):
+            logger.warning(f"Discarding invalid schema cache entry for {url}")
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                pass
+            return None
+        self._entries[url] = entry
+        return entry
+
+    def set(self, url: str, etag: Optional[str], payload: Any) -> None:
+        entry = {"etag": etag, "payload": payload}
+        self._entries[url] = entry
+        if not self.cache_dir:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(url)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(entry))
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Failed to persist schema cache entry for {url}: {e}")
 
-import httpx
 
-from .app import Resource
+_default_cache: Optional[SchemaCache] = None
+
+
+def get_default_cache() -> SchemaCache:
+    """Process-wide schema cache, persisted under AMETHYST_SCHEMA_CACHE_DIR."""
+    global _default_cache
+    if _default_cache is None:
+        cache_dir = os.getenv("AMETHYST_SCHEMA_CACHE_DIR")
+        _default_cache = SchemaCache(Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR)
+    return _default_cache
 
 
 class ResourceHydrator:
-    """Hydrates resources with schemas and capabilities."""
+    """Hydrates resources with schemas and capabilities.
+
+    Fetches run concurrently (bounded by `max_concurrency`) over one pooled client
+    and are revalidated against the schema cache with ETag/If-None-Match.
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        cache: Optional[SchemaCache] = None,
+    ):
         self.base_url = os.getenv("AMETHYST_SERVER_URL", "http://localhost:9998").rstrip("/")
+        self.max_concurrency = max_concurrency or int(
+            os.getenv("AMETHYST_HYDRATION_CONCURRENCY", "8")
+        )
+        self.cache = cache or get_default_cache()
 
-    async def hydrate_resources(self, resources: List[Resource]) -> None:
+    async def hydrate_resources(self, resources: List[ResourceExpanded]) -> None:
         """Hydrate resources with their schemas and capabilities."""
-        for resource in resources:
-            if resource.provider == "amethyst":
-                await self._hydrate_amethyst_resource(resource)
+        to_hydrate = [
+            r for r in resources if r.provider == "amethyst" and r.type in ("tool", "agent")
+        ]
+        if not to_hydrate:
+            return
+
+        import httpx
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        limits = httpx.Limits(max_connections=self.max_concurrency)
+
+        async with httpx.AsyncClient(limits=limits) as client:
 
-    async def _hydrate_amethyst_resource(self, resource: Resource) -> None:
+            async def hydrate(resource: ResourceExpanded):
+                async with semaphore:
+                    try:
+                        await self._hydrate_amethyst_resource(client, resource)
+                    except (httpx.HTTPError, KeyError, TypeError, ValueError) as e:
+                        # ValueError includes json.JSONDecodeError (a body that isn't JSON)
+                        logger.warning(f"Failed to hydrate resource {resource.name}: {e!r}")
+
+            await asyncio.gather(*(hydrate(r) for r in to_hydrate))
+
+    async def _hydrate_amethyst_resource(
+        self, client: httpx.AsyncClient, resource: ResourceExpanded
+    ) -> None:
         """Hydrate an Amethyst resource with its schema/capabilities."""
         if resource.type == "tool":
-            resource.parameters = await self._fetch_tool_schema(resource.name)
+            resource.parameters = await self._fetch_tool_schema(client, resource.name)
         elif resource.type == "agent":
-            resource.skills = await self._fetch_agent_capabilities(resource.name)
+            resource.skills = await self._fetch_agent_capabilities(client, resource.name)
 
-    async def _fetch_tool_schema(self, tool_name: str) -> Dict:
+    async def _fetch_tool_schema(self, client: httpx.AsyncClient, tool_name: str) -> Dict:
         """Fetch tool schema from unified server."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/tools/{tool_name}")
-            response.raise_for_status()
-            tool_info = response.json()
-            return tool_info["parameters"]
+        tool_info = await self._get_json(client, f"{self.base_url}/tools/{tool_name}")
+        return tool_info["parameters"]
 
-    async def _fetch_agent_capabilities(self, agent_name: str) -> List[Dict]:
+    async def _fetch_agent_capabilities(
+        self, client: httpx.AsyncClient, agent_name: str
+    ) -> List[Dict]:
         """Fetch agent capabilities from unified server."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/agents/{agent_name}/.well-known/agent.json"
-            )
-            response.raise_for_status()
-            agent_card = response.json()
-            return agent_card["skills"]
+        agent_card = await self._get_json(
+            client, f"{self.base_url}/agents/{agent_name}/.well-known/agent.json"
+        )
+        return agent_card["skills"]
+
+    async def _get_json(self, client: httpx.AsyncClient, url: str) -> Any:
+        """GET json, revalidating any cached copy with If-None-Match."""
+        cached = self.cache.get(url)
+        headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
+
+        response = await client.get(url, headers=headers)
+        if response.status_code == 304 and cached:
+            return cached["payload"]
+        response.raise_for_status()
+
+        payload = response.json()
+        self.cache.set(url, response.headers.get("ETag"), payload)
+        return payload
@@ -1,14 +1,31 @@
 """Amethyst code interpretation."""
 
+import asyncio
 import json
+import os
 from typing import Any, Callable, Dict, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from .app import App
+from .blobs import BLOB_THRESHOLD, READ_BLOB_TOOL, offload, read_blob
+from .hooks import HookRegistry, ToolCall
 from .llm import LLM, AiCall
 from .memory import Task, TaskType
-from .prompts import AMT_INTERPRETER_INSTRUCTIONS
+from .prompts import AMT_BATCH_INSTRUCTIONS, AMT_INTERPRETER_INSTRUCTIONS
+from .providers.mcp_client import McpToolset
+from .tracing import span
+
+# read_blob round trips allowed within one interpret() before the model must answer
+MAX_BLOB_READS = 8
+# Rounds of engine-answered function calls (read_blob, local MCP tools) per interpret()
+MAX_LOCAL_ROUNDS = int(os.getenv("AMETHYST_MAX_LOCAL_TOOL_ROUNDS", "16"))
+
+# Batched repeat items: at most AMETHYST_BATCH_MAX_ITEMS per model call (1 disables
+# batching), sized so inputs plus expected outputs stay within AMETHYST_BATCH_TOKEN_BUDGET
+BATCH_MAX_ITEMS = int(os.getenv("AMETHYST_BATCH_MAX_ITEMS", "20"))
+BATCH_TOKEN_BUDGET = int(os.getenv("AMETHYST_BATCH_TOKEN_BUDGET", "12000"))
+BATCH_OUTPUT_TOKENS_PER_ITEM = int(os.getenv("AMETHYST_BATCH_OUTPUT_TOKENS_PER_ITEM", "400"))
 
 
 class InterpreterOutput(BaseModel):
@@ -18,6 +35,48 @@ class InterpreterOutput(BaseModel):
     result: str | None = None
 
 
+class BatchItemResult(BaseModel):
+    """Result for one item of a batched statement."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    index: int
+    result: str
+
+
+class BatchResult(BaseModel):
+    """Structured output of a batched statement call."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    results: List[BatchItemResult]
+
+
+def estimate_tokens(value: Any) -> int:
+    """Rough token count of value as JSON (about 4 characters per token)."""
+    return len(json.dumps(value, default=str)) // 4 + 1
+
+
+def plan_batches(items: List[Any], max_items: int = BATCH_MAX_ITEMS) -> List[List[int]]:
+    """Group item indexes into consecutive batches within the item and token limits.
+
+    An item too large to share the budget gets a batch of its own.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    tokens = 0
+    for idx, item in enumerate(items):
+        cost = estimate_tokens(item) + BATCH_OUTPUT_TOKENS_PER_ITEM
+        if current and (len(current) >= max_items or tokens + cost > BATCH_TOKEN_BUDGET):
+            batches.append(current)
+            current, tokens = [], 0
+        current.append(idx)
+        tokens += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
 CALL_RESOURCE_TOOL = {
     "type": "function",
     "name": "call_amt_resource",
@@ -52,11 +111,44 @@ CALL_RESOURCE_TOOL = {
 class Interpreter:
     """Interprets Amethyst code."""
 
-    def __init__(self, send_update: Callable, verbose: bool = False):
-        self.llm = LLM(send_update=send_update, verbose=verbose)
+    def __init__(
+        self, send_update: Callable, verbose: bool = False, hooks: Optional[HookRegistry] = None
+    ):
+        self.llm = LLM(send_update=send_update, verbose=verbose, hooks=hooks)
         self.verbose = verbose
         self.send_update = send_update
         self.history = []
+        # Whether history holds blob references (read_blob is only offered then)
+        self._has_blobs = False
+        # function_call_output values for finished tasks, by call_id
+        self._task_outputs: Dict[str, str] = {}
+
+    def _offload(self, text: str) -> str:
+        value = offload(text)
+        if value is not text:
+            self._has_blobs = True
+        return value
+
+    async def _run_local_call(
+        self, call: Any, local_tools: Optional[McpToolset], task_id: str
+    ) -> str:
+        """Output for a function call the engine answers itself."""
+        arguments = str(call.arguments)
+        if call.name == "read_blob":
+            return read_blob(arguments)
+
+        server_label = local_tools.server_label(call.name)
+        attributes = {"tool.name": call.name, "mcp.server_label": server_label}
+        with span("tool_call", attributes) as tool_span:
+            output = await local_tools.call(call.name, arguments)
+            if output.startswith("Error: "):
+                tool_span.error = output
+        hooks = self.llm.hooks
+        if hooks.on_tool_call:
+            error = output if output.startswith("Error: ") else None
+            call_info = ToolCall(task_id, server_label, call.name, arguments, output, error)
+            hooks.call(hooks.on_tool_call, call_info)
+        return self._offload(output)
 
     def _get_attr(self, item, key):
         """Get attribute from object or dict."""
@@ -93,6 +185,17 @@ class Interpreter:
             }
             return serialized
 
+        # Replace large MCP results with a blob reference and preview
+        if output_type == "mcp_call":
+            result = self._get_attr(output, "output")
+            if result and len(result) > BLOB_THRESHOLD:
+                fields = ["id", "server_label", "name", "arguments", "error"]
+                serialized = {"type": "mcp_call", "output": self._offload(result)}
+                for field in fields:
+                    if (value := self._get_attr(output, field)) is not None:
+                        serialized[field] = value
+                return serialized
+
         # Return other outputs as-is (MCP calls, messages, etc.)
         return output
 
@@ -114,9 +217,13 @@ class Interpreter:
 
                 task_id = f"task-{call_id}"
                 task = app.memory.tasks.get(task_id)
-                output_value = (
-                    json.dumps(task.result) if task and task.result else "Async, pending..."
-                )
+                if task and task.result:
+                    output_value = self._task_outputs.get(call_id)
+                    if output_value is None:
+                        output_value = self._offload(json.dumps(task.result))
+                        self._task_outputs[call_id] = output_value
+                else:
+                    output_value = "Async, pending..."
 
                 # Check if function_call_output already exists after this call and update it
                 found_output = False
@@ -149,8 +256,12 @@ class Interpreter:
         mcp_tools: List[Dict[str, Any]],
         parent_task_id: str,
         input: Optional[Any] = None,
+        local_tools: Optional[McpToolset] = None,
     ) -> tuple[InterpreterOutput, AiCall]:
-        """Interpret code and return (output, ai_call)."""
+        """Interpret code and return (output, ai_call).
+
+        `local_tools` are MCP tools the engine calls itself (see providers.mcp_client).
+        """
 
         self._update_function_call_outputs(app)
 
@@ -169,20 +280,59 @@ Input:
 """,
         }
 
-        all_tools = mcp_tools + [CALL_RESOURCE_TOOL]
-
-        response, ai_call = await self.llm.stream(
-            messages=[sys_msg, *self.history],
-            tools=all_tools,
-        )
-
-        # Add output list to history (serialize function_calls, conditionally keep reasoning)
-        output_list = getattr(response, "output", [])
-        serialized_outputs = [
-            self._serialize_for_history(output, output_list, idx)
-            for idx, output in enumerate(output_list)
-        ]
-        self.history.extend([item for item in serialized_outputs if item is not None])
+        # One AiCall for the turn: the first round's input, then every round's
+        # outputs and the local call results fed back in between
+        ai_call: Optional[AiCall] = None
+        blob_reads = 0
+        for rounds in range(MAX_LOCAL_ROUNDS + 1):
+            last_round = rounds == MAX_LOCAL_ROUNDS
+            all_tools = mcp_tools + [CALL_RESOURCE_TOOL]
+            if local_tools and not last_round:
+                all_tools.extend(local_tools.function_tools)
+            if self._has_blobs and blob_reads < MAX_BLOB_READS and not last_round:
+                all_tools.append(READ_BLOB_TOOL)
+
+            response, round_call = await self.llm.stream(
+                messages=[sys_msg, *self.history],
+                tools=all_tools,
+                task_id=parent_task_id,
+            )
+            if ai_call is None:
+                ai_call = round_call
+            else:
+                ai_call.intermediate_outputs.extend(round_call.intermediate_outputs)
+
+            # Add output list to history (serialize function_calls, conditionally keep reasoning)
+            output_list = getattr(response, "output", [])
+            serialized_outputs = [
+                self._serialize_for_history(output, output_list, idx)
+                for idx, output in enumerate(output_list)
+            ]
+            self.history.extend([item for item in serialized_outputs if item is not None])
+
+            # Blob reads and local MCP tool calls are answered here; anything else ends the turn
+            function_calls = [o for o in output_list if getattr(o, "type", None) == "function_call"]
+            local_calls = [
+                o
+                for o in function_calls
+                if getattr(o, "name", None) == "read_blob"
+                or (local_tools and local_tools.handles(getattr(o, "name", None)))
+            ]
+            if any(call.name == "read_blob" for call in local_calls):
+                blob_reads += 1
+            outputs = await asyncio.gather(
+                *(self._run_local_call(call, local_tools, parent_task_id) for call in local_calls)
+            )
+            for call, output in zip(local_calls, outputs):
+                item = {
+                    "type": "function_call_output",
+                    "call_id": str(call.call_id),
+                    "output": output,
+                }
+                self.history.append(item)
+                ai_call.intermediate_outputs.append(item)
+            if not local_calls or len(local_calls) < len(function_calls):
+                break
 
         # Parse output to determine return value
         function_call = None
@@ -217,3 +367,40 @@ Input:
                         text_parts.append(str(text))
                 result_text = " ".join(text_parts)
             return InterpreterOutput(result=result_text), ai_call
+
+    async def interpret_batch(
+        self,
+        code: str,
+        items: List[Any],
+        parent_task_id: str,
+    ) -> tuple[Dict[int, str], AiCall]:
+        """Interpret a tool-free statement for several items in one structured call.
+
+        Returns ({position in items: result}, ai_call). Items the model skipped or
+        answered with an empty result are left out, for the caller to retry alone.
+        """
+        inputs = [{"index": idx, "input": item} for idx, item in enumerate(items)]
+        sys_msg = {
+            "role": "system",
+            "content": f"""{AMT_BATCH_INSTRUCTIONS}
+
+Code:
+{code}
+
+Inputs:
+{json.dumps(inputs, indent=2)}
+""",
+        }
+        response, ai_call = await self.llm.stream(
+            messages=[sys_msg],
+            text_format=BatchResult,
+            tools=[],
+            task_id=parent_task_id,
+        )
+
+        results: Dict[int, str] = {}
+        parsed = getattr(response, "output_parsed", None)
+        for item in parsed.results if parsed else []:
+            if 0 <= item.index < len(items) and item.result.strip():
+                results.setdefault(item.index, item.result)
+        return results, ai_call
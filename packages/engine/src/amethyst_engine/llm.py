@@ -1,23 +1,54 @@
 """OpenAI LLM interface."""
 
 import os
+import time
 from typing import Any, Callable, Dict, List, Optional, Type
 
-import openai
-from dotenv import load_dotenv
 from pydantic import BaseModel
 
+from .config import load_env
+from .hooks import HookRegistry, LlmRequest, LlmResponse, ToolCall
 from .memory import AiCall
+from .resilience import LLM_POLICY, call_with_resilience
+from .tracing import span
+
+
+def _retryable_errors() -> tuple:
+    """Transient errors worth retrying (APITimeoutError is an APIConnectionError)."""
+    import openai
+
+    return (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+
+
+def _is_llm_failure(e: BaseException) -> bool:
+    """Count only server-side errors against the model's circuit breaker."""
+    import openai
+
+    if isinstance(e, openai.APIStatusError):
+        return e.status_code >= 500 or e.status_code == 429
+    # APITimeoutError is an APIConnectionError; anything else (e.g. a response
+    # that fails to parse) is local and says nothing about the model's health
+    return isinstance(e, openai.APIConnectionError)
 
 
 class LLM:
     """Consistent interface for OpenAI LLM calls."""
 
-    def __init__(self, send_update: Optional[Callable] = None, verbose: bool = False):
-        load_dotenv()
-        self.client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(
+        self,
+        send_update: Optional[Callable] = None,
+        verbose: bool = False,
+        hooks: Optional[HookRegistry] = None,
+    ):
+        # Imported here, not at module level: the SDK alone takes most of a cold start
+        import openai
+
+        load_env()
+        # Retries are handled by the resilience layer, not the SDK
+        self.client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
         self.send_update = send_update
         self.verbose = verbose
+        self.hooks = hooks or HookRegistry()
 
     async def stream(
         self,
@@ -25,8 +56,12 @@ class LLM:
         text_format: Optional[Type[BaseModel]] = None,
         tools: Optional[List[Dict[str, Any]]] = None,
         model: str = "gpt-5-mini",
+        task_id: Optional[str] = None,
     ) -> tuple[Any, AiCall]:
-        """Stream LLM response and return (final_result, ai_call)."""
+        """Stream LLM response and return (final_result, ai_call).
+
+        `task_id` (the task the call is made for) is only passed on to hooks.
+        """
         # Serialize input messages (may contain OpenAI response objects)
         serialized_input = [
             self._serialize_output(msg) if not isinstance(msg, dict) else msg for msg in messages
@@ -36,19 +71,95 @@ class LLM:
         if text_format:
             params["text_format"] = text_format
 
-        async with self.client.responses.stream(**params) as stream:
-            if self.send_update:
-                async for event in stream:
-                    if delta := getattr(event, "delta", None):
-                        self.send_update({"type": "ai_intermediate_output", "delta": delta})
+        hooks = self.hooks
+        request = None
+        cached = None
+        if hooks.on_llm_request or hooks.on_llm_response:
+            request = LlmRequest(
+                model=model, messages=messages, tools=params["tools"], task_id=task_id
+            )
+            cached = hooks.call(hooks.on_llm_request, request)
+        started = time.monotonic()
+
+        # Deltas already streamed to the client can't be taken back, so only
+        # retry while nothing has been emitted
+        emitted = False
+
+        with span("llm", {"llm.model": model, "llm.tools": len(params["tools"])}) as llm_span:
+
+            async def attempt():
+                nonlocal emitted
+                async with self.client.responses.stream(**params) as stream:
+                    if self.send_update:
+                        async for event in stream:
+                            if delta := getattr(event, "delta", None):
+                                if not emitted:
+                                    llm_span.add_event("first_token")
+                                emitted = True
+                                self.send_update({"type": "ai_intermediate_output", "delta": delta})
+
+                    return await stream.get_final_response()
+
+            if cached is not None:
+                result = cached
+                llm_span.set_attribute("llm.cached", True)
+            else:
+                result = await call_with_resilience(
+                    f"llm:{model}",
+                    attempt,
+                    LLM_POLICY,
+                    retry_on=_retryable_errors(),
+                    should_retry=lambda e: not emitted,
+                    is_failure=_is_llm_failure,
+                )
+
+            usage = getattr(result, "usage", None)
+            input_tokens = getattr(usage, "input_tokens", None)
+            output_tokens = getattr(usage, "output_tokens", None)
+            llm_span.set_attribute("llm.input_tokens", input_tokens)
+            llm_span.set_attribute("llm.output_tokens", output_tokens)
+            # MCP tools run inside the model call, so they're events rather than spans
+            for output in getattr(result, "output", []):
+                if getattr(output, "type", None) == "mcp_call":
+                    llm_span.add_event(
+                        "mcp_call",
+                        {
+                            "mcp.server_label": getattr(output, "server_label", None),
+                            "mcp.tool": getattr(output, "name", None),
+                            "mcp.error": getattr(output, "error", None),
+                        },
+                    )
+                    if hooks.on_tool_call:
+                        hooks.call(hooks.on_tool_call, self._tool_call(output, task_id))
+
+        ai_call.intermediate_outputs = [
+            self._serialize_output(output) for output in getattr(result, "output", [])
+        ]
 
-            result = await stream.get_final_response()
+        if request and hooks.on_llm_response:
+            response = LlmResponse(
+                request=request,
+                response=result,
+                ai_call=ai_call,
+                duration=time.monotonic() - started,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cached=cached is not None,
+            )
+            hooks.call(hooks.on_llm_response, response)
 
-            ai_call.intermediate_outputs = [
-                self._serialize_output(output) for output in getattr(result, "output", [])
-            ]
+        return result, ai_call
 
-            return result, ai_call
+    @staticmethod
+    def _tool_call(output: Any, task_id: Optional[str]) -> ToolCall:
+        return ToolCall(
+            task_id=task_id,
+            server_label=getattr(output, "server_label", None),
+            name=getattr(output, "name", None),
+            arguments=getattr(output, "arguments", None),
+            output=getattr(output, "output", None),
+            error=getattr(output, "error", None),
+        )
 
     def _serialize_output(self, output: Any) -> dict:
         """Extract main string fields from output."""
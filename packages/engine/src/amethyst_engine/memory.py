@@ -1,16 +1,31 @@
 """Runtime execution state."""
 
+import hashlib
+import json
 from enum import Enum
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+
+
+def message_ref(message: Dict[str, Any]) -> str:
+    """Content address of a trace message."""
+    canonical = json.dumps(message, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
 
 
 class AiCall(BaseModel):
-    """AI input / output for tracing and debugging."""
+    """AI input / output for tracing and debugging.
+
+    Once recorded in Memory, input messages live in `Memory.trace_blobs` and the
+    call keeps only a delta: the first `inherited_refs` refs of the previous call
+    on the same task, followed by `input_refs`.
+    """
 
-    input_messages: List[Dict[str, str]] = []
+    input_messages: List[Dict[str, Any]] = []
+    input_refs: List[str] = []
+    inherited_refs: int = 0
     intermediate_outputs: List[Dict[str, Any]] = []
 
 
@@ -47,6 +62,7 @@ class TaskExpanded(Task):
 
     ai_calls: List[AiCall] = []
     async_task: Any = None
+    _last_input_refs: Optional[List[str]] = PrivateAttr(default=None)
 
     class Config:
         arbitrary_types_allowed = True
@@ -63,6 +79,7 @@ class Memory(BaseModel):
     """Runtime state storage."""
 
     tasks: Dict[str, TaskExpanded] = Field(default_factory=dict)
+    trace_blobs: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
 
     class Config:
         arbitrary_types_allowed = True
@@ -70,3 +87,50 @@ class Memory(BaseModel):
     def get_context(self) -> dict:
         """Get all task results for final context."""
         return {"tasks": [t.to_dict() for t in self.tasks.values() if t.result]}
+
+    def record_ai_call(self, task: TaskExpanded, ai_call: AiCall) -> None:
+        """Append ai_call to task, moving its input into the content-addressed store."""
+        refs = []
+        for message in ai_call.input_messages:
+            ref = message_ref(message)
+            self.trace_blobs.setdefault(ref, message)
+            refs.append(ref)
+
+        previous = task._last_input_refs
+        if previous is None:
+            previous = self._full_input_refs(task.ai_calls)
+        common = 0
+        while common < min(len(previous), len(refs)) and previous[common] == refs[common]:
+            common += 1
+
+        ai_call.inherited_refs = common
+        ai_call.input_refs = refs[common:]
+        ai_call.input_messages = []
+        task.ai_calls.append(ai_call)
+        task._last_input_refs = refs
+
+    def _full_input_refs(self, ai_calls: List[AiCall]) -> List[str]:
+        """Resolve the full ref list of the last call in `ai_calls`."""
+        refs: List[str] = []
+        for ai_call in ai_calls:
+            refs = refs[: ai_call.inherited_refs] + ai_call.input_refs
+        return refs
+
+    def materialize_ai_calls(self, task: TaskExpanded) -> List[dict]:
+        """Full ai_calls for task with input messages resolved from the store."""
+        materialized = []
+        refs: List[str] = []
+        for ai_call in task.ai_calls:
+            refs = refs[: ai_call.inherited_refs] + ai_call.input_refs
+            data = ai_call.model_dump(exclude={"input_refs", "inherited_refs"})
+            if not ai_call.input_messages:
+                data["input_messages"] = [self.trace_blobs[ref] for ref in refs]
+            materialized.append(data)
+        return materialized
+
+    def materialize_task(self, task: TaskExpanded) -> dict:
+        """Task dict with fully materialized ai_calls (for run views and debugging)."""
+        data = task.to_dict()
+        if task.ai_calls:
+            data["ai_calls"] = self.materialize_ai_calls(task)
+        return data
@@ -1,11 +1,13 @@
 """Amethyst code parsing."""
 
 import json
+import re
 from typing import Callable, List, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict
 
 from .app import AmtBlock, ResourceExpanded, Statement
+from .hooks import HookRegistry
 from .llm import LLM
 from .prompts import AMT_PARSER_INSTRUCTIONS
 
@@ -17,6 +19,7 @@ class ParsedStatement(BaseModel):
 
     text: str
     is_parallel: bool = False
+    batchable: bool = False
 
 
 class ParsedBlock(BaseModel):
@@ -52,9 +55,15 @@ class ParseResult(BaseModel):
 class Planner:
     """Parses AMT syntax into execution plan."""
 
-    def __init__(self, provider, send_update: Callable, verbose: bool = False):
+    def __init__(
+        self,
+        provider,
+        send_update: Callable,
+        verbose: bool = False,
+        hooks: Optional[HookRegistry] = None,
+    ):
         self.provider = provider
-        self.llm = LLM(send_update=send_update, verbose=verbose)
+        self.llm = LLM(send_update=send_update, verbose=verbose, hooks=hooks)
         self.send_update = send_update
         self.verbose = verbose
 
@@ -77,7 +86,11 @@ class Planner:
                 AmtBlock(
                     type=block.type,
                     statements=[
-                        Statement(text=stmt.text, is_parallel=stmt.is_parallel)
+                        Statement(
+                            text=stmt.text,
+                            is_parallel=stmt.is_parallel,
+                            batchable=stmt.batchable,
+                        )
                         for stmt in block.statements
                     ],
                 )
@@ -108,3 +121,38 @@ class Planner:
 
         # Enrich with provider-specific metadata (e.g., Pipedream connection status)
         self.provider.enrich_resources(app.resources)
+
+
+def _reference_pattern(name: str) -> re.Pattern:
+    """Match name as a whole word, treating spaces, '_' and '-' alike."""
+    words = [re.escape(w) for w in re.split(r"[\s_-]+", name) if w]
+    return re.compile(r"(?<![\w-])" + r"[\s_-]+".join(words) + r"(?![\w-])", re.IGNORECASE)
+
+
+def bind_references(resources: List[ResourceExpanded]) -> None:
+    """Record which resources each agent and function statement names.
+
+    Sets `references` to the ids of resources whose id or name appears in the
+    code, so execution can send only their MCP servers. Code that names no
+    known resource keeps `references` None (all servers).
+    """
+    patterns = []
+    for r in resources:
+        names = {n for n in (r.id, r.name) if n}
+        if names:
+            patterns.append((r.id or r.name, r, [_reference_pattern(n) for n in names]))
+
+    def references(text: str, owner: ResourceExpanded) -> Optional[List[str]]:
+        found = [
+            ref
+            for ref, r, name_patterns in patterns
+            if r is not owner and any(p.search(text) for p in name_patterns)
+        ]
+        return found or None
+
+    for r in resources:
+        if r.type == "amt_agent" and r.code:
+            r.references = references(r.code, r)
+        for block in r.blocks:
+            for stmt in block.statements:
+                stmt.references = references(stmt.text, r)
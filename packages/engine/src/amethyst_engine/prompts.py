@@ -36,8 +36,12 @@ For agents:
 For functions:
 - Set type: "amt_function"
 - Extract execution blocks with statements
-- Statements: {"text": "use <resource>", "is_parallel": false}
-- Parallel statements: {"text": "parallel use <resource>", "is_parallel": true}
+- Statements: {"text": "use <resource>", "is_parallel": false, "batchable": false}
+- Parallel statements: {"text": "parallel use <resource>", "is_parallel": true, "batchable": false}
+- batchable: true only for statements in a repeat block that transform the current item by
+  themselves (e.g. "classify the ticket by urgency", "summarize the text in one sentence")
+  without using any tool, agent or function; false whenever the statement uses a resource or
+  has side effects
 - Repeats: {"type": "repeat", "statements": [...]}
 - Wait: {"type": "wait", "statements": []}
 - Sequences: {"type": "sequence", "statements": [...]}
@@ -65,7 +69,7 @@ Return as ResourceExpanded array:
         {
           "type": "repeat",
           "statements": [
-            {"text": "use google_docs to summarize", "is_parallel": false}
+            {"text": "use google_docs to summarize", "is_parallel": false, "batchable": false}
           ]
         },
         {"type": "wait", "statements": []}
@@ -99,3 +103,13 @@ CRITICAL:
 - Make sure to check resource.provider to decide whether to use MCP internaly or call_amt_resource
 - ALWAYS include the input field, even if empty array []
 """
+
+AMT_BATCH_INSTRUCTIONS = """Interpret one Amethyst statement for each of several input items.
+
+The statement runs once per item, independently: treat every item as if it were the only input and
+never let one item's content affect another item's result.
+
+Return exactly one entry per input item:
+- index: the item's index as given in Inputs
+- result: the final result text for that item (what the statement would return for it alone)
+"""
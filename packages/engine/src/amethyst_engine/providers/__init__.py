@@ -2,6 +2,7 @@
 
 from .provider import ToolProvider
 from .pipedream import PipedreamProvider
+from .mcp_client import McpClientPool, McpServer, McpToolset
 
-__all__ = ['ToolProvider', 'PipedreamProvider']
+__all__ = ['ToolProvider', 'PipedreamProvider', 'McpClientPool', 'McpServer', 'McpToolset']
 
@@ -0,0 +1,389 @@
+"""Engine-side MCP client.
+
+By default MCP servers are handed to the Responses API as `type: "mcp"` tools,
+so the model's backend lists tools and connects on every interpreter call.
+With AMETHYST_LOCAL_MCP=1 the engine connects instead:
+- one long-lived session per server (label, URL and headers), reconnected
+  after errors; at most AMETHYST_MCP_MAX_SESSIONS, least recently used closed
+  first
+- `list_tools` results cached for AMETHYST_MCP_TOOLS_TTL seconds (default
+  300), dropped early when the server sends tools/list_changed
+- tools offered to the model as function tools named `<label>__<tool>` and
+  called from the engine, at most AMETHYST_MCP_MAX_CALLS_PER_SERVER at a time
+  per session
+
+Servers come from the provider's MCP configs (server_label, server_url,
+headers). AMETHYST_MCP_SERVERS (JSON, label → {"url", "headers"} or
+{"command", "args", "env", "cwd"} for stdio) overrides them by label, e.g. to
+point an integration at a local server.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..resilience import TOOL_POLICY, RetryPolicy, call_with_resilience
+
+logger = logging.getLogger(__name__)
+
+LOCAL_MCP = os.getenv("AMETHYST_LOCAL_MCP", "").lower() in ("1", "true", "yes")
+TOOLS_TTL = float(os.getenv("AMETHYST_MCP_TOOLS_TTL", "300"))
+MAX_SESSIONS = int(os.getenv("AMETHYST_MCP_MAX_SESSIONS", "64"))
+MAX_CALLS_PER_SERVER = int(os.getenv("AMETHYST_MCP_MAX_CALLS_PER_SERVER", "8"))
+CONNECT_TIMEOUT = float(os.getenv("AMETHYST_MCP_CONNECT_TIMEOUT", "30"))
+
+# Listing is idempotent, so it is retried (after reconnecting); calls are not
+LIST_POLICY = RetryPolicy(attempts=2, timeout=CONNECT_TIMEOUT)
+
+_FUNCTION_NAME = re.compile(r"[^a-zA-Z0-9_-]")
+
+
+def _transport_errors() -> tuple:
+    """Errors where the connection failed or broke, so a retry may succeed.
+
+    Timeouts of the whole attempt are handled (and not retried) by
+    call_with_resilience; tool and protocol errors are deterministic.
+    """
+    import anyio
+    import httpx
+
+    return (
+        OSError,
+        httpx.TransportError,
+        anyio.ClosedResourceError,
+        anyio.BrokenResourceError,
+        anyio.EndOfStream,
+    )
+
+
+@dataclass(frozen=True)
+class McpServer:
+    """How to reach one MCP server: streamable HTTP `url`, or a stdio `command`."""
+
+    label: str
+    url: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict, hash=False)
+    command: Optional[str] = None
+    args: List[str] = field(default_factory=list, hash=False)
+    env: Optional[Dict[str, str]] = field(default=None, hash=False)
+    cwd: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "McpServer":
+        """From a Responses API MCP tool config, or an AMETHYST_MCP_SERVERS entry."""
+        return cls(
+            label=config.get("server_label") or config["label"],
+            url=config.get("server_url") or config.get("url"),
+            headers={k: str(v) for k, v in (config.get("headers") or {}).items() if v},
+            command=config.get("command"),
+            args=list(config.get("args") or []),
+            env=config.get("env"),
+            cwd=config.get("cwd"),
+        )
+
+    @property
+    def key(self) -> str:
+        """Identity of the session: same label, endpoint and credentials."""
+        spec = [self.label, self.url, sorted(self.headers.items()), self.command, self.args]
+        digest = hashlib.sha256(json.dumps([spec, self.env, self.cwd]).encode()).hexdigest()
+        return f"{self.label}:{digest[:16]}"
+
+    def transport(self):
+        if self.command:
+            from mcp import StdioServerParameters
+            from mcp.client.stdio import stdio_client
+
+            return stdio_client(
+                StdioServerParameters(
+                    command=self.command, args=self.args, env=self.env, cwd=self.cwd
+                )
+            )
+        from mcp.client.streamable_http import streamablehttp_client
+
+        return streamablehttp_client(self.url, headers=self.headers)
+
+
+def servers_from_env() -> Dict[str, McpServer]:
+    """AMETHYST_MCP_SERVERS overrides, by label."""
+    spec = os.getenv("AMETHYST_MCP_SERVERS")
+    if not spec:
+        return {}
+    return {
+        label: McpServer.from_config({"label": label, **config})
+        for label, config in json.loads(spec).items()
+    }
+
+
+class _Session:
+    """A connected client session, owned by a background task.
+
+    The MCP transports are context managers that must be entered and exited
+    by the same task, so `_run` holds them open until `close()`.
+    """
+
+    def __init__(self, server: McpServer, pool: "McpClientPool"):
+        self.server = server
+        self.pool = pool
+        self.session = None
+        self.calls = asyncio.Semaphore(MAX_CALLS_PER_SERVER)
+        self.in_flight = 0
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and not self._task.done()
+
+    async def open(self) -> None:
+        ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(ready), name=f"mcp:{self.server.label}")
+        try:
+            self.session = await asyncio.wait_for(asyncio.shield(ready), CONNECT_TIMEOUT)
+        except BaseException:
+            self._task.cancel()
+            raise
+
+    async def _run(self, ready: asyncio.Future) -> None:
+        from mcp import ClientSession
+
+        try:
+            async with AsyncExitStack() as stack:
+                streams = await stack.enter_async_context(self.server.transport())
+                session = await stack.enter_async_context(
+                    ClientSession(streams[0], streams[1], message_handler=self._on_message)
+                )
+                await session.initialize()
+                ready.set_result(session)
+                await self._stop.wait()
+        except asyncio.CancelledError:
+            if not ready.done():
+                ready.cancel()
+            raise
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning(f"MCP session for {self.server.label} ended: {e}")
+        finally:
+            self.session = None
+
+    async def _on_message(self, message: Any) -> None:
+        method = getattr(getattr(message, "root", None), "method", None)
+        if method == "notifications/tools/list_changed":
+            self.pool.invalidate(self.server)
+
+    async def close(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, CONNECT_TIMEOUT)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                self._task.cancel()
+
+
+def _result_text(result: Any) -> str:
+    """Function output for a CallToolResult: its text content, else JSON."""
+    parts = []
+    for item in getattr(result, "content", None) or []:
+        text = getattr(item, "text", None)
+        parts.append(text if text is not None else json.dumps(item.model_dump(), default=str))
+    if not parts and getattr(result, "structuredContent", None) is not None:
+        parts.append(json.dumps(result.structuredContent, default=str))
+    text = "\n".join(parts)
+    return f"Error: {text}" if getattr(result, "isError", False) else text
+
+
+class McpClientPool:
+    """Long-lived MCP sessions and cached tool lists, shared across runs."""
+
+    def __init__(self, tools_ttl: float = TOOLS_TTL, max_sessions: int = MAX_SESSIONS):
+        self.tools_ttl = tools_ttl
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._connecting: Dict[str, asyncio.Lock] = {}
+        self._tools: Dict[str, Tuple[float, List[Any]]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _session(self, server: McpServer) -> _Session:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Sessions are bound to the loop that opened them
+            self._sessions.clear()
+            self._connecting.clear()
+            self._loop = loop
+
+        key = server.key
+        session = self._sessions.get(key)
+        if session is None or not session.alive:
+            lock = self._connecting.setdefault(key, asyncio.Lock())
+            async with lock:
+                session = self._sessions.get(key)
+                if session is None or not session.alive:
+                    session = _Session(server, self)
+                    await session.open()
+                    self._sessions[key] = session
+                    await self._evict()
+        self._sessions.move_to_end(key)
+        return session
+
+    async def _evict(self) -> None:
+        """Close least recently used idle sessions beyond max_sessions."""
+        excess = len(self._sessions) - self.max_sessions
+        for key in [k for k, s in self._sessions.items() if not s.in_flight][: max(0, excess)]:
+            session = self._sessions.pop(key)
+            self._connecting.pop(key, None)
+            await session.close()
+
+    async def _discard(self, session: _Session) -> None:
+        key = session.server.key
+        if self._sessions.get(key) is session:
+            del self._sessions[key]
+        await session.close()
+
+    def invalidate(self, server: Optional[McpServer] = None) -> None:
+        """Forget cached tool lists (for one server, or all)."""
+        if server is None:
+            self._tools.clear()
+        else:
+            self._tools.pop(server.key, None)
+
+    async def list_tools(self, server: McpServer) -> List[Any]:
+        """The server's tools (mcp.types.Tool), from cache while fresh."""
+        cached = self._tools.get(server.key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        async def fetch():
+            session = await self._session(server)
+            try:
+                result = await session.session.list_tools()
+                tools = list(result.tools)
+                while result.nextCursor:
+                    result = await session.session.list_tools(result.nextCursor)
+                    tools.extend(result.tools)
+            except Exception:
+                await self._discard(session)
+                raise
+            return tools
+
+        tools = await call_with_resilience(
+            f"mcp:{server.key}", fetch, LIST_POLICY, retry_on=_transport_errors()
+        )
+        self._tools[server.key] = (time.monotonic() + self.tools_ttl, tools)
+        return tools
+
+    async def call_tool(self, server: McpServer, name: str, arguments: Dict[str, Any]) -> str:
+        """Call a tool; returns its output text (prefixed "Error: " if it failed)."""
+
+        async def call():
+            session = await self._session(server)
+            session.in_flight += 1
+            try:
+                async with session.calls:
+                    result = await session.session.call_tool(name, arguments)
+            except Exception:
+                await self._discard(session)
+                raise
+            finally:
+                session.in_flight -= 1
+            return _result_text(result)
+
+        return await call_with_resilience(f"mcp:{server.key}", call, TOOL_POLICY)
+
+    async def close(self) -> None:
+        sessions, self._sessions = list(self._sessions.values()), OrderedDict()
+        self._connecting.clear()
+        for session in sessions:
+            await session.close()
+
+
+class McpToolset:
+    """MCP tools for one interpreter turn, offered to the model as function tools.
+
+    Servers whose tools can't be listed stay in `remote`, the MCP configs to
+    pass to the Responses API as before.
+    """
+
+    def __init__(self, pool: McpClientPool):
+        self.pool = pool
+        self.function_tools: List[Dict[str, Any]] = []
+        self.remote: List[Dict[str, Any]] = []
+        self._functions: Dict[str, Tuple[McpServer, str]] = {}
+
+    @classmethod
+    async def create(cls, pool: McpClientPool, mcp_configs: List[Dict[str, Any]]) -> "McpToolset":
+        toolset = cls(pool)
+        overrides = servers_from_env()
+        servers = [
+            overrides.get(config.get("server_label")) or McpServer.from_config(config)
+            for config in mcp_configs
+        ]
+        listed = await asyncio.gather(
+            *(pool.list_tools(server) for server in servers), return_exceptions=True
+        )
+        for config, server, tools in zip(mcp_configs, servers, listed):
+            if isinstance(tools, BaseException):
+                logger.warning(f"Listing MCP tools for {server.label} failed: {tools}")
+                toolset.remote.append(config)
+                continue
+            allowed = config.get("allowed_tools")
+            for tool in tools:
+                if allowed and tool.name not in allowed:
+                    continue
+                toolset._add(server, tool)
+        return toolset
+
+    def _add(self, server: McpServer, tool: Any) -> None:
+        name = _FUNCTION_NAME.sub("_", f"{server.label}__{tool.name}")[:64]
+        self._functions[name] = (server, tool.name)
+        self.function_tools.append(
+            {
+                "type": "function",
+                "name": name,
+                "description": f"[{server.label}] {tool.description or tool.name}",
+                "parameters": tool.inputSchema or {"type": "object", "properties": {}},
+                "strict": False,
+            }
+        )
+
+    def find(self, server_label: str, tool_name: str) -> Optional[Dict[str, Any]]:
+        """Function tool for a server's tool, if it was listed."""
+        for tool in self.function_tools:
+            server, listed_name = self._functions[tool["name"]]
+            if server.label == server_label and listed_name == tool_name:
+                return tool
+        return None
+
+    def handles(self, name: str) -> bool:
+        return name in self._functions
+
+    def server_label(self, name: str) -> str:
+        return self._functions[name][0].label
+
+    async def call(self, name: str, arguments: str) -> str:
+        """Run a function call for one of the tools; errors are returned as output."""
+        server, tool_name = self._functions[name]
+        try:
+            args = json.loads(arguments) if arguments else {}
+            return await self.pool.call_tool(server, tool_name, args)
+        except Exception as e:
+            return f"Error: {type(e).__name__}: {e}"
+
+
+_pool: Optional[McpClientPool] = None
+
+
+def get_mcp_client() -> Optional[McpClientPool]:
+    """Process-wide pool if AMETHYST_LOCAL_MCP is set, else None."""
+    global _pool
+    if _pool is None and LOCAL_MCP:
+        _pool = McpClientPool()
+    return _pool
@@ -3,8 +3,6 @@
 import os
 from typing import List
 
-from pipedream import Pipedream
-
 from ..app import Resource, ResourceExpanded
 from .provider import ToolProvider
 
@@ -20,6 +18,8 @@ class PipedreamProvider(ToolProvider):
         self.client_secret = os.getenv("PIPEDREAM_CLIENT_SECRET")
         self.verbose = verbose
 
+        from pipedream import Pipedream
+
         self.pd = Pipedream(
             project_id=self.project_id,
             project_environment=self.project_environment,
@@ -46,9 +46,12 @@ class PipedreamProvider(ToolProvider):
         }
 
     def get_execution_mcp_config(self, available_resources: List[Resource]) -> list[dict]:
-        """Get MCP configs for specific apps."""
-        return [
-            {
+        """Get MCP configs for specific apps (limited to `allowed_tools` where set)."""
+        configs = []
+        for r in available_resources:
+            if r.provider != "pipedream":
+                continue
+            config = {
                 "type": "mcp",
                 "server_label": r.id,
                 "server_url": "https://remote.mcp.pipedream.net",
@@ -62,9 +65,10 @@ class PipedreamProvider(ToolProvider):
                 },
                 "require_approval": "never",
             }
-            for r in available_resources
-            if r.provider == "pipedream"
-        ]
+            if allowed_tools := getattr(r, "allowed_tools", None):
+                config["allowed_tools"] = allowed_tools
+            configs.append(config)
+        return configs
 
     def enrich_resources(self, resources: List[ResourceExpanded]):
         """Enrich ResourceExpanded objects in place with Pipedream connection status and auth URLs."""
@@ -0,0 +1,181 @@
+"""Timeouts, retries and circuit breakers for downstream calls.
+
+Breakers are process-wide and keyed by resource URL or model name, so one
+degraded integration fails fast for every run instead of tying up slots.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling downstream while its breaker is open."""
+
+    def __init__(self, key: str, retry_in: float):
+        super().__init__(f"Circuit open for {key}, retry in {retry_in:.1f}s")
+        self.key = key
+        self.retry_in = retry_in
+
+
+@dataclass
+class RetryPolicy:
+    """Per-call timeout plus jittered exponential backoff."""
+
+    attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    timeout: Optional[float] = None
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter backoff for the given (1-based) failed attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+TOOL_POLICY = RetryPolicy(timeout=float(os.getenv("AMETHYST_TOOL_TIMEOUT", "60")))
+AGENT_POLICY = RetryPolicy(timeout=float(os.getenv("AMETHYST_AGENT_TIMEOUT", "300")))
+LLM_POLICY = RetryPolicy(timeout=float(os.getenv("AMETHYST_LLM_TIMEOUT", "600")))
+
+
+class CircuitBreaker:
+    """Closed → open after `failure_threshold` consecutive failures.
+
+    After `reset_timeout` one trial call is let through (half-open); its outcome
+    closes or re-opens the breaker.
+    """
+
+    def __init__(self, key: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.total_failures = 0
+        self.total_rejections = 0
+        self._trial_in_flight = False
+
+    def allow(self) -> None:
+        """Raise CircuitOpenError unless a call may proceed."""
+        if self.state == "closed":
+            return
+        elapsed = time.monotonic() - self.opened_at
+        if self.state == "open" and elapsed >= self.reset_timeout:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        self.total_rejections += 1
+        raise CircuitOpenError(self.key, max(0.0, self.reset_timeout - elapsed))
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def release(self) -> None:
+        """Free the half-open trial slot without an outcome (the call was cancelled)."""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.total_failures += 1
+        self._trial_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning(f"Circuit opened for {self.key} after {self.failures} failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def to_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "total_failures": self.total_failures,
+            "total_rejections": self.total_rejections,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(key: str) -> CircuitBreaker:
+    breaker = _breakers.get(key)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            key,
+            failure_threshold=int(os.getenv("AMETHYST_BREAKER_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("AMETHYST_BREAKER_RESET_SECONDS", "30")),
+        )
+        _breakers[key] = breaker
+    return breaker
+
+
+def breaker_metrics() -> Dict[str, dict]:
+    """Snapshot of every breaker's state, keyed by resource URL or model."""
+    return {key: breaker.to_dict() for key, breaker in _breakers.items()}
+
+
+async def call_with_resilience(
+    key: str,
+    fn: Callable[[], Awaitable[Any]],
+    policy: RetryPolicy,
+    retry_on: Tuple[Type[BaseException], ...] = (),
+    should_retry: Optional[Callable[[BaseException], bool]] = None,
+    is_failure: Optional[Callable[[BaseException], bool]] = None,
+) -> Any:
+    """Call `fn` under the breaker for `key` with timeout and retries.
+
+    Only exceptions in `retry_on` (and accepted by `should_retry`, if given) are
+    retried, so non-idempotent calls should pass errors where the request was
+    never delivered. Timeouts count as breaker failures but are not retried.
+    Other errors count against the breaker unless `is_failure` says otherwise
+    (e.g. a 4xx caused by bad arguments says nothing about downstream health).
+    The breaker sees one outcome per call, however many attempts it took.
+    """
+    breaker = get_breaker(key)
+    breaker.allow()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            if policy.timeout:
+                result = await asyncio.wait_for(fn(), timeout=policy.timeout)
+            else:
+                result = await fn()
+        except asyncio.TimeoutError:
+            breaker.record_failure()
+            raise
+        except retry_on as e:
+            if attempt >= policy.attempts or (should_retry and not should_retry(e)):
+                if is_failure is None or is_failure(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                raise
+            delay = policy.delay(attempt)
+            logger.info(f"Retrying {key} in {delay:.2f}s after {type(e).__name__}: {e}")
+            try:
+                await asyncio.sleep(delay)
+            except BaseException:
+                breaker.release()
+                raise
+            continue
+        except Exception as e:
+            if is_failure is None or is_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        except BaseException:
+            # Cancelled: no verdict on downstream health, but let the next trial through
+            breaker.release()
+            raise
+        breaker.record_success()
+        return result
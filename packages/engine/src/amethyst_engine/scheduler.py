@@ -0,0 +1,264 @@
+"""Fair scheduling of interpreter turns across workspaces.
+
+Every interpreter turn (one LLM call, including the MCP tool calls it makes)
+holds a slot while it runs. Slots are bounded per process
+(AMETHYST_MAX_CONCURRENT_TASKS), per workspace (AMETHYST_WORKSPACE_MAX_TASKS)
+and per run (AMETHYST_RUN_MAX_TASKS). Freed slots go to waiting turns by
+deficit round robin over workspaces, so one workspace's 1,000-item parallel
+repeat can't starve interactive runs from others. Workspaces can be weighted
+with AMETHYST_WORKSPACE_WEIGHTS ("ws_a=2,ws_b=0.5"; default weight 1).
+Weights must be positive and finite; ones below MIN_WEIGHT are raised to it.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+
+MAX_CONCURRENT_TASKS = int(os.getenv("AMETHYST_MAX_CONCURRENT_TASKS", "32"))
+WORKSPACE_MAX_TASKS = int(os.getenv("AMETHYST_WORKSPACE_MAX_TASKS", "8"))
+RUN_MAX_TASKS = int(os.getenv("AMETHYST_RUN_MAX_TASKS", "8"))
+
+# Smallest weight honoured, so a workspace earns a slot within 1 / MIN_WEIGHT turns
+MIN_WEIGHT = 0.01
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_weights(spec: str) -> Dict[str, float]:
+    """Weights from "ws_a=2,ws_b=0.5"; invalid entries are skipped with a warning."""
+    weights = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        workspace_id, _, weight = item.rpartition("=")
+        try:
+            value = float(weight)
+        except ValueError:
+            value = math.nan
+        if not math.isfinite(value) or value <= 0:
+            logger.warning(f"Ignoring workspace weight {item!r}: must be a positive number")
+            continue
+        weights[workspace_id] = max(value, MIN_WEIGHT)
+    return weights
+
+
+@dataclass
+class _Waiter:
+    run_id: str
+    future: asyncio.Future
+
+
+@dataclass
+class _Workspace:
+    weight: float = 1.0
+    deficit: float = 0.0
+    in_flight: int = 0
+    waiters: Deque[_Waiter] = field(default_factory=deque)
+
+
+class FairScheduler:
+    """Per-workspace and per-run concurrency quotas with deficit round robin.
+
+    Each turn costs one slot. When it is a waiting workspace's turn it earns
+    `quantum * weight` credit and is granted slots while its credit lasts, so
+    a workspace with weight 2 gets twice the slots of one with weight 1 under
+    contention. Workspaces and runs at their quota are skipped, not queued
+    behind.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENT_TASKS,
+        workspace_limit: int = WORKSPACE_MAX_TASKS,
+        run_limit: int = RUN_MAX_TASKS,
+        weights: Optional[Dict[str, float]] = None,
+        quantum: float = 1.0,
+    ):
+        weights = weights or {}
+        for value in (quantum, *weights.values()):
+            if not math.isfinite(value) or value <= 0:
+                raise ValueError(f"Scheduler weights and quantum must be positive, got {value}")
+        self.max_concurrency = max_concurrency
+        self.workspace_limit = workspace_limit
+        self.run_limit = run_limit
+        self.weights = {k: max(v, MIN_WEIGHT) for k, v in weights.items()}
+        self.quantum = quantum
+        self.in_flight = 0
+        self.total_throttled = 0
+        self._workspaces: Dict[str, _Workspace] = {}
+        self._runs: Dict[str, int] = {}
+        # Workspaces with waiters, in round-robin order; the head has the turn
+        self._active: Deque[str] = deque()
+
+    def _workspace(self, workspace_id: str) -> _Workspace:
+        workspace = self._workspaces.get(workspace_id)
+        if workspace is None:
+            workspace = _Workspace(weight=self.weights.get(workspace_id, 1.0))
+            self._workspaces[workspace_id] = workspace
+        return workspace
+
+    def _blocked_by(self, workspace: _Workspace, run_id: str) -> Optional[str]:
+        """Which quota keeps a turn of run_id from starting now, if any."""
+        if self.in_flight >= self.max_concurrency:
+            return "max_concurrency"
+        if workspace.in_flight >= self.workspace_limit:
+            return "workspace_limit"
+        if self._runs.get(run_id, 0) >= self.run_limit:
+            return "run_limit"
+        return None
+
+    def _next_eligible(self, workspace: _Workspace) -> Optional[_Waiter]:
+        if workspace.in_flight >= self.workspace_limit:
+            return None
+        for waiter in workspace.waiters:
+            if self._runs.get(waiter.run_id, 0) < self.run_limit:
+                return waiter
+        return None
+
+    def _grant(self, workspace: _Workspace, run_id: str) -> None:
+        self.in_flight += 1
+        workspace.in_flight += 1
+        self._runs[run_id] = self._runs.get(run_id, 0) + 1
+
+    def _release(self, workspace_id: str, run_id: str) -> None:
+        workspace = self._workspaces[workspace_id]
+        self.in_flight -= 1
+        workspace.in_flight -= 1
+        self._runs[run_id] -= 1
+        if not self._runs[run_id]:
+            del self._runs[run_id]
+        if not workspace.in_flight and not workspace.waiters:
+            del self._workspaces[workspace_id]
+        self._dispatch()
+
+    def _dequeue(self, workspace_id: str, waiter: _Waiter) -> None:
+        workspace = self._workspaces[workspace_id]
+        workspace.waiters.remove(waiter)
+        if not workspace.waiters:
+            self._active.remove(workspace_id)
+            workspace.deficit = 0.0
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiting turns, one workspace turn at a time."""
+        blocked_turns = 0
+        # Every grant takes at most ceil(1 / credit per turn) rounds of the active
+        # workspaces; the bound stops a bad weight from spinning the event loop
+        rounds_per_grant = math.ceil(1 / (self.quantum * MIN_WEIGHT)) + 1
+        free = self.max_concurrency - self.in_flight
+        steps = (free + 1) * (len(self._active) + 1) * rounds_per_grant
+        while (
+            self._active
+            and self.in_flight < self.max_concurrency
+            and blocked_turns < len(self._active)
+        ):
+            steps -= 1
+            if steps < 0:
+                logger.error("Scheduler dispatch made no progress; leaving turns queued")
+                break
+            workspace_id = self._active[0]
+            workspace = self._workspaces[workspace_id]
+            waiter = self._next_eligible(workspace)
+            if waiter is not None and workspace.deficit >= 1:
+                workspace.deficit -= 1
+                self._dequeue(workspace_id, waiter)
+                self._grant(workspace, waiter.run_id)
+                waiter.future.set_result(None)
+                blocked_turns = 0
+                if self._active and self._active[0] != workspace_id:
+                    self._start_turn()
+                continue
+
+            # Turn over
+            blocked_turns = blocked_turns + 1 if waiter is None else 0
+            self._active.rotate(-1)
+            self._start_turn()
+
+    def _start_turn(self) -> None:
+        """Credit the workspace whose turn it now is, if it can use a slot."""
+        head = self._workspaces[self._active[0]]
+        if self._next_eligible(head) is not None:
+            head.deficit += self.quantum * head.weight
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        workspace_id: str,
+        run_id: str,
+        on_throttle: Optional[Callable[[dict], None]] = None,
+    ) -> AsyncIterator[float]:
+        """Hold a slot for one turn; yields seconds spent waiting for it.
+
+        `on_throttle` is called with the reason and current counts when the
+        turn has to wait.
+        """
+        workspace = self._workspace(workspace_id)
+        reason = self._blocked_by(workspace, run_id)
+        waited = 0.0
+        if reason is None:
+            self._grant(workspace, run_id)
+        else:
+            waiter = _Waiter(run_id=run_id, future=asyncio.get_running_loop().create_future())
+            workspace.waiters.append(waiter)
+            if len(workspace.waiters) == 1:
+                self._active.append(workspace_id)
+            self.total_throttled += 1
+            if on_throttle:
+                on_throttle(
+                    {
+                        "reason": reason,
+                        "workspace_in_flight": workspace.in_flight,
+                        "run_in_flight": self._runs.get(run_id, 0),
+                        "queued": len(workspace.waiters),
+                    }
+                )
+            started = time.monotonic()
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.cancelled():
+                    self._dequeue(workspace_id, waiter)
+                    if not workspace.in_flight and not workspace.waiters:
+                        del self._workspaces[workspace_id]
+                else:  # Granted just before cancellation
+                    self._release(workspace_id, run_id)
+                raise
+            waited = time.monotonic() - started
+        try:
+            yield waited
+        finally:
+            self._release(workspace_id, run_id)
+
+    def metrics(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "workspace_limit": self.workspace_limit,
+            "run_limit": self.run_limit,
+            "in_flight": self.in_flight,
+            "queued": sum(len(w.waiters) for w in self._workspaces.values()),
+            "total_throttled": self.total_throttled,
+            "workspaces": {
+                workspace_id: {"in_flight": w.in_flight, "queued": len(w.waiters)}
+                for workspace_id, w in self._workspaces.items()
+            },
+        }
+
+
+_scheduler: Optional[FairScheduler] = None
+
+
+def get_scheduler() -> FairScheduler:
+    """Process-wide scheduler shared by every Engine."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FairScheduler(
+            weights=_parse_weights(os.getenv("AMETHYST_WORKSPACE_WEIGHTS", ""))
+        )
+    return _scheduler
+
+
+def scheduler_metrics() -> dict:
+    return get_scheduler().metrics()
@@ -0,0 +1,367 @@
+"""Span-based tracing of runs.
+
+`span(name, attributes)` times a block as a child of the current span, which
+is tracked in a context variable so asyncio tasks inherit their creator's span.
+Runs produce run → plan/execute → file → task → llm / tool_call / agent_call
+trees (plus db.write spans from the API). Finished spans are batched and
+exported on a background thread:
+- AMETHYST_TRACE_FILE: append spans as JSON lines to this file
+- OTEL_EXPORTER_OTLP_ENDPOINT (or OTEL_EXPORTER_OTLP_TRACES_ENDPOINT): POST
+  OTLP/HTTP JSON to {endpoint}/v1/traces with OTEL_EXPORTER_OTLP_HEADERS
+  ("key=value,key=value") and OTEL_SERVICE_NAME (default "amethyst")
+With neither set, spans aren't recorded and `span` costs a few attribute lookups.
+"""
+
+import atexit
+import json
+import logging
+import os
+import random
+import threading
+import time
+import urllib.parse
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    """Timed operation; ids are hex strings as in OTLP."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[dict] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        self.events.append(
+            {"name": name, "time_ns": time.time_ns(), "attributes": attributes or {}}
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "events": self.events,
+            "error": self.error,
+        }
+
+
+class _NoopSpan(Span):
+    """Stand-in yielded while tracing is disabled.
+
+    One instance is shared by every caller, so writes (e.g. `span.error = ...`)
+    are dropped once it is constructed.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        object.__setattr__(self, "_sealed", True)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if not getattr(self, "_sealed", False):
+            super().__setattr__(name, value)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan(name="", trace_id="", span_id="")
+_current_span: ContextVar[Optional[Span]] = ContextVar("amethyst_span", default=None)
+
+
+class SpanExporter(ABC):
+    """Destination for finished spans. Called from the tracer's export thread."""
+
+    @abstractmethod
+    def export(self, spans: List[Span]) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JsonFileExporter(SpanExporter):
+    """Appends spans to a local file as JSON lines (see Span.to_dict)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: List[Span]) -> None:
+        lines = "".join(json.dumps(s.to_dict(), default=str) + "\n" for s in spans)
+        with open(self.path, "a") as f:
+            f.write(lines)
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    if isinstance(value, str):
+        return {"stringValue": value}
+    return {"stringValue": json.dumps(value, default=str)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[dict]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+
+class OtlpHttpExporter(SpanExporter):
+    """Sends spans to an OpenTelemetry collector over OTLP/HTTP with JSON encoding."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        headers: Optional[Dict[str, str]] = None,
+        service_name: str = "amethyst",
+        timeout: float = 10.0,
+    ):
+        self.endpoint = endpoint
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def encode(self, spans: List[Span]) -> dict:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes({"service.name": self.service_name})
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "amethyst_engine"},
+                            "spans": [self._encode_span(s) for s in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def _encode_span(self, span: Span) -> dict:
+        encoded = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": _otlp_attributes(span.attributes),
+            "events": [
+                {
+                    "timeUnixNano": str(event["time_ns"]),
+                    "name": event["name"],
+                    "attributes": _otlp_attributes(event["attributes"]),
+                }
+                for event in span.events
+            ],
+            # STATUS_CODE_ERROR / STATUS_CODE_UNSET
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 0},
+        }
+        if span.parent_id:
+            encoded["parentSpanId"] = span.parent_id
+        return encoded
+
+    def export(self, spans: List[Span]) -> None:
+        import urllib.request  # Not at module level: it adds ~30ms to a cold import
+
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(self.encode(spans)).encode(),
+            headers=self.headers,
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class Tracer:
+    """Creates spans and exports finished ones in batches off the event loop.
+
+    Spans are exported when `batch_size` are buffered, every `flush_interval`
+    seconds, on `flush()` and at interpreter exit. Exporter errors are logged
+    and the batch is dropped.
+    """
+
+    def __init__(
+        self,
+        exporters: Optional[List[SpanExporter]] = None,
+        batch_size: int = 512,
+        flush_interval: float = 5.0,
+    ):
+        self.exporters = exporters or []
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: List[Span] = []
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.exporters)
+
+    def start_span(
+        self, name: str, parent: Optional[Span], attributes: Optional[Dict[str, Any]]
+    ) -> Span:
+        return Span(
+            name=name,
+            trace_id=parent.trace_id if parent else f"{random.getrandbits(128):032x}",
+            span_id=f"{random.getrandbits(64):016x}",
+            parent_id=parent.span_id if parent else None,
+            attributes=dict(attributes) if attributes else {},
+        )
+
+    def end_span(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        with self._lock:
+            self._buffer.append(span)
+            full = len(self._buffer) >= self.batch_size
+        if self._worker is None:
+            self._start_worker()
+        if full:
+            self._wake.set()
+
+    def _start_worker(self) -> None:
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._run, name="tracer", daemon=True)
+            self._worker.start()
+        atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Export buffered spans now (blocking)."""
+        with self._export_lock:
+            with self._lock:
+                spans, self._buffer = self._buffer, []
+            if not spans:
+                return
+            for exporter in self.exporters:
+                try:
+                    exporter.export(spans)
+                except Exception as e:
+                    logger.warning(
+                        f"{type(exporter).__name__} failed to export {len(spans)} spans: {e}"
+                    )
+
+    def shutdown(self) -> None:
+        self.flush()
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+
+def _parse_headers(spec: str) -> Dict[str, str]:
+    headers = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key, _, value = item.partition("=")
+        headers[key.strip()] = urllib.parse.unquote(value.strip())
+    return headers
+
+
+def tracer_from_env() -> Tracer:
+    exporters: List[SpanExporter] = []
+    if path := os.getenv("AMETHYST_TRACE_FILE"):
+        exporters.append(JsonFileExporter(Path(path).expanduser()))
+    endpoint = os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT")
+    if not endpoint and (base := os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")):
+        endpoint = base.rstrip("/") + "/v1/traces"
+    if endpoint:
+        exporters.append(
+            OtlpHttpExporter(
+                endpoint,
+                headers=_parse_headers(os.getenv("OTEL_EXPORTER_OTLP_HEADERS", "")),
+                service_name=os.getenv("OTEL_SERVICE_NAME", "amethyst"),
+            )
+        )
+    return Tracer(exporters)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer, configured from the environment on first use."""
+    global _tracer
+    if _tracer is None:
+        _tracer = tracer_from_env()
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> None:
+    global _tracer
+    _tracer = tracer
+
+
+def current_span() -> Span:
+    """Innermost active span (a no-op span outside any span or with tracing off)."""
+    return _current_span.get() or _NOOP_SPAN
+
+
+@contextmanager
+def span(
+    name: str,
+    attributes: Optional[Dict[str, Any]] = None,
+    parent: Optional[Span] = None,
+) -> Iterator[Span]:
+    """Time the enclosed block as a span, a child of `parent` or the current span.
+
+    Exceptions escaping the block mark the span as failed and propagate.
+    """
+    tracer = get_tracer()
+    if not tracer.enabled:
+        yield _NOOP_SPAN
+        return
+
+    if parent is None or parent is _NOOP_SPAN:
+        parent = _current_span.get()
+    current = tracer.start_span(name, parent, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        tracer.end_span(current)
@@ -42,7 +42,7 @@ async def handle_list_tools() -> list[types.Tool]:
 async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
     """Handle MCP tool calls."""
     
-    if name == "get_weather":
+    if name in ("get_weather", "get-weather"):
         return await get_weather_mcp_call(arguments)
     elif name == "email":
         return await email_mcp_call(arguments)
@@ -51,3 +51,18 @@ async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[types.T
 
 
 # Legacy compatibility - AVAILABLE_TOOLS and call_tool_function are imported from tools package
+
+
+if __name__ == "__main__":
+    # Serve over stdio, e.g. for AMETHYST_MCP_SERVERS=
+    # '{"amethyst-tools": {"command": "python", "args": ["mcp_tools.py"], "cwd": "tests"}}'
+    import asyncio
+
+    from mcp.server.stdio import stdio_server
+
+    async def main():
+        async with stdio_server() as (read_stream, write_stream):
+            options = mcp_server.create_initialization_options()
+            await mcp_server.run(read_stream, write_stream, options)
+
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+"""Batched repeat statements: planning, structured calls and per-item fallback."""
+
+import json
+from types import SimpleNamespace
+
+from amethyst_engine import engine as engine_mod
+from amethyst_engine import interpreter as interpreter_mod
+from amethyst_engine.app import AmtBlock, AppExpanded, ResourceExpanded, Statement
+from amethyst_engine.engine import Engine, EngineContext
+from amethyst_engine.interpreter import (
+    BatchItemResult,
+    BatchResult,
+    Interpreter,
+    plan_batches,
+)
+from amethyst_engine.llm import LLM
+from amethyst_engine.memory import AiCall, TaskType
+
+
+def batch_inputs(messages):
+    return json.loads(messages[0]["content"].split("Inputs:\n", 1)[1])
+
+
+def test_plan_batches_respects_item_and_token_limits(monkeypatch):
+    monkeypatch.setattr(interpreter_mod, "BATCH_TOKEN_BUDGET", 100)
+    monkeypatch.setattr(interpreter_mod, "BATCH_OUTPUT_TOKENS_PER_ITEM", 10)
+    small = {"n": 1}
+    assert plan_batches([small] * 5, max_items=3) == [[0, 1, 2], [3, 4]]
+    # An item over the budget still gets a batch, on its own
+    big = {"text": "x" * 400}
+    assert plan_batches([small, big, small, small], max_items=3) == [[0], [1], [2, 3]]
+    assert plan_batches([], max_items=3) == []
+
+
+def test_interpret_batch_keeps_one_answer_per_index(loop, monkeypatch):
+    async def stream(self, messages, text_format=None, tools=None, model=None, task_id=None):
+        assert text_format is BatchResult and tools == []
+        assert [i["input"] for i in batch_inputs(messages)] == ["a", "b", "c"]
+        results = [
+            BatchItemResult(index=0, result="A"),
+            BatchItemResult(index=0, result="A again"),
+            BatchItemResult(index=1, result="  "),
+            BatchItemResult(index=2, result="C"),
+            BatchItemResult(index=7, result="out of range"),
+        ]
+        return SimpleNamespace(output_parsed=BatchResult(results=results)), AiCall()
+
+    monkeypatch.setattr(LLM, "stream", stream)
+    interpreter = Interpreter(send_update=lambda update: None)
+    results, _ = loop.run_until_complete(
+        interpreter.interpret_batch("upper-case it", ["a", "b", "c"], "task-1")
+    )
+    assert results == {0: "A", 2: "C"}
+
+
+def test_batched_statements_split_fall_back_and_keep_order(loop, monkeypatch):
+    events, batch_sizes = [], []
+
+    async def stream(self, messages, text_format=None, tools=None, model=None, task_id=None):
+        inputs = batch_inputs(messages)
+        batch_sizes.append(len(inputs))
+        if len(inputs) > 2:
+            raise RuntimeError("context_length_exceeded")
+        events.append(("batch", [i["input"]["n"] for i in inputs]))
+        results = []
+        for position, entry in enumerate(inputs):
+            n = entry["input"]["n"]
+            if n == 5:
+                continue  # skipped by the model
+            # n == 7 answers under its neighbour's index, so 7 has no result
+            index = position - 1 if n == 7 else position
+            results.append(BatchItemResult(index=index, result=f"B{n}"))
+        return SimpleNamespace(output_parsed=BatchResult(results=results)), AiCall()
+
+    async def interpret(self, statement, task, *args):
+        n = task.input[0]["n"]
+        events.append((statement, n))
+        task.result = f"{statement}:{n}"
+
+    monkeypatch.setattr(LLM, "stream", stream)
+    monkeypatch.setattr(Engine, "_interpret_and_execute", interpret)
+    monkeypatch.setattr(engine_mod, "BATCH_MAX_ITEMS", 4)
+
+    stmts = [Statement(text="classify", batchable=True), Statement(text="summarize")]
+    function = ResourceExpanded(
+        type="amt_function",
+        name="f",
+        provider="amethyst",
+        blocks=[AmtBlock(type="repeat", statements=stmts)],
+    )
+    app = AppExpanded(resources=[function])
+
+    async def main():
+        engine = Engine()
+        context = EngineContext(app=app, run_id="run-1")
+        items = [{"n": n} for n in range(10)]
+        task = await engine._create_task(context, "run-1", "f", TaskType.AMT_FUNCTION, items)
+        await engine._execute_function(task, context)
+        return task
+
+    task = loop.run_until_complete(main())
+
+    # The first batch of 4 fails and is halved; later batches are capped at 2 without a call
+    assert batch_sizes == [4, 2, 2, 2, 2, 2]
+    # Every batch runs before item 0's other statements
+    assert [e for e in events if e[0] == "batch"] == events[:5]
+    assert [e[1] for e in events[:5]] == [[0, 1], [2, 3], [4, 5], [6, 7], [8, 9]]
+    # Items the batch didn't answer run alone, in item order
+    singles = []
+    for n in range(10):
+        singles += [("classify", n)] if n in (5, 7) else []
+        singles.append(("summarize", n))
+    assert events[5:] == singles
+
+    expected = []
+    for n in range(10):
+        expected += [f"classify:{n}" if n in (5, 7) else f"B{n}", f"summarize:{n}"]
+    assert task.result == expected
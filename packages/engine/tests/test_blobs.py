@@ -0,0 +1,30 @@
+"""Blob store size bound."""
+
+import os
+
+from amethyst_engine.blobs import BlobStore
+
+
+def test_least_recently_used_blobs_are_evicted(tmp_path):
+    store = BlobStore(tmp_path, max_bytes=3000)
+    refs = [store.put(str(i) * 1000) for i in range(3)]
+    # Make blob 0 the most recently used, then blob 1, blob 2
+    for age, ref in zip((10, 30, 20), refs):
+        os.utime(store._path(ref), (age, age))
+    store.get(refs[0])
+
+    new = store.put("x" * 1000)
+
+    assert store.get(new) == "x" * 1000
+    assert store.get(refs[0]) == "0" * 1000
+    assert store.get(refs[1]) is None
+    assert store.get(refs[2]) is None
+    assert store._size == 2000
+
+
+def test_put_is_idempotent_and_counts_existing_blobs(tmp_path):
+    BlobStore(tmp_path).put("a" * 100)
+    store = BlobStore(tmp_path, max_bytes=150)
+    assert store.put("a" * 100) == store.put("a" * 100)
+    store.put("b" * 100)
+    assert sorted(size for _, size, _ in store._blobs()) == [100]
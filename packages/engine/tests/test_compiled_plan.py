@@ -0,0 +1,54 @@
+"""Compiled plan fingerprints and invalidation."""
+
+from amethyst_engine import compiled_plan
+from amethyst_engine.app import AmtBlock, AmtFile, AppExpanded, ResourceExpanded, Statement
+from amethyst_engine.compiled_plan import compile_plan, is_current, plan_hash
+
+
+def make_app(content="main:\n  use gmail", workspace="ws-1", inputs=("gmail", "slack")):
+    resources = [
+        ResourceExpanded(type="tool", name=name, id=name, provider="pipedream") for name in inputs
+    ]
+    resources.append(
+        ResourceExpanded(
+            type="amt_function",
+            name="main",
+            provider="amethyst",
+            blocks=[AmtBlock(type="sequence", statements=[Statement(text="use gmail")])],
+        )
+    )
+    return AppExpanded(files=[AmtFile(content=content)], workspaceId=workspace, resources=resources)
+
+
+def test_hash_ignores_planner_output_and_resource_order():
+    app = make_app()
+    reordered = make_app(inputs=("slack", "gmail"))
+    reordered.resources[-1].blocks = []
+    assert plan_hash(app) == plan_hash(reordered)
+
+
+def test_hash_changes_with_what_planning_depends_on():
+    base = plan_hash(make_app())
+    assert plan_hash(make_app(content="main:\n  use slack")) != base
+    assert plan_hash(make_app(workspace="ws-2")) != base
+    assert plan_hash(make_app(inputs=("gmail",))) != base
+
+
+def test_compile_plan_snapshots_planned_resources():
+    app = make_app()
+    plan = compile_plan(app)
+    assert [r.name for r in plan.resources] == ["main"]
+    app.resources[-1].blocks[0].statements[0].text = "changed"
+    assert plan.resources[0].blocks[0].statements[0].text == "use gmail"
+
+
+def test_is_current(monkeypatch):
+    app = make_app()
+    plan = compile_plan(app)
+    assert is_current(plan, app)
+    assert not is_current(None, app)
+    assert not is_current(plan, make_app(content="main:\n  use slack"))
+
+    # Bumping PLAN_VERSION invalidates every stored plan
+    monkeypatch.setattr(compiled_plan, "PLAN_VERSION", compiled_plan.PLAN_VERSION + 1)
+    assert not is_current(plan, app)
@@ -0,0 +1,189 @@
+"""Direct dispatch of statements in explicit call form."""
+
+from types import SimpleNamespace
+
+import httpx
+
+from amethyst_engine import executor
+from amethyst_engine.app import AmtBlock, AppExpanded, DirectCall, ResourceExpanded, Statement
+from amethyst_engine.dispatch import bind_arguments, bind_direct_calls, parse_direct_call
+from amethyst_engine.engine import Engine, EngineContext
+from amethyst_engine.memory import TaskType
+
+EMAIL = ResourceExpanded(
+    type="tool",
+    name="email",
+    id="email",
+    provider="amethyst",
+    url="http://tools/email",
+    parameters={
+        "recipient": {"type": "string"},
+        "subject": {"type": "string"},
+        "retries": {"type": "integer", "default": 0},
+    },
+)
+AGENT = ResourceExpanded(type="agent", name="Trip Planner", provider="amethyst")
+GMAIL = ResourceExpanded(type="tool", name="gmail", provider="pipedream")
+RESOURCES = {"email": EMAIL, "trip-planner": AGENT, "gmail": GMAIL}
+
+
+def test_parse_tool_call():
+    call = parse_direct_call("use email - recipient: input.to, subject: Hi, all", RESOURCES)
+    assert call == DirectCall(
+        resource="email", arguments={"recipient": {"input": "to"}, "subject": "Hi, all"}
+    )
+
+
+def test_parse_agent_and_mcp_calls():
+    agent = parse_direct_call("use trip planner - prompt: plan a weekend", RESOURCES)
+    assert agent.arguments == {"prompt": "plan a weekend"}
+    mcp = parse_direct_call("use gmail - send-email to: item.address", RESOURCES)
+    assert (mcp.tool, mcp.arguments) == ("send-email", {"to": {"input": "address"}})
+
+
+def test_parse_rejects_statements_that_need_the_model():
+    for text in (
+        "use email to tell everyone",
+        "use unknown - recipient: a",
+        "use email - recipient: a, recipient: b",
+        "use email - recipient:",
+        "use trip planner - destination: Oslo",
+    ):
+        assert parse_direct_call(text, RESOURCES) is None, text
+
+
+def test_bind_direct_calls_sets_statement_calls():
+    stmts = [Statement(text="use email - recipient: a, subject: b"), Statement(text="think")]
+    function = ResourceExpanded(
+        type="amt_function",
+        name="f",
+        provider="amethyst",
+        blocks=[AmtBlock(type="sequence", statements=stmts)],
+    )
+    bind_direct_calls([EMAIL, function])
+    assert stmts[0].call.resource == "email"
+    assert stmts[1].call is None
+
+
+def test_bind_arguments_checks_schema_and_input():
+    call = parse_direct_call("use email - recipient: input.to, subject: Hi, retries: 2", RESOURCES)
+    assert bind_arguments(call, EMAIL.parameters, {"to": "a@example.com"}) == {
+        "recipient": "a@example.com",
+        "subject": "Hi",
+        "retries": 2,
+    }
+    # Missing input field, unconvertible literal, unknown or missing role, no schema
+    assert bind_arguments(call, EMAIL.parameters, {"from": "a"}) is None
+    bad_retries = call.model_copy(update={"arguments": {**call.arguments, "retries": "x"}})
+    assert bind_arguments(bad_retries, EMAIL.parameters, {"to": "a"}) is None
+    extra = call.model_copy(update={"arguments": {**call.arguments, "cc": "b"}})
+    assert bind_arguments(extra, EMAIL.parameters, {"to": "a"}) is None
+    partial = DirectCall(resource="email", arguments={"recipient": "a"})
+    assert bind_arguments(partial, EMAIL.parameters, None) is None
+    assert bind_arguments(call, None, {"to": "a"}) is None
+
+
+def test_json_schema_arguments():
+    schema = {
+        "properties": {"tags": {"type": "array"}, "urgent": {"type": "boolean"}},
+        "required": ["tags"],
+    }
+    call = DirectCall(resource="x", arguments={"tags": '["a"]', "urgent": "yes"})
+    assert bind_arguments(call, schema, None) == {"tags": ["a"], "urgent": True}
+
+
+def _run_repeat(loop, stmts, resources, items, engine=None, mcp_tools=None):
+    function = ResourceExpanded(
+        type="amt_function",
+        name="f",
+        provider="amethyst",
+        blocks=[AmtBlock(type="repeat", statements=stmts)],
+    )
+    app = AppExpanded(resources=[*resources, function])
+    bind_direct_calls(app.resources)
+
+    async def main():
+        context = EngineContext(app=app, mcp_tools=mcp_tools or [], run_id="run-1")
+        task = await engine._create_task(context, "run-1", "f", TaskType.AMT_FUNCTION, items)
+        await engine._execute_function(task, context)
+
+    loop.run_until_complete(main())
+
+
+def test_unbindable_call_falls_back_to_interpreter(loop, monkeypatch):
+    calls, interpreted = [], []
+
+    async def call_tool(name, arguments, resources):
+        calls.append(arguments)
+        return f"sent to {arguments['recipient']}"
+
+    async def interpret(self, statement, task, *args):
+        interpreted.append(statement)
+
+    monkeypatch.setattr(executor, "call_tool", call_tool)
+    monkeypatch.setattr(Engine, "_interpret_and_execute", interpret)
+
+    stmts = [
+        Statement(text="use email - recipient: input.to, subject: Hi"),
+        Statement(text="use email - recipient: input.missing, subject: Hi"),
+    ]
+    _run_repeat(loop, stmts, [EMAIL.model_copy(deep=True)], [{"to": "a@example.com"}], Engine())
+    assert calls == [{"recipient": "a@example.com", "subject": "Hi"}]
+    assert interpreted == [stmts[1].text]
+
+
+def test_failed_tool_call_falls_back_to_interpreter(loop, monkeypatch):
+    interpreted = []
+
+    async def call_tool(name, arguments, resources):
+        raise httpx.ConnectError("connection refused")
+
+    async def interpret(self, statement, task, *args):
+        interpreted.append(task.input)
+
+    monkeypatch.setattr(executor, "call_tool", call_tool)
+    monkeypatch.setattr(Engine, "_interpret_and_execute", interpret)
+
+    stmts = [Statement(text="use email - recipient: input.to, subject: Hi")]
+    _run_repeat(loop, stmts, [EMAIL.model_copy(deep=True)], [{"to": "a"}], Engine())
+    assert interpreted == [[{"to": "a"}]]
+
+
+class FakePool:
+    """MCP client pool with one server whose tool rejects some recipients."""
+
+    def __init__(self):
+        self.listed = 0
+        self.calls = []
+
+    async def list_tools(self, server):
+        self.listed += 1
+        schema = {"type": "object", "properties": {"to": {"type": "string"}}}
+        return [SimpleNamespace(name="send-email", description=None, inputSchema=schema)]
+
+    async def call_tool(self, server, name, arguments):
+        self.calls.append(arguments)
+        if arguments["to"] == "bounced":
+            return "Error: mailbox unavailable"
+        return f"sent to {arguments['to']}"
+
+
+def test_mcp_error_falls_back_and_toolset_is_listed_once(loop, monkeypatch):
+    interpreted = []
+
+    async def interpret(self, statement, task, *args):
+        interpreted.append(task.input)
+
+    monkeypatch.setattr(Engine, "_interpret_and_execute", interpret)
+    monkeypatch.delenv("AMETHYST_MCP_SERVERS", raising=False)
+
+    pool = FakePool()
+    stmts = [Statement(text="use gmail - send-email to: item.to")]
+    gmail = GMAIL.model_copy(update={"id": "gmail"})
+    mcp_tools = [{"type": "mcp", "server_label": "gmail", "server_url": "http://mcp/gmail"}]
+    items = [{"to": "a"}, {"to": "bounced"}, {"to": "b"}]
+    _run_repeat(loop, stmts, [gmail], items, Engine(mcp_client=pool), mcp_tools)
+
+    assert pool.calls == [{"to": "a"}, {"to": "bounced"}, {"to": "b"}]
+    assert interpreted == [[{"to": "bounced"}]]
+    assert pool.listed == 1
@@ -0,0 +1,126 @@
+"""Hook registration, isolation and the events the engine and LLM emit."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from amethyst_engine import engine as engine_mod
+from amethyst_engine.app import AmtBlock, AmtFile, AppExpanded, ResourceExpanded, Statement
+from amethyst_engine.compiled_plan import compile_plan
+from amethyst_engine.engine import Engine, EngineContext
+from amethyst_engine.hooks import HOOK_NAMES, EngineHooks, HookRegistry
+from amethyst_engine.llm import LLM
+from amethyst_engine.memory import TaskType
+
+
+class TaskEnds(EngineHooks):
+    def __init__(self):
+        self.ended = []
+
+    def on_task_end(self, task, duration, error):
+        self.ended.append((task.input, duration, error))
+
+
+def test_only_overridden_methods_are_registered():
+    hooks = TaskEnds()
+    registry = HookRegistry([hooks])
+    assert registry.on_task_end == [hooks.on_task_end]
+    assert all(getattr(registry, name) == [] for name in HOOK_NAMES if name != "on_task_end")
+
+    registry.add(EngineHooks())
+    assert all(len(getattr(registry, name)) == (name == "on_task_end") for name in HOOK_NAMES)
+
+
+def test_hook_errors_are_swallowed():
+    class Broken(EngineHooks):
+        def on_llm_request(self, request):
+            raise RuntimeError("hook bug")
+
+    class Cache(EngineHooks):
+        def on_llm_request(self, request):
+            return "cached"
+
+    registry = HookRegistry([Broken(), Cache()])
+    assert registry.call(registry.on_llm_request, None) == "cached"
+
+
+def test_llm_request_hook_short_circuits_the_model(loop):
+    cached = SimpleNamespace(output=[], usage=None)
+    seen = []
+
+    class Cache(EngineHooks):
+        def on_llm_request(self, request):
+            seen.append(request)
+            return cached
+
+        def on_llm_response(self, response):
+            seen.append(response)
+
+    def stream(**params):
+        raise AssertionError("the model must not be called")
+
+    llm = LLM(hooks=HookRegistry([Cache()]))
+    llm.client = SimpleNamespace(responses=SimpleNamespace(stream=stream))
+    messages = [{"role": "user", "content": "hi"}]
+    result, ai_call = loop.run_until_complete(
+        llm.stream(messages, model="gpt-test", task_id="task-1")
+    )
+
+    assert result is cached
+    assert ai_call.input_messages == messages
+    request, response = seen
+    assert (request.model, request.messages, request.task_id) == ("gpt-test", messages, "task-1")
+    assert response.request is request and response.response is cached and response.cached
+
+
+def test_plan_complete_and_task_end_fire(loop, monkeypatch):
+    class Recorder(TaskEnds):
+        planned = None
+
+        def on_plan_complete(self, app, duration):
+            self.planned = (app, duration)
+
+    class Provider:
+        def __init__(self, workspace_id, verbose=False):
+            pass
+
+        def enrich_resources(self, resources):
+            pass
+
+    async def hydrate_resources(resources):
+        pass
+
+    async def interpret(self, statement, task, *args):
+        if task.input[0]["name"] == "bad":
+            raise ValueError("boom")
+        task.result = "ok"
+
+    monkeypatch.setattr(engine_mod, "PipedreamProvider", Provider)
+    monkeypatch.setattr(Engine, "_interpret_and_execute", interpret)
+
+    function = ResourceExpanded(
+        type="amt_function",
+        name="f",
+        provider="amethyst",
+        blocks=[AmtBlock(type="repeat", statements=[Statement(text="summarize")])],
+    )
+    app = AppExpanded(files=[AmtFile(content="f:\n  summarize")], resources=[function])
+    hooks = Recorder()
+    engine = Engine(hooks=[hooks])
+    engine.hydrator.hydrate_resources = hydrate_resources
+
+    assert loop.run_until_complete(engine.load_plan(app, compile_plan(app)))
+    assert hooks.planned[0] is app and hooks.planned[1] >= 0
+
+    async def main():
+        context = EngineContext(app=app, run_id="run-1")
+        items = [{"name": "good"}, {"name": "bad"}]
+        task = await engine._create_task(context, "run-1", "f", TaskType.AMT_FUNCTION, items)
+        await engine._execute_function(task, context)
+
+    with pytest.raises(ValueError, match="boom"):
+        loop.run_until_complete(main())
+    (good, _, no_error), (bad, _, error) = hooks.ended
+    assert (good, no_error) == ([{"name": "good"}], None)
+    assert bad == [{"name": "bad"}] and isinstance(error, ValueError)
+    assert all(duration >= 0 for _, duration, _ in hooks.ended)
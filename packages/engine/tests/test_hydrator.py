@@ -0,0 +1,62 @@
+"""Resources the unified server can't describe are skipped, not fatal."""
+
+import json
+
+import httpx
+
+from amethyst_engine.app import ResourceExpanded
+from amethyst_engine.hydrator import ResourceHydrator, SchemaCache
+
+
+def test_bad_payloads_are_skipped(loop, tmp_path, monkeypatch):
+    payloads = {
+        "/tools/good": {"parameters": {"city": {"type": "string"}}},
+        "/tools/no-parameters": {"name": "no-parameters"},
+    }
+
+    async def get_json(self, client, url):
+        path = url.removeprefix(self.base_url)
+        if path not in payloads:
+            raise json.JSONDecodeError("Expecting value", "<html>", 0)
+        return payloads[path]
+
+    monkeypatch.setattr(ResourceHydrator, "_get_json", get_json)
+    resources = [
+        ResourceExpanded(type="tool", name=name, provider="amethyst")
+        for name in ("good", "no-parameters", "not-json")
+    ]
+    hydrator = ResourceHydrator(cache=SchemaCache(tmp_path))
+    loop.run_until_complete(hydrator.hydrate_resources(resources))
+
+    assert [r.parameters for r in resources] == [{"city": {"type": "string"}}, None, None]
+
+
+def test_invalid_disk_entries_are_refetched(loop, tmp_path):
+    url = "http://tools/good"
+    payload = {"parameters": {"city": {"type": "string"}}}
+    seen_headers = []
+
+    def handler(request):
+        seen_headers.append(request.headers.get("If-None-Match"))
+        return httpx.Response(200, json=payload, headers={"ETag": '"v2"'})
+
+    hydrator = ResourceHydrator(cache=SchemaCache(tmp_path))
+
+    async def fetch():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await hydrator._get_json(client, url)
+
+    path = SchemaCache(tmp_path)._path(url)
+    for bad in ('{"etag": "v1", "payl', "[]", '{"etag": "v1"}', '{"etag": 1, "payload": {}}'):
+        path.write_text(bad)
+        cache = SchemaCache(tmp_path)
+        assert cache.get(url) is None
+        assert not path.exists()
+
+        path.write_text(bad)
+        hydrator.cache = SchemaCache(tmp_path)
+        assert loop.run_until_complete(fetch()) == payload
+        assert seen_headers.pop() is None
+        assert json.loads(path.read_text()) == {"etag": '"v2"', "payload": payload}
+
+    assert SchemaCache(tmp_path).get(url) == {"etag": '"v2"', "payload": payload}
@@ -0,0 +1,58 @@
+"""Interpreter turns that span several model calls."""
+
+import json
+from types import SimpleNamespace
+
+from amethyst_engine import blobs
+from amethyst_engine.app import AppExpanded
+from amethyst_engine.blobs import BlobStore
+from amethyst_engine.interpreter import Interpreter
+from amethyst_engine.memory import AiCall
+
+
+def test_blob_reads_are_kept_in_one_ai_call(loop, monkeypatch, tmp_path):
+    monkeypatch.setattr(blobs, "_store", BlobStore(tmp_path))
+    interpreter = Interpreter(send_update=lambda update: None)
+    text = "".join(f"line {i}\n" for i in range(2000))
+    ref = json.loads(interpreter._offload(text))["blob_ref"]
+
+    def read(call_id, blob_ref, offset=0):
+        arguments = json.dumps({"blob_ref": blob_ref, "offset": offset})
+        return SimpleNamespace(
+            type="function_call", name="read_blob", call_id=call_id, arguments=arguments
+        )
+
+    missing = "blob-" + "0" * 32
+    answer = SimpleNamespace(type="message", content=[SimpleNamespace(text="done")])
+    rounds = [[read("c1", ref, offset=8000), read("c2", missing)], [answer]]
+    offered = []
+
+    async def stream(messages, tools=None, task_id=None, **kwargs):
+        offered.append([tool["name"] for tool in tools if tool.get("type") == "function"])
+        output = rounds.pop(0)
+        call = AiCall(
+            input_messages=list(messages),
+            intermediate_outputs=[{"type": o.type} for o in output],
+        )
+        return SimpleNamespace(output=output), call
+
+    interpreter.llm.stream = stream
+    result, ai_call = loop.run_until_complete(
+        interpreter.interpret("say done", AppExpanded(resources=[]), [], "task-1")
+    )
+
+    assert result.result == "done"
+    assert "read_blob" in offered[0]
+    assert len(ai_call.input_messages) == 1
+    kinds = [o["type"] for o in ai_call.intermediate_outputs]
+    assert kinds == [
+        "function_call",
+        "function_call",
+        "function_call_output",
+        "function_call_output",
+        "message",
+    ]
+    page, error = (json.loads(o["output"]) for o in ai_call.intermediate_outputs[2:4])
+    assert page["content"] == text[8000:16000]
+    assert page["remaining"] == len(text) - 16000
+    assert error == {"error": f"Unknown blob_ref {missing}"}
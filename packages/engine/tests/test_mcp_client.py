@@ -0,0 +1,53 @@
+"""McpClientPool against the stdio server in mcp_tools.py."""
+
+import json
+import sys
+from pathlib import Path
+
+from amethyst_engine import resilience
+from amethyst_engine.providers.mcp_client import McpClientPool, McpServer, McpToolset
+
+SERVER = McpServer(
+    label="weather",
+    command=sys.executable,
+    args=["mcp_tools.py"],
+    cwd=str(Path(__file__).parent),
+)
+CONFIG = {"type": "mcp", "server_label": "weather", "server_url": "http://unused"}
+
+
+def test_pool_reuses_and_reconnects_sessions(loop, monkeypatch):
+    monkeypatch.setenv(
+        "AMETHYST_MCP_SERVERS",
+        json.dumps(
+            {"weather": {"command": SERVER.command, "args": SERVER.args, "cwd": SERVER.cwd}}
+        ),
+    )
+    monkeypatch.setattr(resilience, "_breakers", {})
+
+    async def main():
+        pool = McpClientPool()
+        try:
+            toolset = await McpToolset.create(pool, [CONFIG])
+            names = [tool["name"] for tool in toolset.function_tools]
+            assert "weather__email" in names and "weather__get-weather" in names
+            assert toolset.remote == []
+            first = pool._sessions[SERVER.key]
+
+            arguments = {"recipient": "a@example.com", "subject": "Hi", "content": "Body"}
+            output = await toolset.call("weather__email", json.dumps(arguments))
+            assert "a@example.com" in output
+            await toolset.call("weather__get-weather", json.dumps({"location": "Paris"}))
+            assert pool._sessions[SERVER.key] is first
+            assert f"mcp:{SERVER.key}" in resilience.breaker_metrics()
+
+            # A dead session is replaced on the next call
+            await pool._discard(first)
+            output = await toolset.call("weather__email", json.dumps(arguments))
+            assert "a@example.com" in output
+            assert pool._sessions[SERVER.key] is not first
+            assert len(pool._sessions) == 1
+        finally:
+            await pool.close()
+
+    loop.run_until_complete(main())
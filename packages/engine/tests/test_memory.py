@@ -0,0 +1,70 @@
+"""Deduplicated AI call inputs in Memory."""
+
+from amethyst_engine.memory import AiCall, Memory, TaskExpanded
+
+SYSTEM = {"role": "system", "content": "Interpret the code"}
+USER = {"role": "user", "content": "Plan my day"}
+CALL = {"type": "function_call", "call_id": "c1", "name": "call_amt_resource"}
+OUTPUT = {"type": "function_call_output", "call_id": "c1", "output": "sunny"}
+
+
+def record(memory, task, *messages):
+    memory.record_ai_call(task, AiCall(input_messages=list(messages)))
+
+
+def test_growing_history_is_stored_once():
+    memory = Memory()
+    task = TaskExpanded(id="task-1")
+    record(memory, task, SYSTEM, USER)
+    record(memory, task, SYSTEM, USER, CALL, OUTPUT)
+
+    first, second = task.ai_calls
+    assert (first.inherited_refs, len(first.input_refs)) == (0, 2)
+    assert (second.inherited_refs, len(second.input_refs)) == (2, 2)
+    assert first.input_messages == [] and second.input_messages == []
+    assert len(memory.trace_blobs) == 4
+
+
+def test_diverging_history_inherits_common_prefix():
+    memory = Memory()
+    task = TaskExpanded(id="task-1")
+    record(memory, task, SYSTEM, USER, CALL)
+    record(memory, task, SYSTEM, OUTPUT)
+
+    assert task.ai_calls[1].inherited_refs == 1
+    assert len(task.ai_calls[1].input_refs) == 1
+
+
+def test_materialize_restores_inputs():
+    memory = Memory()
+    task = TaskExpanded(id="task-1")
+    record(memory, task, SYSTEM, USER)
+    record(memory, task, SYSTEM, USER, CALL, OUTPUT)
+    record(memory, task, SYSTEM, OUTPUT)
+
+    calls = memory.materialize_ai_calls(task)
+    assert [c["input_messages"] for c in calls] == [
+        [SYSTEM, USER],
+        [SYSTEM, USER, CALL, OUTPUT],
+        [SYSTEM, OUTPUT],
+    ]
+    assert "input_refs" not in calls[0]
+    assert memory.materialize_task(task)["ai_calls"] == calls
+
+
+def test_reloaded_task_continues_from_stored_refs():
+    memory = Memory()
+    task = TaskExpanded(id="task-1")
+    record(memory, task, SYSTEM, USER)
+    record(memory, task, SYSTEM, USER, CALL)
+
+    # As loaded from the database: no cached refs of the last call
+    reloaded = TaskExpanded(id="task-1", ai_calls=[c.model_copy() for c in task.ai_calls])
+    record(memory, reloaded, SYSTEM, USER, CALL, OUTPUT)
+    assert reloaded.ai_calls[-1].inherited_refs == 3
+    assert memory.materialize_ai_calls(reloaded)[-1]["input_messages"] == [
+        SYSTEM,
+        USER,
+        CALL,
+        OUTPUT,
+    ]
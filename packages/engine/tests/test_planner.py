@@ -0,0 +1,24 @@
+"""Resource references recorded at plan time."""
+
+from amethyst_engine.app import AmtBlock, ResourceExpanded, Statement
+from amethyst_engine.planner import bind_references
+
+
+def plan(*texts):
+    function = ResourceExpanded(
+        type="amt_function",
+        name="main",
+        provider="amethyst",
+        blocks=[AmtBlock(type="sequence", statements=[Statement(text=t) for t in texts])],
+    )
+    gmail = ResourceExpanded(type="mcp", name="Gmail", provider="pipedream", id="gmail")
+    bind_references([function, gmail])
+    return [stmt.references for stmt in function.blocks[0].statements]
+
+
+def test_named_resources_are_referenced():
+    assert plan("use gmail to send the summary", "Send it with Gmail") == [["gmail"], ["gmail"]]
+
+
+def test_statements_naming_nothing_keep_every_server():
+    assert plan("summarize the input", "use the calendar to book it") == [None, None]
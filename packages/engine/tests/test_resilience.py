@@ -0,0 +1,238 @@
+"""Circuit breaker transitions and retry behaviour."""
+
+import asyncio
+
+import pytest
+
+from amethyst_engine import resilience
+from amethyst_engine.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    call_with_resilience,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setenv("AMETHYST_BREAKER_THRESHOLD", "5")
+    monkeypatch.setenv("AMETHYST_BREAKER_RESET_SECONDS", "30")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker("k", failure_threshold=2, reset_timeout=30)
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    assert breaker.total_rejections == 1
+
+
+def test_half_open_trial_closes_on_success(clock):
+    breaker = CircuitBreaker("k", failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 30
+    breaker.allow()
+    assert breaker.state == "half_open"
+    # Only one trial at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.allow()
+
+
+def test_half_open_trial_reopens_on_failure(clock):
+    breaker = CircuitBreaker("k", failure_threshold=3, reset_timeout=30)
+    for _ in range(3):
+        breaker.record_failure()
+    clock[0] += 30
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    clock[0] += 30
+    breaker.allow()
+    assert breaker.state == "half_open"
+
+
+def test_cancelled_trial_releases_slot(loop, clock):
+    breaker = resilience.get_breaker("k")
+    for _ in range(5):
+        breaker.record_failure()
+    clock[0] += 30
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def main():
+        task = asyncio.ensure_future(call_with_resilience("k", hang, RetryPolicy()))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    loop.run_until_complete(main())
+    assert breaker.state == "half_open"
+    breaker.allow()
+
+
+def test_retries_only_listed_errors(loop, monkeypatch):
+    delays = []
+
+    async def no_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(resilience.asyncio, "sleep", no_sleep)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("reset")
+        return "ok"
+
+    policy = RetryPolicy(attempts=3, base_delay=1, max_delay=8)
+    result = loop.run_until_complete(
+        call_with_resilience("flaky", flaky, policy, retry_on=(ConnectionError,))
+    )
+    assert result == "ok"
+    assert len(calls) == 3
+    assert len(delays) == 2
+    assert 0 <= delays[0] <= 1 and 0 <= delays[1] <= 2
+    assert resilience.get_breaker("flaky").state == "closed"
+
+    async def broken():
+        calls.append(1)
+        raise ValueError("bad arguments")
+
+    calls.clear()
+    with pytest.raises(ValueError):
+        loop.run_until_complete(
+            call_with_resilience("broken", broken, policy, retry_on=(ConnectionError,))
+        )
+    assert len(calls) == 1
+
+
+def test_retries_give_up_after_attempts(loop, monkeypatch):
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(resilience.asyncio, "sleep", no_sleep)
+    calls = []
+
+    async def down():
+        calls.append(1)
+        raise ConnectionError("refused")
+
+    with pytest.raises(ConnectionError):
+        loop.run_until_complete(
+            call_with_resilience("down", down, RetryPolicy(attempts=3), retry_on=(ConnectionError,))
+        )
+    assert len(calls) == 3
+    # One logical call, one failure, however many attempts it took
+    assert resilience.get_breaker("down").failures == 1
+
+
+def test_retried_client_errors_are_not_failures(loop, monkeypatch):
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(resilience.asyncio, "sleep", no_sleep)
+    breaker = resilience.get_breaker("card")
+    breaker.record_failure()
+
+    async def not_found():
+        raise ConnectionError("404")
+
+    with pytest.raises(ConnectionError):
+        loop.run_until_complete(
+            call_with_resilience(
+                "card",
+                not_found,
+                RetryPolicy(attempts=3),
+                retry_on=(ConnectionError,),
+                should_retry=lambda e: True,
+                is_failure=lambda e: False,
+            )
+        )
+    assert breaker.failures == 0
+    assert breaker.state == "closed"
+
+
+def test_half_open_trial_spans_retries(loop, monkeypatch, clock):
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(resilience.asyncio, "sleep", no_sleep)
+    breaker = resilience.get_breaker("trial")
+    for _ in range(5):
+        breaker.record_failure()
+    clock[0] += 30
+    calls = []
+
+    async def recovers():
+        calls.append(1)
+        if len(calls) < 2:
+            raise ConnectionError("reset")
+        return "ok"
+
+    result = loop.run_until_complete(
+        call_with_resilience(
+            "trial", recovers, RetryPolicy(attempts=3), retry_on=(ConnectionError,)
+        )
+    )
+    assert result == "ok"
+    assert breaker.state == "closed"
+
+
+def test_is_failure_skips_client_errors(loop):
+    async def bad_request():
+        raise ValueError("400")
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            loop.run_until_complete(
+                call_with_resilience(
+                    "client", bad_request, RetryPolicy(), is_failure=lambda e: False
+                )
+            )
+    assert resilience.get_breaker("client").state == "closed"
+
+
+def test_backoff_is_capped():
+    policy = RetryPolicy(base_delay=0.5, max_delay=2)
+    assert all(0 <= policy.delay(10) <= 2 for _ in range(50))
+
+
+def test_llm_failures_are_downstream_errors_only():
+    import httpx
+    import openai
+
+    from amethyst_engine.llm import _is_llm_failure
+
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+
+    def status(code):
+        response = httpx.Response(code, request=request)
+        return openai.APIStatusError("error", response=response, body=None)
+
+    assert _is_llm_failure(status(500))
+    assert _is_llm_failure(status(429))
+    assert not _is_llm_failure(status(400))
+    assert _is_llm_failure(openai.APIConnectionError(request=request))
+    assert _is_llm_failure(openai.APITimeoutError(request=request))
+    assert not _is_llm_failure(ValueError("unparseable response"))
@@ -0,0 +1,71 @@
+"""Deficit round robin ordering and weight validation in FairScheduler."""
+
+import asyncio
+import math
+
+import pytest
+
+from amethyst_engine.scheduler import MIN_WEIGHT, FairScheduler, _parse_weights
+
+
+def grant_order(loop, scheduler, turns):
+    """Workspaces in the order their turns got a slot, queued behind a held one."""
+    order = []
+
+    async def turn(workspace_id, run_id):
+        async with scheduler.slot(workspace_id, run_id):
+            order.append(workspace_id)
+            await asyncio.sleep(0)
+
+    async def main():
+        release = asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot("holder", "holder"):
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        tasks = [asyncio.ensure_future(turn(ws, f"{ws}-{i}")) for i, ws in enumerate(turns)]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.wait_for(asyncio.gather(holder, *tasks), timeout=5)
+
+    loop.run_until_complete(main())
+    return order
+
+
+def test_round_robin_across_workspaces(loop):
+    scheduler = FairScheduler(max_concurrency=1, workspace_limit=8, run_limit=8)
+    order = grant_order(loop, scheduler, ["a"] * 4 + ["b"] * 2)
+    assert order == ["b", "a", "b", "a", "a", "a"]
+    assert scheduler.in_flight == 0
+
+
+def test_weights_share_slots(loop):
+    scheduler = FairScheduler(
+        max_concurrency=1, workspace_limit=8, run_limit=8, weights={"a": 2, "b": 1}
+    )
+    order = grant_order(loop, scheduler, ["a"] * 4 + ["b"] * 4)
+    assert order == ["b", "a", "a", "b", "a", "a", "b", "b"]
+
+
+def test_small_weight_still_progresses(loop):
+    scheduler = FairScheduler(
+        max_concurrency=1, workspace_limit=8, run_limit=8, weights={"a": 1e-12}
+    )
+    assert scheduler.weights["a"] == MIN_WEIGHT
+    order = grant_order(loop, scheduler, ["a", "a", "b"])
+    assert sorted(order) == ["a", "a", "b"]
+
+
+@pytest.mark.parametrize("weight", [0, -1, math.inf, math.nan])
+def test_rejects_invalid_weights(weight):
+    with pytest.raises(ValueError):
+        FairScheduler(weights={"a": weight})
+
+
+def test_parse_weights_skips_invalid(caplog):
+    weights = _parse_weights("a=2, b=0, c=-1, d=inf, e=nan, f=x, g=0.0001")
+    assert weights == {"a": 2.0, "g": MIN_WEIGHT}
+    assert len(caplog.records) == 5
@@ -0,0 +1,111 @@
+"""Span trees, disabled tracing and exporter encodings."""
+
+import contextlib
+import json
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+from amethyst_engine import tracing
+from amethyst_engine.tracing import span, tracer_from_env
+
+
+def test_noop_span_ignores_writes(monkeypatch):
+    monkeypatch.setattr(tracing, "get_tracer", lambda: SimpleNamespace(enabled=False))
+    with span("tool_call", {"tool.name": "t"}) as tool_span:
+        tool_span.error = "Error: failed"
+        tool_span.set_attribute("k", "v")
+        tool_span.add_event("e")
+    with span("tool_call") as other:
+        assert other is tool_span
+        assert other.error is None
+        assert other.attributes == {} and other.events == []
+
+
+@pytest.fixture
+def traced(monkeypatch, tmp_path):
+    """Tracer from env writing to a trace file and a stubbed OTLP collector."""
+    monkeypatch.setenv("AMETHYST_TRACE_FILE", str(tmp_path / "traces" / "spans.jsonl"))
+    monkeypatch.setenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://collector:4318/")
+    monkeypatch.setenv("OTEL_EXPORTER_OTLP_HEADERS", "authorization=Bearer%20abc")
+    monkeypatch.setenv("OTEL_SERVICE_NAME", "amethyst-test")
+    monkeypatch.delenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT", raising=False)
+    requests = []
+
+    def urlopen(request, timeout=None):
+        requests.append(request)
+        return contextlib.nullcontext()
+
+    monkeypatch.setattr(urllib.request, "urlopen", urlopen)
+    tracer = tracer_from_env()
+    monkeypatch.setattr(tracing, "_tracer", tracer)
+
+    with span("run", {"run.id": "r1", "files": 3, "ratio": 0.5, "ok": True}) as run:
+        run.set_attribute("tags", ["a", "b"])
+        run.set_attribute("meta", {"k": 1})
+        run.set_attribute("unset", None)
+        with pytest.raises(ValueError):
+            with span("task", {"task.id": "t1"}) as task:
+                task.add_event("retry", {"attempt": 2})
+                raise ValueError("boom")
+    tracer.flush()
+    return SimpleNamespace(
+        run=run, task=task, requests=requests, path=tmp_path / "traces" / "spans.jsonl"
+    )
+
+
+def test_otlp_payload(traced):
+    (request,) = traced.requests
+    assert request.full_url == "http://collector:4318/v1/traces"
+    assert request.get_method() == "POST"
+    assert request.get_header("Authorization") == "Bearer abc"
+    assert request.get_header("Content-type") == "application/json"
+
+    (resource_spans,) = json.loads(request.data)["resourceSpans"]
+    assert resource_spans["resource"]["attributes"] == [
+        {"key": "service.name", "value": {"stringValue": "amethyst-test"}}
+    ]
+    (scope_spans,) = resource_spans["scopeSpans"]
+    assert scope_spans["scope"] == {"name": "amethyst_engine"}
+    task, run = scope_spans["spans"]  # in the order they ended
+
+    assert run["name"] == "run" and task["name"] == "task"
+    assert len(run["traceId"]) == 32 and len(run["spanId"]) == 16
+    assert task["traceId"] == run["traceId"]
+    assert task["parentSpanId"] == run["spanId"] != task["spanId"]
+    assert "parentSpanId" not in run
+
+    assert run["attributes"] == [
+        {"key": "run.id", "value": {"stringValue": "r1"}},
+        {"key": "files", "value": {"intValue": "3"}},
+        {"key": "ratio", "value": {"doubleValue": 0.5}},
+        {"key": "ok", "value": {"boolValue": True}},
+        {
+            "key": "tags",
+            "value": {"arrayValue": {"values": [{"stringValue": "a"}, {"stringValue": "b"}]}},
+        },
+        {"key": "meta", "value": {"stringValue": '{"k": 1}'}},
+    ]
+    assert run["status"] == {"code": 0}
+    assert task["status"] == {"code": 2, "message": "ValueError: boom"}
+    (event,) = task["events"]
+    assert event["name"] == "retry"
+    assert event["attributes"] == [{"key": "attempt", "value": {"intValue": "2"}}]
+
+    assert run["startTimeUnixNano"] == str(traced.run.start_ns)
+    assert run["endTimeUnixNano"] == str(traced.run.end_ns)
+    start, end = int(task["startTimeUnixNano"]), int(task["endTimeUnixNano"])
+    assert int(run["startTimeUnixNano"]) <= start <= int(event["timeUnixNano"]) <= end
+    assert end <= int(run["endTimeUnixNano"])
+
+
+def test_json_file_lines(traced):
+    task, run = (json.loads(line) for line in traced.path.read_text().splitlines())
+    assert run == traced.run.to_dict()
+    assert run["parent_id"] is None and run["error"] is None
+    assert run["attributes"]["meta"] == {"k": 1}
+    assert task["parent_id"] == run["span_id"] and task["trace_id"] == run["trace_id"]
+    assert task["error"] == "ValueError: boom"
+    assert task["events"][0]["attributes"] == {"attempt": 2}
+    assert task["duration_ms"] == (task["end_ns"] - task["start_ns"]) / 1e6 >= 0
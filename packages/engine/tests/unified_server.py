@@ -4,8 +4,12 @@ Unified server hosting multiple agents and MCP tools.
 Single server with multiple endpoints for better resource management.
 """
 
+import hashlib
+import json
+import os
+
 import uvicorn
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from typing import Dict, Any
 
 # Import A2A agent manager
@@ -62,12 +66,17 @@ class UnifiedAgentServer:
             return {"result": result}
             
         @self.app.get("/tools/{tool_name}")
-        async def get_tool_info(tool_name: str):
-            """Get tool information."""
+        async def get_tool_info(tool_name: str, request: Request):
+            """Get tool information (ETag-validated)."""
             if tool_name not in self.tools:
                 raise HTTPException(status_code=404, detail=f"Tool {tool_name} not found")
             
-            return self.tools[tool_name]
+            info = {k: v for k, v in self.tools[tool_name].items() if k != "function"}
+            body = json.dumps(info, sort_keys=True)
+            etag = f'"{hashlib.sha256(body.encode()).hexdigest()[:16]}"'
+            if request.headers.get("if-none-match") == etag:
+                return Response(status_code=304, headers={"ETag": etag})
+            return Response(body, media_type="application/json", headers={"ETag": etag})
     
     async def _call_tool(self, tool_name: str, request: Dict[str, Any]) -> str:
         """Route MCP tool calls."""
@@ -112,5 +121,5 @@ class UnifiedAgentServer:
 
 
 if __name__ == '__main__':
-    server = UnifiedAgentServer(port=9998)
+    server = UnifiedAgentServer(port=int(os.getenv("PORT", "9998")))
     server.run()